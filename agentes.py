@@ -0,0 +1,98 @@
+from estado import CARCEL, COLOR_INDICE, INTERNO
+from movimientos import destino
+from nucleo import BOARD_SIZE, FINISH_TRACK_LENGTH, SAFE_CELLS, SALIDAS
+
+# =============================================================================
+# AGENTES
+# =============================================================================
+# Un agente reemplaza las preguntas por consola de Game para un color.
+# Game le pide tres decisiones:
+#   sacar_de_carcel(juego, equipo, dados) -> True/False
+#   elegir_fichas(juego, equipo, movibles, pasos) -> fichas en orden de preferencia
+#   elegir_bonus(juego, equipo, movibles, restantes) -> [(ficha, pasos), ...]
+# Game prueba las opciones en orden y se queda con la primera que sea legal,
+# así que los agentes no necesitan repetir las reglas de movimiento.
+
+def avance(equipo, ficha):
+    # Casillas recorridas por la ficha desde su salida
+    if ficha.state == "carcel":
+        return 0
+    if ficha.state == "casa":
+        return BOARD_SIZE + FINISH_TRACK_LENGTH
+    if ficha.state == "interno":
+        return BOARD_SIZE + ficha.position
+    return (ficha.position - SALIDAS[equipo.color]) % BOARD_SIZE + 1
+
+def captura(juego, equipo, ficha, pasos):
+    # Indica si mover la ficha externa esos pasos captura una ficha rival
+    if ficha.state != "externo":
+        return False
+    nueva_pos = destino(COLOR_INDICE[equipo.color], ficha.position, pasos)
+    if not CARCEL < nueva_pos < INTERNO or nueva_pos in SAFE_CELLS:
+        return False
+    piezas = juego.board.get_pieces(nueva_pos)
+    return len(piezas) == 1 and piezas[0].team != equipo.color
+
+
+class AgenteAleatorio:
+    # Elige al azar usando el generador del juego, de modo que una partida
+    # con semilla es reproducible.
+    def sacar_de_carcel(self, juego, equipo, dados):
+        return juego.rng.random() < 0.5
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        fichas = list(movibles)
+        juego.rng.shuffle(fichas)
+        return fichas
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        opciones = [(f, p) for f in movibles for p in range(1, restantes + 1)]
+        juego.rng.shuffle(opciones)
+        return opciones
+
+
+class AgenteCodicioso:
+    # Siempre sale de la cárcel, prefiere capturar y si no, avanza la ficha
+    # más adelantada. El bonus se gasta completo en una ficha si es posible.
+    def sacar_de_carcel(self, juego, equipo, dados):
+        return True
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        return sorted(movibles, key=lambda f: (captura(juego, equipo, f, pasos), avance(equipo, f)), reverse=True)
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        opciones = []
+        for pasos in range(restantes, 0, -1):
+            opciones.extend((f, pasos) for f in self.elegir_fichas(juego, equipo, movibles, pasos))
+        return opciones
+
+
+class AgenteGuionado:
+    # Reproduce un guion de decisiones: True/False para la cárcel, el id de la
+    # ficha a mover (o None para no mover) y (id, pasos) para el bonus.
+    # Cuando el guion se agota, decide el agente de respaldo.
+    def __init__(self, guion, respaldo=None):
+        self.guion = iter(guion)
+        self.respaldo = respaldo or AgenteCodicioso()
+
+    def _siguiente(self):
+        return next(self.guion, StopIteration)
+
+    def sacar_de_carcel(self, juego, equipo, dados):
+        decision = self._siguiente()
+        if decision is StopIteration:
+            return self.respaldo.sacar_de_carcel(juego, equipo, dados)
+        return bool(decision)
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        decision = self._siguiente()
+        if decision is StopIteration:
+            return self.respaldo.elegir_fichas(juego, equipo, movibles, pasos)
+        return [f for f in movibles if f.id == decision]
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        decision = self._siguiente()
+        if decision is StopIteration:
+            return self.respaldo.elegir_bonus(juego, equipo, movibles, restantes)
+        ficha_id, pasos = decision
+        return [(f, pasos) for f in movibles if f.id == ficha_id]
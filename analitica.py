@@ -0,0 +1,365 @@
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from agentes import AgenteAleatorio
+from estado import BONUS
+from eventos import (SEGURO_OCUPADO, BonusOtorgado, Captura, CastigoDobles, DadosLanzados, Dobles, FinTurno,
+                     MovimientoHecho, MovimientoRechazado, PartidaTerminada)
+from movimientos import make_move, make_turn, siguiente_turno
+from nucleo import BOARD_SIZE, COLORS, HOME_SIZE, SAFE_CELLS, Game
+from registro import LectorRegistros, estado_inicial
+from simulacion import MAX_TURNOS
+
+# =============================================================================
+# ANALÍTICA EN FLUJO
+# =============================================================================
+# Las partidas se consumen como un flujo de observaciones (tuplas) y se
+# resumen en agregados de tamaño fijo, así que se pueden analizar 10**8
+# partidas sin guardarlas. Dos Estadisticas se combinan sumando, de modo que
+# cada proceso resume su parte y al final se juntan.
+#
+# Observaciones:
+#   ("inicio", orden)                  colores en orden de turno
+#   ("turno", equipo)                  un turno jugado (con dados)
+#   ("captura", equipo, casilla)
+#   ("seguro_bloqueado", equipo, casilla)  captura impedida por SAFE_CELLS
+#   ("tres_dobles", equipo, encarcelada)   castigo; encarcelada si había ficha
+#   ("bonus_otorgado", equipo, pasos)
+#   ("bonus_usado", equipo, pasos)
+#   ("fin", ganador, turnos, sobrante)     sobrante: bonus sin usar por equipo
+
+ORDENES = ["".join(p) for p in itertools.permutations("YGRB")]
+
+
+class SketchCuantiles:
+    # Cuantiles aproximados con error relativo `alfa` (estilo DDSketch): cada
+    # valor cae en la cubeta ceil(log_gamma(x)). La memoria depende del rango
+    # de valores, no de cuántos hay, y dos sketches se combinan sumando cubetas.
+    def __init__(self, alfa=0.01):
+        self.alfa = alfa
+        self.gamma = (1 + alfa) / (1 - alfa)
+        self.log_gamma = math.log(self.gamma)
+        self.cubetas = {}
+        self.ceros = 0
+        self.cuenta = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def agregar(self, x, n=1):
+        self.cuenta += n
+        self.minimo = min(self.minimo, x)
+        self.maximo = max(self.maximo, x)
+        if x <= 0:
+            self.ceros += n
+            return
+        k = math.ceil(math.log(x) / self.log_gamma)
+        self.cubetas[k] = self.cubetas.get(k, 0) + n
+
+    def combinar(self, otro):
+        if otro.alfa != self.alfa:
+            raise Exception("Solo se pueden combinar sketches con el mismo alfa.")
+        self.cuenta += otro.cuenta
+        self.ceros += otro.ceros
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        for k, n in otro.cubetas.items():
+            self.cubetas[k] = self.cubetas.get(k, 0) + n
+
+    def cuantil(self, q):
+        if not self.cuenta:
+            return None
+        rango = q * (self.cuenta - 1)
+        acumulado = self.ceros
+        if rango < acumulado:
+            return 0
+        for k in sorted(self.cubetas):
+            acumulado += self.cubetas[k]
+            if rango < acumulado:
+                valor = 2 * self.gamma ** k / (self.gamma + 1)
+                return min(max(valor, self.minimo), self.maximo)
+        return self.maximo
+
+
+class Estadisticas:
+    def __init__(self, alfa=0.01):
+        puestos = len(COLORS)
+        self.partidas = 0
+        self.sin_ganador = 0
+        self.victorias_puesto = [0] * puestos
+        self.duracion = SketchCuantiles(alfa)
+        self.turnos = 0  # Turnos con dados, para las tasas por turno
+        self.turnos_partidas = 0
+        self.capturas = [0] * (BOARD_SIZE + 1)  # Por casilla (1..68)
+        self.seguros_bloqueados = [0] * (BOARD_SIZE + 1)
+        self.tres_dobles = 0
+        self.encarcelados = 0
+        self.bonus_otorgado = [0] * puestos
+        self.bonus_usado = [0] * puestos
+        self.bonus_sobrante = [0] * puestos
+        self._puestos = {color: i for i, color in enumerate(COLORS)}  # De la partida en curso
+
+    def consumir(self, observacion):
+        tipo = observacion[0]
+        if tipo == "turno":
+            self.turnos += 1
+        elif tipo == "bonus_usado":
+            self.bonus_usado[self._puestos[observacion[1]]] += observacion[2]
+        elif tipo == "captura":
+            self.capturas[observacion[2]] += 1
+        elif tipo == "bonus_otorgado":
+            self.bonus_otorgado[self._puestos[observacion[1]]] += observacion[2]
+        elif tipo == "seguro_bloqueado":
+            self.seguros_bloqueados[observacion[2]] += 1
+        elif tipo == "tres_dobles":
+            self.tres_dobles += 1
+            self.encarcelados += observacion[2]
+        elif tipo == "inicio":
+            self._puestos = {color: i for i, color in enumerate(observacion[1])}
+        elif tipo == "fin":
+            _, ganador, turnos, sobrante = observacion
+            self.partidas += 1
+            if ganador is None:
+                self.sin_ganador += 1
+            else:
+                self.victorias_puesto[self._puestos[ganador]] += 1
+            self.duracion.agregar(turnos)
+            self.turnos_partidas += turnos
+            for color, pasos in sobrante.items():
+                self.bonus_sobrante[self._puestos[color]] += pasos
+
+    def consumir_todas(self, observaciones):
+        for observacion in observaciones:
+            self.consumir(observacion)
+        return self
+
+    def combinar(self, otra):
+        self.partidas += otra.partidas
+        self.sin_ganador += otra.sin_ganador
+        self.turnos += otra.turnos
+        self.turnos_partidas += otra.turnos_partidas
+        self.tres_dobles += otra.tres_dobles
+        self.encarcelados += otra.encarcelados
+        self.duracion.combinar(otra.duracion)
+        for propia, ajena in ((self.victorias_puesto, otra.victorias_puesto), (self.capturas, otra.capturas),
+                              (self.seguros_bloqueados, otra.seguros_bloqueados),
+                              (self.bonus_otorgado, otra.bonus_otorgado), (self.bonus_usado, otra.bonus_usado),
+                              (self.bonus_sobrante, otra.bonus_sobrante)):
+            for i, n in enumerate(ajena):
+                propia[i] += n
+        return self
+
+    def filas(self):
+        # (clave, valor) del resumen, en el orden en que se escriben
+        partidas = self.partidas or 1
+        turnos = self.turnos or 1
+        filas = [("partidas", self.partidas), ("sin_ganador", self.sin_ganador)]
+        for i, n in enumerate(self.victorias_puesto):
+            filas.append((f"victorias_puesto_{i + 1}", n))
+            filas.append((f"tasa_victorias_puesto_{i + 1}", round(n / partidas, 6)))
+        filas.append(("turnos_con_dados", self.turnos))
+        filas.append(("turnos_media", round(self.turnos_partidas / partidas, 3)))
+        for q in (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99):
+            valor = self.duracion.cuantil(q)
+            filas.append((f"turnos_p{round(q * 100)}", None if valor is None else round(valor, 1)))
+        filas.append(("tres_dobles", self.tres_dobles))
+        filas.append(("encarcelados_por_tres_dobles", self.encarcelados))
+        filas.append(("encarcelados_por_mil_turnos", round(1000 * self.encarcelados / turnos, 4)))
+        for i in range(len(COLORS)):
+            otorgado = self.bonus_otorgado[i]
+            filas.append((f"bonus_otorgado_puesto_{i + 1}", otorgado))
+            filas.append((f"bonus_usado_puesto_{i + 1}", self.bonus_usado[i]))
+            filas.append((f"bonus_sobrante_puesto_{i + 1}", self.bonus_sobrante[i]))
+            filas.append((f"fraccion_bonus_usado_puesto_{i + 1}", round(self.bonus_usado[i] / (otorgado or 1), 4)))
+        filas.append(("capturas", sum(self.capturas)))
+        filas.append(("seguros_bloqueados", sum(self.seguros_bloqueados)))
+        for casilla in range(1, BOARD_SIZE + 1):
+            marca = "_seguro" if casilla in SAFE_CELLS else ""
+            filas.append((f"capturas_casilla_{casilla}{marca}", self.capturas[casilla]))
+        for casilla in sorted(SAFE_CELLS):
+            filas.append((f"bloqueos_seguro_casilla_{casilla}", self.seguros_bloqueados[casilla]))
+        return filas
+
+    def escribir(self, ruta):
+        # Texto plano "clave<TAB>valor"; se reemplaza el archivo completo de una vez
+        temporal = ruta + ".tmp"
+        with open(temporal, "w") as archivo:
+            for clave, valor in self.filas():
+                archivo.write(f"{clave}\t{'' if valor is None else valor}\n")
+        os.replace(temporal, ruta)
+
+# =============================================================================
+# FUENTES DE OBSERVACIONES
+# =============================================================================
+
+class TraductorEventos:
+    # Escucha el bus de un Game y traduce sus eventos a observaciones. Los
+    # movimientos entre el fin de un turno y los dados del siguiente son los
+    # del bonus (como en registro.GrabadorJuego).
+    def __init__(self, juego, salida):
+        self.juego = juego
+        self.salida = salida
+        self.tirados = False
+        self.suscripcion = juego.bus.suscribir(self.recibir, (DadosLanzados, MovimientoHecho, FinTurno, Captura,
+                                                              MovimientoRechazado, Dobles, CastigoDobles,
+                                                              BonusOtorgado, PartidaTerminada))
+        salida.append(("inicio", tuple(juego.turn_order)))
+
+    def recibir(self, evento):
+        tipo = type(evento)
+        if tipo is DadosLanzados:
+            self.tirados = True
+            self.salida.append(("turno", evento.equipo))
+        elif tipo is FinTurno:
+            self.tirados = False
+        elif tipo is MovimientoHecho:
+            if not self.tirados:
+                self.salida.append(("bonus_usado", evento.ficha.team, evento.pasos))
+        elif tipo is Captura:
+            self.salida.append(("captura", evento.ficha.team, evento.casilla))
+        elif tipo is MovimientoRechazado:
+            if evento.motivo == SEGURO_OCUPADO:
+                self.salida.append(("seguro_bloqueado", evento.ficha.team, evento.casilla))
+        elif tipo is Dobles:
+            if evento.cuenta == 3:
+                self.salida.append(("tres_dobles", evento.equipo, False))
+        elif tipo is CastigoDobles:
+            # Llega justo después del Dobles de la tercera tirada
+            self.salida[-1] = ("tres_dobles", evento.equipo, True)
+        elif tipo is BonusOtorgado:
+            self.salida.append(("bonus_otorgado", evento.equipo, evento.cantidad))
+        elif tipo is PartidaTerminada:
+            sobrante = {color: pasos for color, pasos in self.juego.bonus_moves.items() if pasos}
+            self.salida.append(("fin", evento.ganador, evento.turnos, sobrante))
+
+    def terminar(self):
+        self.juego.bus.desuscribir(self.suscripcion)
+
+
+def observaciones_partidas(n_games, seed=None, fabrica_agente=AgenteAleatorio, ordenes=ORDENES,
+                           max_turnos=MAX_TURNOS, fabrica_dados=None):
+    # Juega n_games partidas (rotando el orden de turnos) y genera sus
+    # observaciones; solo guarda las de la partida en curso
+    rng = random.Random(seed)
+    agentes = {color: fabrica_agente() for color in COLORS}
+    observaciones = []
+    for i in range(n_games):
+        semilla = rng.getrandbits(64)
+        dados = fabrica_dados(semilla) if fabrica_dados is not None else None
+        juego = Game(ordenes[i % len(ordenes)], agentes=agentes, rng=random.Random(semilla), silencioso=True,
+                     dados=dados)
+        traductor = TraductorEventos(juego, observaciones)
+        juego.run(max_turnos)
+        traductor.terminar()
+        yield from observaciones
+        observaciones.clear()
+
+def observaciones_registro(lector, partidas=None):
+    # Observaciones de partidas grabadas (registro.py), reproducidas sobre el
+    # estado compacto. El registro solo tiene los movimientos aceptados, así
+    # que no hay "seguro_bloqueado".
+    for partida in partidas if partidas is not None else range(len(lector)):
+        yield "inicio", tuple(COLORS[t] for t in lector.orden(partida))
+        estado = estado_inicial(lector.orden(partida))
+        datos = estado.datos
+        for evento in lector.eventos(partida):
+            if evento[0] == "bonus":
+                _, indice, pasos = evento
+                color = COLORS[indice // HOME_SIZE]
+                yield "bonus_usado", color, pasos
+                registro = make_move(estado, (indice, pasos))
+                datos[BONUS + indice // HOME_SIZE] -= pasos
+                yield from _observar_movimientos(color, datos, (registro,))
+            elif evento[0] == "turno" and evento[1] is not None:
+                _, dados, jugada = evento
+                color = COLORS[estado.equipo_actual()]
+                yield "turno", color
+                _, _, dobles, castigada, registros = make_turn(estado, dados, jugada)
+                if dados[0] == dados[1] and dobles == 2:
+                    yield "tres_dobles", color, castigada is not None
+                yield from _observar_movimientos(color, datos, registros)
+            elif evento[0] == "turno":
+                siguiente_turno(estado)
+        resultado = lector.resultado(partida)
+        if resultado is not None:
+            ganador, turnos = resultado
+            sobrante = {COLORS[t]: datos[BONUS + t] for t in range(len(COLORS)) if datos[BONUS + t]}
+            yield "fin", None if ganador is None else COLORS[ganador], turnos, sobrante
+
+def _observar_movimientos(color, datos, registros):
+    # Una captura ocurre en la casilla donde quedó la ficha que movió (si movió
+    # dos veces, la primera fue la salida de la cárcel, que no captura)
+    for indice, _, capturada, bonus in registros:
+        if capturada >= 0:
+            yield "captura", color, datos[indice]
+        if bonus:
+            yield "bonus_otorgado", color, bonus
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+def analizar(observaciones, estadisticas=None, ruta=None, cada=100_000):
+    # Consume el flujo; con `ruta` escribe el resumen cada `cada` partidas y al final
+    estadisticas = estadisticas or Estadisticas()
+    siguiente = estadisticas.partidas + cada
+    for observacion in observaciones:
+        estadisticas.consumir(observacion)
+        if ruta is not None and observacion[0] == "fin" and estadisticas.partidas >= siguiente:
+            estadisticas.escribir(ruta)
+            siguiente += cada
+    if ruta is not None:
+        estadisticas.escribir(ruta)
+    return estadisticas
+
+def _analizar_bloque(n_games, seed, fabrica_agente):
+    return Estadisticas().consumir_todas(observaciones_partidas(n_games, seed, fabrica_agente))
+
+def analizar_en_paralelo(n_games, seed=0, procesos=None, tamano_bloque=1000, fabrica_agente=AgenteAleatorio,
+                         ruta=None, cada=100_000):
+    # Cada bloque tiene su semilla derivada de `seed`, así que el resultado no
+    # depende del número de procesos; los parciales se combinan al llegar
+    procesos = procesos or os.cpu_count()
+    rng = random.Random(seed)
+    bloques = ((min(tamano_bloque, n_games - inicio), rng.getrandbits(64)) for inicio in range(0, n_games, tamano_bloque))
+    total = Estadisticas()
+    siguiente = cada
+    en_curso = set()
+    with ProcessPoolExecutor(max_workers=procesos) as executor:
+        while True:
+            for n, semilla in itertools.islice(bloques, 2 * procesos - len(en_curso)):
+                en_curso.add(executor.submit(_analizar_bloque, n, semilla, fabrica_agente))
+            if not en_curso:
+                break
+            listos, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                total.combinar(futuro.result())
+            if ruta is not None and total.partidas >= siguiente:
+                total.escribir(ruta)
+                siguiente += cada
+    if ruta is not None:
+        total.escribir(ruta)
+    return total
+
+
+if __name__ == "__main__":
+    # python analitica.py simular [partidas] [procesos] [salida.txt]
+    # python analitica.py registro archivo.bin [salida.txt]
+    accion = sys.argv[1] if len(sys.argv) > 1 else "simular"
+    inicio = time.perf_counter()
+    if accion == "simular":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+        procesos = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        ruta = sys.argv[4] if len(sys.argv) > 4 else None
+        estadisticas = analizar_en_paralelo(n, 0, procesos, ruta=ruta)
+    else:
+        with LectorRegistros(sys.argv[2]) as lector:
+            estadisticas = analizar(observaciones_registro(lector), ruta=sys.argv[3] if len(sys.argv) > 3 else None)
+    for clave, valor in estadisticas.filas():
+        if not clave.startswith(("capturas_casilla", "bloqueos_seguro_casilla")):
+            print(f"{clave:34} {valor}")
+    print(f"{estadisticas.partidas} partidas en {time.perf_counter() - inicio:.1f} s")
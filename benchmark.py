@@ -0,0 +1,294 @@
+import gc
+import json
+import platform
+import random
+import sys
+import time
+
+from agentes import AgenteCodicioso
+from eventos import CastigoDobles, EstadoCambiado, MovimientoHecho, SalidaCarcel
+from estado import EstadoCompacto
+from interfaz import BoardRenderer, FotosTablero, board_grid, foto_tablero
+from nucleo import COLORS, Game
+from simulacion import jugar_partida
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+# Cada benchmark usa semillas fijas y agentes deterministas, así que mide
+# siempre el mismo trabajo. Se repite REPETICIONES veces y se guarda la mejor
+# (la menos afectada por el resto de la máquina) como operaciones por segundo.
+#
+# El resultado es un JSON; "comparar" lo contrasta con uno guardado y termina
+# con código 1 si algún benchmark quedó más de `tolerancia` por debajo.
+#
+# Las operaciones por segundo dependen de la máquina, así que cada repetición
+# mide también un ciclo de calibración (Python puro, sin código del juego) y
+# "comparar" usa la razón entre cada benchmark y la calibración: una base
+# guardada en otra máquina sirve mientras la diferencia sea pareja.
+
+VERSION = 2
+REPETICIONES = 7
+SEMILLA = 2024
+PARTIDAS = 40
+VUELTAS = 10  # Repeticiones del trabajo dentro de cada medición de los benchmarks cortos
+ORDEN = "YGRB"
+TOLERANCIA = 0.25
+BASE = "benchmark_base.json"
+
+
+class LienzoSimulado:
+    # Canvas de tkinter sin ventana: devuelve ids y cuenta las llamadas
+    def __init__(self):
+        self.items = 0
+        self.llamadas = 0
+
+    def _crear(self, *args, **kwargs):
+        self.items += 1
+        self.llamadas += 1
+        return self.items
+
+    create_rectangle = create_oval = create_text = _crear
+
+    def _modificar(self, *args, **kwargs):
+        self.llamadas += 1
+
+    coords = itemconfigure = tag_raise = _modificar
+
+
+def _partida_guionada(seed):
+    # Juega una partida con agentes codiciosos y devuelve la lista de cambios
+    # aceptados, en orden, para repetirlos sin dados ni agentes
+    guion = []
+    juego = Game(ORDEN, agentes={color: AgenteCodicioso() for color in COLORS},
+                 rng=random.Random(seed), silencioso=True)
+
+    def anotar(evento):
+        if isinstance(evento, SalidaCarcel):
+            guion.append(("salir", evento.ficha.team, evento.ficha.id, 0))
+        elif isinstance(evento, CastigoDobles):
+            guion.append(("castigo", evento.equipo, evento.ficha.id, 0))
+        else:
+            guion.append(("mover", evento.ficha.team, evento.ficha.id, evento.pasos))
+
+    juego.bus.suscribir(anotar, (SalidaCarcel, CastigoDobles, MovimientoHecho))
+    juego.run(2000)
+    return guion
+
+def _reproducir(guion):
+    # Repite el guion llamando directamente a mover_ficha_externa/interna
+    juego = Game(ORDEN, silencioso=True)
+    movimientos = 0
+    for accion, color, ficha_id, pasos in guion:
+        team = juego.teams[color]
+        ficha = team.pieces[ficha_id]
+        if accion == "salir":
+            juego.sacar_ficha_de_carcel(team)
+        elif accion == "castigo":
+            juego.capturar_ficha(ficha)
+        else:
+            if ficha.state == "externo":
+                movida = juego.mover_ficha_externa(team, ficha, pasos)
+            else:
+                movida = juego.mover_ficha_interna(team, ficha, pasos)
+            if not movida:
+                raise Exception(f"El guion ya no es válido: {color} {ficha_id} no puede mover {pasos}.")
+            movimientos += 1
+    return movimientos
+
+def _juegos_intermedios(n):
+    # Partidas detenidas a mitad de camino, para medir sobre estados reales
+    juegos = []
+    for i in range(n):
+        juego = Game(ORDEN, agentes={color: AgenteCodicioso() for color in COLORS},
+                     rng=random.Random(SEMILLA + i), silencioso=True)
+        juego.run(60 + 10 * i)
+        juegos.append(juego)
+    return juegos
+
+def _estados_ui(seed):
+    # La foto que la interfaz leería de game_state_updater después de cada cambio
+    juego = Game(ORDEN, agentes={color: AgenteCodicioso() for color in COLORS},
+                 rng=random.Random(seed), silencioso=True)
+    estados = []
+    fotos = FotosTablero(juego)
+    juego.bus.suscribir(lambda evento: estados.append(fotos.actual[1]), EstadoCambiado)
+    juego.run(2000)
+    return estados
+
+# -------------------------------------------------------------- Benchmarks
+# Cada uno prepara sus datos y devuelve una función que hace el trabajo medido
+# y devuelve cuántas operaciones hizo.
+
+def bench_movimientos():
+    guiones = [_partida_guionada(SEMILLA + i) for i in range(PARTIDAS)]
+    return lambda: sum(_reproducir(guion) for _ in range(VUELTAS) for guion in guiones)
+
+def bench_partidas():
+    agentes = {color: AgenteCodicioso() for color in COLORS}
+
+    def medir():
+        for i in range(PARTIDAS):
+            jugar_partida(agentes, ORDEN, SEMILLA + i)
+        return PARTIDAS
+    return medir
+
+def bench_copia_estado():
+    estados = [EstadoCompacto.desde_juego(juego) for juego in _juegos_intermedios(20)]
+
+    def medir():
+        for _ in range(1000 * VUELTAS):
+            for estado in estados:
+                estado.copia()
+        return 1000 * VUELTAS * len(estados)
+    return medir
+
+def bench_estado_desde_juego():
+    juegos = _juegos_intermedios(20)
+
+    def medir():
+        for _ in range(10 * VUELTAS):
+            for juego in juegos:
+                EstadoCompacto.desde_juego(juego)
+        return 10 * VUELTAS * len(juegos)
+    return medir
+
+def bench_game_state_updater():
+    # Costo de armar la foto que game_state_updater entrega a la interfaz
+    juegos = _juegos_intermedios(20)
+
+    def medir():
+        for _ in range(10 * VUELTAS):
+            for juego in juegos:
+                foto_tablero(juego)
+        return 10 * VUELTAS * len(juegos)
+    return medir
+
+def bench_refresco_tk():
+    # Cuadros por segundo de BoardRenderer.render sobre un LienzoSimulado
+    # (el tablero se dibuja una sola vez, fuera de la medición)
+    estados = _estados_ui(SEMILLA)
+    renderer = BoardRenderer(LienzoSimulado(), board_grid)
+
+    def medir():
+        for _ in range(VUELTAS):
+            for estado in estados:
+                renderer.render(estado)
+        return VUELTAS * len(estados)
+    return medir
+
+def calibracion():
+    # Enteros, listas, diccionarios, atributos y llamadas, como el código del
+    # juego, pero sin depender de él
+    class Caja:
+        def __init__(self, valor):
+            self.valor = valor
+
+    cajas = [Caja(i) for i in range(64)]
+    vueltas = 50_000 * VUELTAS
+
+    def medir():
+        cuentas = {}
+        total = 0
+        for i in range(vueltas):
+            caja = cajas[i & 63]
+            cuentas[caja.valor] = cuentas.get(caja.valor, 0) + 1
+            total += (caja.valor * 7 + i) % 13
+        return vueltas
+    return medir
+
+BENCHMARKS = {
+    "movimientos": bench_movimientos,
+    "partidas": bench_partidas,
+    "copia_estado": bench_copia_estado,
+    "estado_desde_juego": bench_estado_desde_juego,
+    "game_state_updater": bench_game_state_updater,
+    "refresco_tk": bench_refresco_tk,
+}
+
+def medir(funcion, repeticiones=REPETICIONES, ciclo=None):
+    # Con `ciclo` (la calibración) cada repetición corre también el ciclo justo
+    # antes, y "relativo" es la razón entre las mejores de cada uno: las dos
+    # mediciones comparten el mismo rato de la máquina
+    mejor = None
+    mejor_ciclo = None
+    operaciones = 0
+    vueltas = 0
+    gc.collect()
+    for _ in range(repeticiones):
+        if ciclo is not None:
+            inicio = time.perf_counter()
+            vueltas = ciclo()
+            duracion = time.perf_counter() - inicio
+            if mejor_ciclo is None or duracion < mejor_ciclo:
+                mejor_ciclo = duracion
+        inicio = time.perf_counter()
+        operaciones = funcion()
+        duracion = time.perf_counter() - inicio
+        if mejor is None or duracion < mejor:
+            mejor = duracion
+    resultado = {"operaciones": operaciones, "segundos": mejor, "por_segundo": operaciones / mejor}
+    if ciclo is not None:
+        resultado["relativo"] = resultado["por_segundo"] / (vueltas / mejor_ciclo)
+    return resultado
+
+def correr(nombres=None, repeticiones=REPETICIONES):
+    ciclo = calibracion()
+    resultados = {}
+    for nombre in nombres or BENCHMARKS:
+        resultados[nombre] = medir(BENCHMARKS[nombre](), repeticiones, ciclo)
+    return {
+        "version": VERSION,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": repeticiones,
+        "calibracion": medir(ciclo, repeticiones),
+        "resultados": resultados,
+    }
+
+def comparar(actual, base, tolerancia=TOLERANCIA):
+    # Devuelve [(nombre, base, actual, razón, regresión)] para los benchmarks
+    # de la base; base y actual son operaciones por calibración, así que la
+    # razón no depende de la velocidad de cada máquina
+    if base.get("version") != actual.get("version"):
+        raise Exception("La base de comparación es de otra versión de los benchmarks.")
+    filas = []
+    for nombre, anterior in base["resultados"].items():
+        if nombre not in actual["resultados"]:
+            continue
+        ahora = actual["resultados"][nombre]["relativo"]
+        razon = ahora / anterior["relativo"]
+        filas.append((nombre, anterior["relativo"], ahora, razon, razon < 1 - tolerancia))
+    return filas
+
+
+if __name__ == "__main__":
+    # python benchmark.py correr [salida.json]
+    # python benchmark.py guardar [base.json]
+    # python benchmark.py comparar [base.json] [tolerancia]
+    accion = sys.argv[1] if len(sys.argv) > 1 else "correr"
+    resultado = correr()
+    if accion == "correr":
+        texto = json.dumps(resultado, indent=2)
+        if len(sys.argv) > 2:
+            with open(sys.argv[2], "w") as archivo:
+                archivo.write(texto + "\n")
+        print(texto)
+    elif accion == "guardar":
+        ruta = sys.argv[2] if len(sys.argv) > 2 else BASE
+        with open(ruta, "w") as archivo:
+            archivo.write(json.dumps(resultado, indent=2) + "\n")
+        print(f"Base guardada en {ruta}")
+    else:
+        ruta = sys.argv[2] if len(sys.argv) > 2 else BASE
+        tolerancia = float(sys.argv[3]) if len(sys.argv) > 3 else TOLERANCIA
+        with open(ruta) as archivo:
+            base = json.load(archivo)
+        regresiones = 0
+        for nombre, antes, ahora, razon, regresion in comparar(resultado, base, tolerancia):
+            marca = "REGRESIÓN" if regresion else "ok"
+            print(f"{nombre:20} {antes:10.4g} -> {ahora:10.4g} por calibración  {razon:6.2f}x  {marca}")
+            regresiones += regresion
+        if regresiones:
+            print(f"{regresiones} benchmark(s) más de {tolerancia:.0%} por debajo de {ruta}")
+            sys.exit(1)
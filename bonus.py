@@ -0,0 +1,205 @@
+import sys
+import time
+
+from estado import BONUS, CASA, COLOR_INDICE, INTERNO, EstadoCompacto
+from ia import evaluar, utilidad
+from movimientos import destino_legal, fichas_movibles, make_move, unmake_move
+from nucleo import COLORS, HOME_SIZE
+
+# =============================================================================
+# REPARTO DEL BONUS
+# =============================================================================
+# Busca la mejor forma de gastar un bonus: una secuencia de movimientos
+# (ficha, pasos) con pasos <= bonus restante, donde una captura (+20) o una
+# llegada a la casa (+10) en el camino se suman al bonus. También se puede
+# parar y guardar lo que sobra para el próximo turno.
+#
+# El valor de un reparto es ia.utilidad(ia.evaluar(...)) de la posición final:
+# avance propio, bonus guardado y ventaja sobre el mejor rival, así que una
+# captura vale por el bonus que da y por el avance que le quita al rival.
+#
+# Programación dinámica con memoria sobre (posiciones, bonus restante, primera
+# ficha que aún puede mover); el bonus restante está en el propio estado, así
+# que la clave es (estado.clave(), equipo, desde): el mismo estado tiene otro
+# reparto para cada equipo. Para no repetir el mismo reparto en otro orden,
+# entre dos ganancias de bonus cada ficha mueve a lo sumo una vez
+# y en orden de índice; una captura o una llegada abre un tramo nuevo en el que
+# todas pueden volver a mover. Como cada paso de avance vale lo mismo, de cada
+# ficha solo se prueban los pasos que importan: los que capturan o llegan a la
+# casa, el máximo legal y el máximo legal que deja justo lo necesario para un
+# movimiento especial de una ficha posterior.
+
+MAX_MEMO = 200_000  # Posiciones memorizadas antes de vaciar la tabla
+
+
+def _pasos_legales(estado, equipo, indice, restante):
+    # (pasos legales <= restante, pasos especiales: capturan o llegan a la casa)
+    legales = []
+    especiales = []
+    ocupadas = estado.ocupadas
+    for pasos in range(1, restante + 1):
+        codigo = destino_legal(estado, equipo, indice, pasos)
+        if codigo < 0:
+            continue
+        legales.append(pasos)
+        if codigo == CASA:
+            especiales.append(pasos)
+        elif codigo < INTERNO:
+            bit = 1 << (codigo - 1)
+            if any(ocupadas[otro] & bit for otro in range(len(COLORS)) if otro != equipo):
+                especiales.append(pasos)
+    return legales, especiales
+
+def _maximo_hasta(legales, limite):
+    mejor = None
+    for pasos in legales:
+        if pasos > limite:
+            break
+        mejor = pasos
+    return mejor
+
+
+class RepartidorBonus:
+    def __init__(self, max_memo=MAX_MEMO):
+        self.max_memo = max_memo
+        self.memo = {}  # (clave del estado, equipo, desde) -> (valor, primer movimiento o None, siguiente desde)
+        self.nodos = 0
+
+    def _candidatos(self, estado, equipo, desde):
+        # [(índice, pasos)] a probar desde este nodo, ficha por ficha
+        restante = estado.datos[BONUS + equipo]
+        fichas = [(i, *_pasos_legales(estado, equipo, i, restante)) for i in fichas_movibles(estado, equipo) if i >= desde]
+        candidatos = []
+        for k, (indice, legales, especiales) in enumerate(fichas):
+            if not legales:
+                continue
+            pasos = set(especiales)
+            pasos.add(legales[-1])
+            for _, _, especiales_despues in fichas[k + 1:]:
+                for especial in especiales_despues:
+                    maximo = _maximo_hasta(legales, restante - especial)
+                    if maximo is not None:
+                        pasos.add(maximo)
+            candidatos.extend((indice, p) for p in sorted(pasos, reverse=True))
+        return candidatos
+
+    def _mejor(self, estado, equipo, desde):
+        clave = (estado.clave(), equipo, desde)
+        guardado = self.memo.get(clave)
+        if guardado is not None:
+            return guardado
+        self.nodos += 1
+        datos = estado.datos
+        mejor = (utilidad(evaluar(estado), equipo), None, None)  # Parar aquí
+        if datos[BONUS + equipo] > 0:
+            for indice, pasos in self._candidatos(estado, equipo, desde):
+                datos[BONUS + equipo] -= pasos
+                registro = make_move(estado, (indice, pasos))
+                siguiente = 0 if registro[3] else indice + 1  # Con bonus nuevo empieza otro tramo
+                valor = self._mejor(estado, equipo, siguiente)[0]
+                unmake_move(estado, registro)
+                datos[BONUS + equipo] += pasos
+                if valor > mejor[0]:
+                    mejor = (valor, (indice, pasos), siguiente)
+        self.memo[clave] = mejor
+        return mejor
+
+    def resolver(self, estado, equipo, desde=0):
+        # (valor, [(índice, pasos), ...]) del mejor reparto del bonus que el
+        # estado tiene para el equipo; la lista vacía es no mover
+        if len(self.memo) > self.max_memo:
+            self.memo = {}
+        estado = estado.copia()
+        valor, movimiento, siguiente = self._mejor(estado, equipo, desde)
+        secuencia = []
+        while movimiento is not None:
+            secuencia.append(movimiento)
+            estado.datos[BONUS + equipo] -= movimiento[1]
+            make_move(estado, movimiento)
+            _, movimiento, siguiente = self._mejor(estado, equipo, siguiente)
+        return valor, secuencia
+
+    def repartos(self, estado, equipo):
+        # Cada primer movimiento legal (sin podar) con el valor del mejor
+        # reparto que empieza por él, de mejor a peor; (valor, []) es parar
+        estado = estado.copia()
+        datos = estado.datos
+        opciones = [(utilidad(evaluar(estado), equipo), [])]
+        for indice in fichas_movibles(estado, equipo):
+            for pasos in _pasos_legales(estado, equipo, indice, datos[BONUS + equipo])[0]:
+                datos[BONUS + equipo] -= pasos
+                registro = make_move(estado, (indice, pasos))
+                valor, resto = self.resolver(estado, equipo, 0 if registro[3] else indice + 1)
+                unmake_move(estado, registro)
+                datos[BONUS + equipo] += pasos
+                opciones.append((valor, [(indice, pasos)] + resto))
+        opciones.sort(key=lambda opcion: -opcion[0])
+        return opciones
+
+
+class AgenteBonus:
+    # Reparte el bonus con RepartidorBonus y deja las demás decisiones al
+    # agente de respaldo (si lo hay). Es también el modo auto_bonus de Game.
+    def __init__(self, respaldo=None, repartidor=None):
+        self.respaldo = respaldo
+        self.repartidor = repartidor or RepartidorBonus()
+
+    def sacar_de_carcel(self, juego, equipo, dados):
+        return self.respaldo.sacar_de_carcel(juego, equipo, dados)
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        return self.respaldo.elegir_fichas(juego, equipo, movibles, pasos)
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        # Game pide un movimiento a la vez; se devuelve el primero del mejor
+        # reparto (los siguientes ya quedan en la memoria del repartidor)
+        estado = EstadoCompacto.desde_juego(juego)
+        t = COLOR_INDICE[equipo.color]
+        _, secuencia = self.repartidor.resolver(estado, t)
+        if not secuencia:
+            return []
+        indice, pasos = secuencia[0]
+        return [(f, pasos) for f in movibles if t * HOME_SIZE + f.id == indice]
+
+
+if __name__ == "__main__":
+    # python bonus.py medir [partidas]
+    # python bonus.py probar [partidas]
+    from agentes import AgenteCodicioso
+
+    accion = sys.argv[1] if len(sys.argv) > 1 else "medir"
+    if accion == "medir":
+        # Tiempo de resolver cada bonus que aparece en partidas codiciosas
+        import random
+        from nucleo import Game
+
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+        repartidor = RepartidorBonus()
+        tiempos = []
+
+        def medir_bonus(juego, equipo, movibles, restantes):
+            estado = EstadoCompacto.desde_juego(juego)
+            repartidor.memo = {}
+            inicio = time.perf_counter()
+            repartidor.resolver(estado, COLOR_INDICE[equipo.color])
+            tiempos.append(time.perf_counter() - inicio)
+            return AgenteCodicioso().elegir_bonus(juego, equipo, movibles, restantes)
+
+        for seed in range(n):
+            agentes = {color: AgenteCodicioso() for color in COLORS}
+            for agente in agentes.values():
+                agente.elegir_bonus = lambda *args: medir_bonus(*args)
+            Game("YGRB", agentes=agentes, rng=random.Random(seed), silencioso=True).run(2000)
+        tiempos.sort()
+        print(f"{len(tiempos)} repartos: mediana {tiempos[len(tiempos) // 2] * 1000:.2f} ms, "
+              f"promedio {sum(tiempos) / len(tiempos) * 1000:.2f} ms, máximo {tiempos[-1] * 1000:.1f} ms")
+    else:
+        from simulacion import simulate
+
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+        agentes = {color: AgenteCodicioso() for color in COLORS}
+        agentes[COLORS[0]] = AgenteBonus(AgenteCodicioso())
+        victorias = 0
+        for orden in ("YGRB", "GRBY", "RBYG", "BYGR"):
+            victorias += simulate(n // 4, 0, agentes, orden)["victorias"][COLORS[0]]
+        print(f"AgenteBonus contra tres AgenteCodicioso: {victorias / (n // 4 * 4):.1%} de victorias")
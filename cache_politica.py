@@ -0,0 +1,204 @@
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import OrderedDict
+
+from estado import BONUS, CASA, COLOR_INDICE, DOBLES, INTERNO, ORDEN, TAMANO, TURNO, codificar
+from nucleo import BOARD_SIZE, COLORS, HOME_SIZE
+
+# =============================================================================
+# CACHÉ DE DECISIONES
+# =============================================================================
+# Guarda lo que un agente decidió en una posición para no volver a buscarlo:
+#   sacar_de_carcel  clave (posición, dados)   -> sale o no
+#   elegir_fichas    clave (posición, pasos)   -> ids de las fichas en orden
+#   elegir_bonus     clave (posición)          -> opciones (id, pasos) en orden
+# (Game solo pregunta por ficha con la suma de los dados o con el dado que
+# queda después de sacar una ficha, así que ahí los dados son los pasos).
+#
+# La posición es canónica: el tablero es simétrico por rotaciones de
+# BOARD_SIZE / 4 casillas (salidas, seguros y llegadas están a esa distancia),
+# así que se rota para que el equipo que decide sea siempre el primero. Una
+# misma situación de cualquier color comparte la entrada; las fichas conservan
+# su id, de modo que la respuesta vale tal cual para el otro color.
+#
+# La caché tiene un tamaño máximo y expulsa la entrada usada hace más tiempo
+# (LRU). Se puede compartir entre agentes y juegos, y guardar en un archivo
+# para cargarla al empezar la siguiente ejecución.
+
+TAMANO_CACHE = 100_000
+
+DESFASE = BOARD_SIZE // len(COLORS)
+
+# ROTAR[k][código]: código visto desde el equipo k (el equipo k pasa a ser el 0)
+ROTAR = [[(c - 1 - DESFASE * k) % BOARD_SIZE + 1 if 0 < c < INTERNO else c for c in range(CASA + 1)]
+         for k in range(len(COLORS))]
+
+TIPO_CARCEL = 0
+TIPO_FICHAS = 1
+TIPO_BONUS = 2  # El bonus restante ya está en la posición
+
+MAGICO = b"PQCACHE\x01"
+BYTES_CLAVE = 2 * TAMANO + 2
+_ENTRADA = struct.Struct(f"<{BYTES_CLAVE}sH")
+_OPCION = struct.Struct("<BH")
+
+def clave_canonica(juego, equipo, tipo, tirada):
+    # Bytes de la posición vista desde `equipo` (color), más el tipo de
+    # decisión y la tirada (dados ordenados o pasos)
+    k = COLOR_INDICE[equipo]
+    rotar = ROTAR[k]
+    datos = array("h", bytes(2 * TAMANO))
+    n = len(COLORS)
+    for t, color in enumerate(COLORS):
+        destino = (t - k) % n
+        team = juego.teams[color]
+        base = destino * HOME_SIZE
+        for ficha in team.pieces:
+            datos[base + ficha.id] = rotar[codificar(ficha.state, ficha.position)]
+        datos[BONUS + destino] = juego.bonus_moves.get(color, 0)
+        datos[DOBLES + destino] = juego.doubles_count[color]
+    datos[TURNO] = juego.turn_index
+    for i, color in enumerate(juego.turn_order):
+        datos[ORDEN + i] = (COLOR_INDICE[color] - k) % n
+    return datos.tobytes() + bytes((tipo, tirada))
+
+
+class CachePolitica:
+    def __init__(self, tamano=TAMANO_CACHE):
+        self.tamano = tamano
+        self.entradas = OrderedDict()  # clave -> bytes de la decisión
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def buscar(self, clave):
+        valor = self.entradas.get(clave)
+        if valor is None:
+            self.fallos += 1
+            return None
+        self.entradas.move_to_end(clave)
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave, valor):
+        self.entradas[clave] = valor
+        self.entradas.move_to_end(clave)
+        while len(self.entradas) > self.tamano:
+            self.entradas.popitem(last=False)
+            self.expulsiones += 1
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self.entradas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "expulsiones": self.expulsiones,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+        }
+
+    def guardar_archivo(self, ruta):
+        # De la menos a la más usada, para que al cargar se conserve el orden
+        # LRU; se escribe aparte y se reemplaza de una vez
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(MAGICO)
+            for clave, valor in self.entradas.items():
+                archivo.write(_ENTRADA.pack(clave, len(valor)) + valor)
+        os.replace(temporal, ruta)
+
+    def cargar_archivo(self, ruta):
+        # Agrega las entradas del archivo (si existe); devuelve cuántas leyó
+        if not os.path.exists(ruta):
+            return 0
+        with open(ruta, "rb") as archivo:
+            crudo = archivo.read()
+        if not crudo.startswith(MAGICO):
+            raise Exception(f"{ruta} no es un archivo de caché de decisiones.")
+        posicion = len(MAGICO)
+        leidas = 0
+        while posicion + _ENTRADA.size <= len(crudo):
+            clave, largo = _ENTRADA.unpack_from(crudo, posicion)
+            posicion += _ENTRADA.size
+            self.guardar(clave, crudo[posicion:posicion + largo])
+            posicion += largo
+            leidas += 1
+        return leidas
+
+
+class AgenteConCache:
+    # Envuelve a cualquier agente y le ahorra las decisiones que ya tomó en
+    # la misma posición. Si el agente fue consultado por la cárcel, la ficha
+    # de ese turno también se le pregunta (puede haber planeado el turno
+    # completo, como ia.AgenteExpectimax).
+    def __init__(self, agente, cache=None):
+        self.agente = agente
+        self.cache = cache if cache is not None else CachePolitica()
+        self._consultado = False
+
+    def sacar_de_carcel(self, juego, equipo, dados):
+        d1, d2 = sorted(dados)
+        clave = clave_canonica(juego, equipo.color, TIPO_CARCEL, d1 << 4 | d2)
+        valor = self.cache.buscar(clave)
+        if valor is not None:
+            self._consultado = False
+            return valor == b"\x01"
+        self._consultado = True
+        sale = bool(self.agente.sacar_de_carcel(juego, equipo, dados))
+        self.cache.guardar(clave, b"\x01" if sale else b"\x00")
+        return sale
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        clave = clave_canonica(juego, equipo.color, TIPO_FICHAS, pasos)
+        consultado, self._consultado = self._consultado, False
+        if consultado:
+            self.cache.fallos += 1
+            valor = None
+        else:
+            valor = self.cache.buscar(clave)
+        if valor is None:
+            fichas = list(self.agente.elegir_fichas(juego, equipo, movibles, pasos))
+            self.cache.guardar(clave, bytes(f.id for f in fichas))
+            return fichas
+        por_id = {f.id: f for f in movibles}
+        return [por_id[i] for i in valor if i in por_id]
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        clave = clave_canonica(juego, equipo.color, TIPO_BONUS, 0)
+        valor = self.cache.buscar(clave)
+        if valor is None:
+            opciones = list(self.agente.elegir_bonus(juego, equipo, movibles, restantes))
+            self.cache.guardar(clave, b"".join(_OPCION.pack(f.id, p) for f, p in opciones))
+            return opciones
+        por_id = {f.id: f for f in movibles}
+        return [(por_id[i], p) for i, p in _OPCION.iter_unpack(valor) if i in por_id]
+
+
+if __name__ == "__main__":
+    # python cache_politica.py probar [partidas] [archivo]
+    # Partidas de AgenteExpectimax contra sí mismo con y sin caché compartida
+    from ia import AgenteExpectimax
+    from simulacion import jugar_partida
+
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    ruta = sys.argv[3] if len(sys.argv) > 3 else None
+    cache = CachePolitica()
+    if ruta:
+        print(f"{cache.cargar_archivo(ruta)} entradas cargadas de {ruta}")
+    for con_cache in (False, True):
+        inicio = time.perf_counter()
+        for i in range(n):
+            agentes = {color: AgenteExpectimax(2, 0.01) for color in COLORS}
+            if con_cache:
+                agentes = {color: AgenteConCache(agente, cache) for color, agente in agentes.items()}
+            jugar_partida(agentes, "YGRB", i)
+        print(f"{'con' if con_cache else 'sin'} caché: {time.perf_counter() - inicio:.2f} s")
+    print(cache.estadisticas())
+    if ruta:
+        cache.guardar_archivo(ruta)
@@ -0,0 +1,66 @@
+import random
+from collections import deque
+
+# =============================================================================
+# FUENTES DE DADOS
+# =============================================================================
+# Game.roll_dice le pide cada tirada a una fuente de dados: un objeto con
+# lanzar() -> (d1, d2). Con la misma fuente (y la misma semilla) una partida
+# siempre recibe los mismos dados, sin depender del generador global.
+
+# Las 36 tiradas posibles; una tirada pregenerada es un byte 0..35
+TIRADAS = [(d1, d2) for d1 in range(1, 7) for d2 in range(1, 7)]
+
+TAMANO_BLOQUE = 4096
+
+
+class DadosAleatorios:
+    # Dos randint por tirada sobre un random.Random propio (o el módulo
+    # random si no se da ninguno). Es la fuente por defecto de Game.
+    def __init__(self, rng=None):
+        self.rng = rng or random
+
+    def lanzar(self):
+        return self.rng.randint(1, 6), self.rng.randint(1, 6)
+
+
+class DadosPregenerados:
+    # Genera las tiradas por bloques con NumPy (un byte por tirada) y las
+    # entrega con un cursor; cada tirada cuesta un par de índices en lugar de
+    # dos llamadas al generador. Un bloque de 10**6 tiradas ocupa 1 MB.
+    def __init__(self, seed=None, tamano=TAMANO_BLOQUE):
+        import numpy as np
+
+        self.generador = np.random.default_rng(seed)
+        self.tamano = tamano
+        self.bloque = b""
+        self.cursor = 0
+
+    def _rellenar(self):
+        self.bloque = self.generador.integers(0, len(TIRADAS), size=self.tamano, dtype="u1").tobytes()
+        self.cursor = 0
+
+    def lanzar(self):
+        if self.cursor == len(self.bloque):
+            self._rellenar()
+        tirada = TIRADAS[self.bloque[self.cursor]]
+        self.cursor += 1
+        return tirada
+
+
+class DadosGuionados:
+    # Entrega las tiradas dadas en orden (pruebas, partidas grabadas). Al
+    # agotarse sigue con la fuente de respaldo, o falla si no hay.
+    def __init__(self, tiradas=(), respaldo=None):
+        self.tiradas = deque(tuple(t) for t in tiradas)
+        self.respaldo = respaldo
+
+    def agregar(self, tirada):
+        self.tiradas.append(tuple(tirada))
+
+    def lanzar(self):
+        if self.tiradas:
+            return self.tiradas.popleft()
+        if self.respaldo is None:
+            raise Exception("Se acabaron las tiradas del guion.")
+        return self.respaldo.lanzar()
@@ -0,0 +1,329 @@
+import asyncio
+import json
+import random
+import struct
+import sys
+import time
+
+from estado import CARCEL, COLOR_INDICE, NUM_FICHAS, codificar
+from eventos import (AvanceInterno, EntradaPistaInterna, EstadoCambiado, FichaEncarcelada, FichaMovida, LlegadaCasa,
+                     PartidaTerminada, SalidaCarcel)
+from nucleo import COLORS, HOME_SIZE
+
+# =============================================================================
+# FLUJO PARA ESPECTADORES
+# =============================================================================
+# En lugar de la foto completa del tablero, a los espectadores se les envían
+# solo las fichas que cambiaron. Cada fotograma es binario:
+#   cabecera  tipo (B), secuencia (I), n (B)
+#   n pares   ficha (B, índice de estado.py), código (B, como en estado.py)
+# Tipos:
+#   DELTA  fichas que cambiaron desde el fotograma anterior; la secuencia sube
+#          de uno en uno
+#   CLAVE  las 16 fichas, con la secuencia del último DELTA que incluyen; se
+#          envía cada INTERVALO_CLAVE deltas y al conectarse un espectador
+#   FIN    fin de la partida (n = 0)
+# Game avisa con FichaMovida, SalidaCarcel, EntradaPistaInterna, AvanceInterno,
+# LlegadaCasa y FichaEncarcelada qué ficha tocó; el DELTA se arma en el
+# siguiente EstadoCambiado (el mismo aviso que usa update_ui_callback) solo con
+# esas fichas, así que el costo y los bytes dependen de los cambios y no del
+# tablero.
+
+TIPO_DELTA = 1
+TIPO_CLAVE = 2
+TIPO_FIN = 3
+
+INTERVALO_CLAVE = 32
+LIMITE_BUFFER = 1 << 16  # Bytes sin enviar a un espectador antes de desconectarlo
+
+_CABECERA = struct.Struct("<BIB")
+
+def fotograma(tipo, secuencia, cambios):
+    # cambios: [(índice de ficha, código)]
+    return _CABECERA.pack(tipo, secuencia, len(cambios)) + bytes(x for par in cambios for x in par)
+
+def leer_fotograma(crudo):
+    # (tipo, secuencia, [(índice, código)]) de un fotograma completo
+    tipo, secuencia, n = _CABECERA.unpack_from(crudo)
+    pares = crudo[_CABECERA.size:_CABECERA.size + 2 * n]
+    return tipo, secuencia, list(zip(pares[::2], pares[1::2]))
+
+
+class FlujoCambios:
+    # Escucha el bus del juego y entrega cada fotograma (bytes) a los oyentes
+    # suscritos. Suscribirse antes de que empiece la partida (o desde el hilo
+    # del juego): el fotograma CLAVE inicial lee todas las fichas.
+    def __init__(self, juego, intervalo_clave=INTERVALO_CLAVE):
+        self.juego = juego
+        self.intervalo_clave = intervalo_clave
+        self.secuencia = 0
+        self.pendientes = {}  # índice -> ficha tocada desde el último DELTA
+        self.oyentes = []
+        self.bytes_enviados = 0
+        self.fotogramas = 0
+        bus = juego.bus
+        self.suscripciones = [
+            bus.suscribir(self._tocada, (FichaMovida, SalidaCarcel, EntradaPistaInterna, AvanceInterno, LlegadaCasa,
+                                         FichaEncarcelada)),
+            bus.suscribir(self._publicar, EstadoCambiado),
+            bus.suscribir(self._terminar, PartidaTerminada),
+        ]
+
+    def suscribir(self, oyente):
+        self.oyentes.append(oyente)
+        oyente(self.clave())
+
+    def clave(self):
+        cambios = []
+        for color in COLORS:
+            base = COLOR_INDICE[color] * HOME_SIZE
+            cambios.extend((base + f.id, codificar(f.state, f.position)) for f in self.juego.teams[color].pieces)
+        return fotograma(TIPO_CLAVE, self.secuencia, cambios)
+
+    def _tocada(self, evento):
+        ficha = evento.ficha
+        self.pendientes[COLOR_INDICE[ficha.team] * HOME_SIZE + ficha.id] = ficha
+
+    def _emitir(self, crudo):
+        self.bytes_enviados += len(crudo)
+        self.fotogramas += 1
+        for oyente in self.oyentes:
+            oyente(crudo)
+
+    def _publicar(self, evento=None):
+        if not self.pendientes:
+            return
+        pendientes, self.pendientes = self.pendientes, {}
+        self.secuencia += 1
+        self._emitir(fotograma(TIPO_DELTA, self.secuencia,
+                               [(i, codificar(f.state, f.position)) for i, f in sorted(pendientes.items())]))
+        if self.secuencia % self.intervalo_clave == 0:
+            self._emitir(self.clave())
+
+    def _terminar(self, evento):
+        self._publicar()
+        self._emitir(fotograma(TIPO_FIN, self.secuencia, ()))
+
+    def terminar(self):
+        for suscripcion in self.suscripciones:
+            self.juego.bus.desuscribir(suscripcion)
+
+
+class VistaEspectador:
+    # Lado del espectador: aplica los fotogramas y arma la misma foto que
+    # interfaz.foto_tablero, lista para BoardRenderer.render
+    def __init__(self):
+        self.codigos = None  # None hasta recibir el primer CLAVE
+        self.secuencia = -1
+        self.terminada = False
+
+    def aplicar(self, crudo):
+        # Devuelve False si el fotograma no encaja (se espera el próximo CLAVE)
+        tipo, secuencia, cambios = leer_fotograma(crudo)
+        if tipo == TIPO_FIN:
+            self.terminada = True
+            return True
+        if tipo == TIPO_CLAVE:
+            self.codigos = [CARCEL] * NUM_FICHAS
+        elif self.codigos is None or secuencia != self.secuencia + 1:
+            self.codigos = None
+            return False
+        for indice, codigo in cambios:
+            self.codigos[indice] = codigo
+        self.secuencia = secuencia
+        return True
+
+    def foto(self):
+        from interfaz import FOTO_VACIA, foto_codigos
+        if self.codigos is None:
+            return FOTO_VACIA
+        return foto_codigos(self.codigos)
+
+# =============================================================================
+# DIFUSIÓN POR SOCKET
+# =============================================================================
+# DifusorEspectadores reparte los fotogramas de un FlujoCambios a todos los
+# espectadores conectados por TCP. El juego puede correr en otro hilo: los
+# fotogramas pasan al event loop con call_soon_threadsafe. Un espectador que
+# se conecta recibe el último CLAVE y los DELTA posteriores; uno que no lee y
+# acumula más de LIMITE_BUFFER bytes se desconecta (al volver recibe un CLAVE).
+
+class DifusorEspectadores:
+    def __init__(self, flujo, limite_buffer=LIMITE_BUFFER):
+        self.flujo = flujo
+        self.limite_buffer = limite_buffer
+        self.escritores = set()
+        self.clave = b""
+        self.desde_clave = []  # DELTA posteriores al último CLAVE
+        self.fin = None
+        self.desconectados = 0
+        self.loop = None
+
+    async def iniciar(self, host="127.0.0.1", puerto=8766):
+        self.loop = asyncio.get_running_loop()
+        self.flujo.suscribir(self.recibir)
+        return await asyncio.start_server(self.atender, host, puerto)
+
+    def recibir(self, crudo):
+        # Oyente del flujo; puede llamarse desde el hilo del juego
+        self.loop.call_soon_threadsafe(self._difundir, crudo)
+
+    def _difundir(self, crudo):
+        tipo = crudo[0]
+        if tipo == TIPO_CLAVE:
+            self.clave = crudo
+            self.desde_clave = []
+        elif tipo == TIPO_DELTA:
+            self.desde_clave.append(crudo)
+        else:
+            self.fin = crudo
+        for escritor in list(self.escritores):
+            if escritor.transport.get_write_buffer_size() > self.limite_buffer:
+                self._cerrar(escritor)
+                self.desconectados += 1
+            else:
+                escritor.write(crudo)
+        if self.fin is not None:
+            for escritor in list(self.escritores):
+                self._cerrar(escritor)
+
+    def _cerrar(self, escritor):
+        self.escritores.discard(escritor)
+        escritor.close()
+
+    async def atender(self, lector, escritor):
+        escritor.write(self.clave + b"".join(self.desde_clave))
+        if self.fin is not None:
+            escritor.write(self.fin)
+            escritor.close()
+            return
+        self.escritores.add(escritor)
+        try:
+            await lector.read()  # Los espectadores no envían nada; se espera el cierre
+        except ConnectionError:
+            pass
+        finally:
+            self._cerrar(escritor)
+
+
+async def ver(host, puerto, vista=None, al_cambiar=None):
+    # Cliente espectador: aplica los fotogramas hasta el FIN o el cierre y
+    # devuelve la vista. al_cambiar(vista) se llama con cada fotograma aplicado.
+    vista = vista or VistaEspectador()
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while not vista.terminada:
+            try:
+                cabecera = await lector.readexactly(_CABECERA.size)
+                pares = await lector.readexactly(2 * cabecera[-1])
+            except asyncio.IncompleteReadError:
+                break
+            if vista.aplicar(cabecera + pares) and al_cambiar is not None:
+                al_cambiar(vista)
+    finally:
+        escritor.close()
+    return vista
+
+
+if __name__ == "__main__":
+    # python espectadores.py medir [partidas]
+    # python espectadores.py servir [puerto] [segundos_por_turno]
+    # python espectadores.py ver [host] [puerto]
+    # python espectadores.py prueba [espectadores]
+    from agentes import AgenteCodicioso
+    from nucleo import Game
+    from simulacion import MAX_TURNOS
+
+    def juego_codicioso(seed):
+        return Game("YGRB", agentes={color: AgenteCodicioso() for color in COLORS},
+                    rng=random.Random(seed), silencioso=True)
+
+    accion = sys.argv[1] if len(sys.argv) > 1 else "medir"
+    if accion == "medir":
+        # Bytes y tiempo por cambio del tablero: flujo de deltas contra la foto
+        # completa (interfaz.FotosTablero) enviada como JSON
+        from interfaz import FotosTablero
+
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+        totales = {"cambios": 0, "json": 0, "flujo": 0, "t_flujo": 0.0, "t_foto": 0.0}
+
+        def cronometrar(funcion, clave):
+            def medida(evento=None):
+                inicio = time.perf_counter()
+                funcion(evento)
+                totales[clave] += time.perf_counter() - inicio
+            return medida
+
+        for seed in range(n):
+            juego = juego_codicioso(seed)
+            flujo = FlujoCambios(juego)
+            fotos_tablero = FotosTablero(juego)
+            # Se reemplazan las suscripciones por versiones cronometradas
+            juego.bus.desuscribir(flujo.suscripciones[1])
+            juego.bus.desuscribir(fotos_tablero.suscripcion)
+            juego.bus.suscribir(cronometrar(flujo._publicar, "t_flujo"), EstadoCambiado)
+            juego.bus.suscribir(cronometrar(fotos_tablero.publicar, "t_foto"), EstadoCambiado)
+            ultima = [fotos_tablero.actual[0]]
+
+            def contar(evento):
+                version, foto = fotos_tablero.actual
+                if version != ultima[0]:
+                    ultima[0] = version
+                    totales["json"] += len(json.dumps(dict(foto)))
+                    totales["cambios"] += 1
+
+            juego.bus.suscribir(contar, EstadoCambiado)
+            juego.run(2000)
+            totales["flujo"] += flujo.bytes_enviados
+        cambios = totales["cambios"]
+        print(f"{cambios} cambios del tablero en {n} partidas")
+        print(f"  foto completa: {totales['json'] / cambios:6.0f} bytes, {totales['t_foto'] / cambios * 1e6:5.1f} us por cambio")
+        print(f"  flujo:         {totales['flujo'] / cambios:6.1f} bytes, {totales['t_flujo'] / cambios * 1e6:5.1f} us por cambio")
+    elif accion == "servir":
+        puerto = int(sys.argv[2]) if len(sys.argv) > 2 else 8766
+        pausa = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+
+        async def servir():
+            juego = juego_codicioso(None)
+            difusor = DifusorEspectadores(FlujoCambios(juego))
+            tcp = await difusor.iniciar(puerto=puerto)
+            print(f"Espectadores en el puerto {puerto}")
+            async with tcp:
+                while not juego.juego_terminado() and juego.turnos < MAX_TURNOS:
+                    juego.turno()
+                    await asyncio.sleep(pausa)
+                juego.emitir(PartidaTerminada, juego.ganador(), juego.turnos)
+                await asyncio.sleep(1)
+
+        asyncio.run(servir())
+    elif accion == "ver":
+        host = sys.argv[2] if len(sys.argv) > 2 else "127.0.0.1"
+        puerto = int(sys.argv[3]) if len(sys.argv) > 3 else 8766
+        vista = asyncio.run(ver(host, puerto, al_cambiar=lambda v: print(v.secuencia, dict(v.foto()))))
+    else:
+        # Muchos espectadores, algunos entrando tarde, contra el juego real
+        espectadores = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+        async def prueba():
+            juego = juego_codicioso(7)
+            flujo = FlujoCambios(juego)
+            difusor = DifusorEspectadores(flujo)
+            tcp = await difusor.iniciar(puerto=0)
+            puerto = tcp.sockets[0].getsockname()[1]
+            tareas = []
+            inicio = time.perf_counter()
+            while not juego.juego_terminado() and juego.turnos < MAX_TURNOS:
+                if len(tareas) < espectadores:
+                    tareas.append(asyncio.ensure_future(ver("127.0.0.1", puerto)))
+                juego.turno()
+                await asyncio.sleep(0)
+            juego.emitir(PartidaTerminada, juego.ganador(), juego.turnos)
+            vistas = await asyncio.gather(*tareas)
+            duracion = time.perf_counter() - inicio
+            tcp.close()
+            final = [codificar(f.state, f.position) for color in COLORS for f in juego.teams[color].pieces]
+            iguales = sum(v.codigos == final for v in vistas)
+            print(f"{iguales}/{len(vistas)} espectadores con el tablero final correcto; "
+                  f"{flujo.fotogramas} fotogramas, {flujo.bytes_enviados} bytes por espectador, {duracion:.2f} s")
+
+        asyncio.run(prueba())
@@ -0,0 +1,314 @@
+from array import array
+
+from nucleo import BOARD_SIZE, COLORS, FINISH_TRACK_LENGTH, HOME_SIZE, Board, Game, Piece, Team
+
+# =============================================================================
+# ESTADO COMPACTO
+# =============================================================================
+# Las 16 fichas se guardan como enteros pequeños en un único array:
+#   0                    -> cárcel
+#   1 .. 68              -> casilla del tablero externo
+#   69 .. 75             -> pista interna (69 + índice)
+#   76                   -> casa (equivale al índice 7 de la pista interna)
+# La ficha `id` del equipo `t` (orden de COLORS) ocupa la posición t*4 + id.
+# Después de las fichas van los bonus y los dobles por equipo, el turno y el
+# orden de turnos (índices de COLORS), de modo que el estado es autocontenido.
+# Además, cada equipo tiene dos máscaras de 68 bits sobre el tablero externo:
+# `ocupadas` (al menos una ficha) y `pares` (dos fichas en la misma casilla).
+
+CARCEL = 0
+INTERNO = BOARD_SIZE + 1
+CASA = INTERNO + FINISH_TRACK_LENGTH - 1
+
+NUM_FICHAS = len(COLORS) * HOME_SIZE
+BONUS = NUM_FICHAS
+DOBLES = BONUS + len(COLORS)
+TURNO = DOBLES + len(COLORS)
+ORDEN = TURNO + 1
+TAMANO = ORDEN + len(COLORS)
+
+COLOR_INDICE = {color: i for i, color in enumerate(COLORS)}
+
+def codificar(state, position):
+    if state == "carcel":
+        return CARCEL
+    if state == "externo":
+        return position
+    if state == "interno":
+        return INTERNO + position
+    return CASA
+
+def decodificar(codigo):
+    if codigo == CARCEL:
+        return "carcel", None
+    if codigo < INTERNO:
+        return "externo", codigo
+    if codigo < CASA:
+        return "interno", codigo - INTERNO
+    return "casa", None
+
+
+class EstadoCompacto:
+    __slots__ = ("datos", "ocupadas", "pares")
+
+    def __init__(self, datos=None, ocupadas=None, pares=None):
+        if datos is None:
+            datos = array("h", bytes(2 * TAMANO))
+            datos[ORDEN:] = array("h", range(len(COLORS)))
+        self.datos = datos
+        self.ocupadas = ocupadas if ocupadas is not None else [0] * len(COLORS)
+        self.pares = pares if pares is not None else [0] * len(COLORS)
+
+    def copia(self):
+        # Copiar el array es un memcpy; las máscaras son enteros inmutables
+        return EstadoCompacto(self.datos[:], self.ocupadas[:], self.pares[:])
+
+    def equipo_actual(self):
+        return self.datos[ORDEN + self.datos[TURNO]]
+
+    def clave(self):
+        return self.datos.tobytes()
+
+    def __eq__(self, otro):
+        return isinstance(otro, EstadoCompacto) and self.datos == otro.datos
+
+    def __hash__(self):
+        return hash(self.clave())
+
+    def agregar_ocupacion(self, equipo, casilla):
+        bit = 1 << (casilla - 1)
+        if self.ocupadas[equipo] & bit:
+            self.pares[equipo] |= bit
+        else:
+            self.ocupadas[equipo] |= bit
+
+    def quitar_ocupacion(self, equipo, casilla):
+        bit = 1 << (casilla - 1)
+        if self.pares[equipo] & bit:
+            self.pares[equipo] &= ~bit
+        elif self.ocupadas[equipo] & bit:
+            self.ocupadas[equipo] &= ~bit
+
+    def ocupantes(self, casilla):
+        bit = 1 << (casilla - 1)
+        n = 0
+        for equipo in range(len(COLORS)):
+            if self.ocupadas[equipo] & bit:
+                n += 2 if self.pares[equipo] & bit else 1
+        return n
+
+    def casilla_disponible(self, casilla):
+        return self.ocupantes(casilla) < 2
+
+    def fichas_en(self, casilla):
+        # Índices de las fichas en una casilla externa
+        bit = 1 << (casilla - 1)
+        datos = self.datos
+        indices = []
+        for equipo in range(len(COLORS)):
+            if self.ocupadas[equipo] & bit:
+                base = equipo * HOME_SIZE
+                indices.extend(i for i in range(base, base + HOME_SIZE) if datos[i] == casilla)
+        return indices
+
+    def poner(self, indice, codigo):
+        # Cambia el código de una ficha manteniendo las máscaras
+        equipo = indice // HOME_SIZE
+        anterior = self.datos[indice]
+        if CARCEL < anterior < INTERNO:
+            self.quitar_ocupacion(equipo, anterior)
+        if CARCEL < codigo < INTERNO:
+            self.agregar_ocupacion(equipo, codigo)
+        self.datos[indice] = codigo
+
+    def recalcular_mascaras(self):
+        self.ocupadas = [0] * len(COLORS)
+        self.pares = [0] * len(COLORS)
+        for indice in range(NUM_FICHAS):
+            codigo = self.datos[indice]
+            if CARCEL < codigo < INTERNO:
+                self.agregar_ocupacion(indice // HOME_SIZE, codigo)
+
+    @classmethod
+    def desde_juego(cls, juego):
+        estado = cls()
+        datos = estado.datos
+        for color, team in juego.teams.items():
+            t = COLOR_INDICE[color]
+            for ficha in team.pieces:
+                datos[t * HOME_SIZE + ficha.id] = codificar(ficha.state, ficha.position)
+            datos[BONUS + t] = juego.bonus_moves.get(color, 0)
+            datos[DOBLES + t] = juego.doubles_count[color]
+        datos[TURNO] = juego.turn_index
+        datos[ORDEN:] = array("h", [COLOR_INDICE[c] for c in juego.turn_order])
+        estado.recalcular_mascaras()
+        return estado
+
+    def __repr__(self):
+        return f"EstadoCompacto({list(self.datos)})"
+
+# =============================================================================
+# GAME SOBRE EL ESTADO COMPACTO
+# =============================================================================
+# Las clases siguientes exponen la misma interfaz que Piece, Team y Board pero
+# leen y escriben en un EstadoCompacto, así que Game funciona sin cambios.
+# JuegoCompacto juega más o menos a la mitad de la velocidad de Game: cada
+# lectura de una ficha pasa por una propiedad y cada lista de fichas se arma
+# desde el array. Sirve cuando se quiere una partida con agentes y eventos
+# cuyo estado la búsqueda (make_move/unmake_move, ia.py) lee sin convertirlo;
+# para simular muchas partidas conviene Game o simulacion_vectorizada.py.
+
+# Estado y posición de cada código, para no decodificar en cada lectura
+_ESTADOS = [decodificar(codigo)[0] for codigo in range(CASA + 1)]
+_POSICIONES = [decodificar(codigo)[1] for codigo in range(CASA + 1)]
+_TODAS_EN_CASA = array("h", [CASA] * HOME_SIZE)
+
+class PiezaCompacta(Piece):
+    def __init__(self, estado, team, id):
+        self.estado = estado
+        self.indice = COLOR_INDICE[team] * HOME_SIZE + id
+        # No se llama a Piece.__init__ para no borrar un estado ya cargado
+        self.team = team
+        self.id = id
+
+    @property
+    def state(self):
+        return _ESTADOS[self.estado.datos[self.indice]]
+
+    @state.setter
+    def state(self, valor):
+        # Game siempre asigna la posición justo después del estado
+        codigo = self.estado.datos[self.indice]
+        if valor == "externo" and not CARCEL < codigo < INTERNO:
+            codigo = 1
+        elif valor == "interno" and not INTERNO <= codigo < CASA:
+            codigo = INTERNO
+        elif valor in ("carcel", "casa"):
+            codigo = codificar(valor, None)
+        self.estado.datos[self.indice] = codigo
+
+    @property
+    def position(self):
+        return _POSICIONES[self.estado.datos[self.indice]]
+
+    @position.setter
+    def position(self, valor):
+        if valor is None:
+            return
+        codigo = self.estado.datos[self.indice]
+        if INTERNO <= codigo < CASA:
+            self.estado.datos[self.indice] = INTERNO + valor
+        elif CARCEL < codigo < INTERNO:
+            self.estado.datos[self.indice] = valor
+
+
+class EquipoCompacto(Team):
+    def __init__(self, estado, color):
+        self.color = color
+        self.estado = estado
+        self.pieces = [PiezaCompacta(estado, color, i) for i in range(HOME_SIZE)]
+        self.internal = [None] * FINISH_TRACK_LENGTH
+        self.inicio = COLOR_INDICE[color] * HOME_SIZE
+        # home es una lista propia, como en Team: Game le agrega las fichas
+        # en el orden en que llegan (guardado.py lo guarda). El estado no
+        # tiene ese orden, así que las que ya están en casa entran por id.
+        self.home = [p for p in self.pieces if estado.datos[p.indice] == CASA]
+
+    def _codigos(self):
+        inicio = self.inicio
+        return zip(self.pieces, self.estado.datos[inicio:inicio + HOME_SIZE])
+
+    def fichas_en_carcel(self):
+        return [p for p, c in self._codigos() if c == CARCEL]
+
+    def fichas_en_tablero(self):
+        return [p for p, c in self._codigos() if CARCEL < c < INTERNO]
+
+    def fichas_internas(self):
+        return [p for p, c in self._codigos() if INTERNO <= c < CASA]
+
+    def fichas_movibles(self):
+        # Mismo orden que Team: primero las del tablero y luego las internas
+        codigos = list(self._codigos())
+        return [p for p, c in codigos if CARCEL < c < INTERNO] + [p for p, c in codigos if INTERNO <= c < CASA]
+
+    def todas_en_casa(self):
+        inicio = self.inicio
+        return self.estado.datos[inicio:inicio + HOME_SIZE] == _TODAS_EN_CASA
+
+
+class TableroCompacto(Board):
+    def __init__(self, estado, teams):
+        self.estado = estado
+        self.fichas = [p for color in COLORS for p in teams[color].pieces]
+
+    def is_cell_available(self, cell):
+        return self.estado.casilla_disponible(cell)
+
+    def add_piece(self, cell, piece):
+        if self.is_cell_available(cell):
+            self.estado.agregar_ocupacion(COLOR_INDICE[piece.team], cell)
+        else:
+            raise Exception(f"La casilla {cell} ya tiene 2 fichas.")
+
+    def remove_piece(self, cell, piece):
+        self.estado.quitar_ocupacion(COLOR_INDICE[piece.team], cell)
+
+    def get_pieces(self, cell):
+        return [self.fichas[i] for i in self.estado.fichas_en(cell)]
+
+    def __repr__(self):
+        board_str = ""
+        for i in range(1, BOARD_SIZE+1):
+            piezas = self.get_pieces(i)
+            if piezas:
+                board_str += f"{i}:{piezas}  "
+        return board_str
+
+
+class _VistaContadores:
+    # Vista tipo diccionario (color -> entero) sobre una zona del array,
+    # usada para bonus_moves y doubles_count.
+    def __init__(self, datos, base):
+        self.datos = datos
+        self.base = base
+
+    def __getitem__(self, color):
+        return self.datos[self.base + COLOR_INDICE[color]]
+
+    def __setitem__(self, color, valor):
+        self.datos[self.base + COLOR_INDICE[color]] = valor
+
+    def __delitem__(self, color):
+        self[color] = 0
+
+    def __contains__(self, color):
+        return self[color] != 0
+
+    def get(self, color, default=0):
+        valor = self[color]
+        return valor if valor else default
+
+    def items(self):
+        return [(color, self[color]) for color in COLORS if self[color]]
+
+
+class JuegoCompacto(Game):
+    def __init__(self, turn_order, estado=None, **kwargs):
+        self.estado = estado if estado is not None else EstadoCompacto()
+        turn_index = self.estado.datos[TURNO]
+        super().__init__(turn_order, **kwargs)
+        self.turn_index = turn_index
+        self.estado.datos[ORDEN:] = array("h", [COLOR_INDICE[c] for c in self.turn_order])
+        self.teams = {color: EquipoCompacto(self.estado, color) for color in COLORS}
+        self.board = TableroCompacto(self.estado, self.teams)
+        self.bonus_moves = _VistaContadores(self.estado.datos, BONUS)
+        self.doubles_count = _VistaContadores(self.estado.datos, DOBLES)
+
+    @property
+    def turn_index(self):
+        return self.estado.datos[TURNO]
+
+    @turn_index.setter
+    def turn_index(self, valor):
+        self.estado.datos[TURNO] = valor
@@ -0,0 +1,416 @@
+# =============================================================================
+# EVENTOS
+# =============================================================================
+# Game no imprime nada: publica eventos en un BusEventos y quien quiera los
+# escucha (la consola, la interfaz, el grabador de partidas, las
+# estadísticas). Cada tipo de evento tiene un nivel y cada suscriptor un nivel
+# mínimo. Si ningún suscriptor escucha un tipo, emitir() ni siquiera crea el
+# evento, así que una simulación sin oyentes no paga por los mensajes.
+
+DETALLE = 10  # Rechazos, estado del tablero, avisos a la interfaz
+INFO = 20     # Dados, movimientos, capturas, bonus, turnos
+AVISO = 30    # Entradas inválidas y límites alcanzados
+
+
+class Evento:
+    # Eventos de datos, sin texto para la consola
+    __slots__ = ()
+    NIVEL = DETALLE
+
+
+class EventoConsola(Evento):
+    # Eventos con texto: cada uno define texto() y str(evento) es el mensaje
+    # que imprimía Game
+    __slots__ = ()
+    NIVEL = INFO
+
+    def __str__(self):
+        return self.texto()
+
+# ---------------------------------------------------------------- Partida
+
+class PartidaIniciada(EventoConsola):
+    __slots__ = ()
+
+    def texto(self):
+        return "Bienvenido al juego de Parqués"
+
+
+class PartidaTerminada(EventoConsola):
+    __slots__ = ("ganador", "turnos")
+
+    def __init__(self, ganador, turnos):
+        self.ganador = ganador
+        self.turnos = turnos
+
+    def texto(self):
+        return "¡Fin del juego!"
+
+
+class Victoria(EventoConsola):
+    __slots__ = ("equipo",)
+
+    def __init__(self, equipo):
+        self.equipo = equipo
+
+    def texto(self):
+        return f"\n¡El equipo {self.equipo.upper()} ha ganado!"
+
+
+class LimiteTurnos(EventoConsola):
+    __slots__ = ("turnos",)
+    NIVEL = AVISO
+
+    def __init__(self, turnos):
+        self.turnos = turnos
+
+    def texto(self):
+        return "Se alcanzó el máximo de turnos sin ganador."
+
+
+class EstadoTablero(EventoConsola):
+    # El texto se arma solo si alguien lo imprime
+    __slots__ = ("juego",)
+    NIVEL = DETALLE
+
+    def __init__(self, juego):
+        self.juego = juego
+
+    def texto(self):
+        lineas = ["\nEstado del tablero externo:", str(self.juego.board)]
+        for color, team in self.juego.teams.items():
+            lineas.append(f"{color.upper()} - Carcel: {team.fichas_en_carcel()}, En tablero: {team.fichas_en_tablero()}, "
+                          f"Pista interna: {team.fichas_internas()}, Casa: {team.home}")
+        return "\n".join(lineas)
+
+
+class EstadoCambiado(Evento):
+    # Reemplaza a update_callback: algo cambió y la interfaz puede redibujar
+    __slots__ = ()
+
+# ---------------------------------------------------------------- Turnos
+
+class TurnoIniciado(EventoConsola):
+    __slots__ = ("equipo",)
+
+    def __init__(self, equipo):
+        self.equipo = equipo
+
+    def texto(self):
+        return f"\nTurno de {self.equipo.upper()}"
+
+
+class DadosLanzados(EventoConsola):
+    __slots__ = ("equipo", "d1", "d2")
+
+    def __init__(self, equipo, d1, d2):
+        self.equipo = equipo
+        self.d1 = d1
+        self.d2 = d2
+
+    def texto(self):
+        return f"Dados: {self.d1} y {self.d2}"
+
+
+class Dobles(EventoConsola):
+    __slots__ = ("equipo", "cuenta")
+
+    def __init__(self, equipo, cuenta):
+        self.equipo = equipo
+        self.cuenta = cuenta
+
+    def texto(self):
+        return "¡Dados dobles! Obtienes un turno extra."
+
+
+class CastigoDobles(EventoConsola):
+    __slots__ = ("equipo", "ficha")
+
+    def __init__(self, equipo, ficha):
+        self.equipo = equipo
+        self.ficha = ficha
+
+    def texto(self):
+        return f"Tres dobles consecutivos. {self.ficha} es enviada a la cárcel."
+
+
+class TurnoOmitido(EventoConsola):
+    __slots__ = ("equipo", "sin_movimientos")
+
+    def __init__(self, equipo, sin_movimientos):
+        self.equipo = equipo
+        self.sin_movimientos = sin_movimientos  # False: no se tiraron los dados
+
+    def texto(self):
+        if self.sin_movimientos:
+            return f"No hay movimientos posibles para el equipo {self.equipo}. Se salta el turno."
+        return "Comando no reconocido. Se omite el turno."
+
+
+class FinTurno(Evento):
+    # Se emite después de actualizar el turno
+    __slots__ = ("equipo", "turno_extra")
+
+    def __init__(self, equipo, turno_extra):
+        self.equipo = equipo
+        self.turno_extra = turno_extra
+
+# ---------------------------------------------------------------- Movimientos
+
+class SalidaCarcel(EventoConsola):
+    __slots__ = ("ficha", "casilla")
+
+    def __init__(self, ficha, casilla):
+        self.ficha = ficha
+        self.casilla = casilla
+
+    def texto(self):
+        return f"{self.ficha} sale de la cárcel a la casilla {self.casilla}."
+
+
+class SalidaBloqueada(EventoConsola):
+    __slots__ = ("equipo", "casilla")
+    NIVEL = DETALLE
+
+    def __init__(self, equipo, casilla):
+        self.equipo = equipo
+        self.casilla = casilla
+
+    def texto(self):
+        return f"La salida ({self.casilla}) del equipo {self.equipo} está llena."
+
+
+class FichaMovida(EventoConsola):
+    __slots__ = ("ficha", "desde", "hasta")
+
+    def __init__(self, ficha, desde, hasta):
+        self.ficha = ficha
+        self.desde = desde
+        self.hasta = hasta
+
+    def texto(self):
+        return f"{self.ficha} se mueve de la casilla {self.desde} a la {self.hasta}."
+
+
+class EntradaPistaInterna(EventoConsola):
+    __slots__ = ("ficha", "posicion")
+
+    def __init__(self, ficha, posicion):
+        self.ficha = ficha
+        self.posicion = posicion
+
+    def texto(self):
+        return f"{self.ficha} entra a la pista interna en la posición {self.posicion}."
+
+
+class AvanceInterno(EventoConsola):
+    __slots__ = ("ficha", "desde", "hasta")
+
+    def __init__(self, ficha, desde, hasta):
+        self.ficha = ficha
+        self.desde = desde
+        self.hasta = hasta
+
+    def texto(self):
+        return f"{self.ficha} avanza en pista interna de {self.desde} a {self.hasta}."
+
+
+class LlegadaCasa(EventoConsola):
+    __slots__ = ("ficha", "desde_pista_interna")
+
+    def __init__(self, ficha, desde_pista_interna):
+        self.ficha = ficha
+        self.desde_pista_interna = desde_pista_interna
+
+    def texto(self):
+        if self.desde_pista_interna:
+            return f"{self.ficha} ha llegado a la casa desde la pista interna."
+        return f"{self.ficha} ha llegado a la casa."
+
+
+class MovimientoHecho(Evento):
+    # Un movimiento aceptado por Game.mover_ficha (incluye los de bonus)
+    __slots__ = ("ficha", "pasos")
+
+    def __init__(self, ficha, pasos):
+        self.ficha = ficha
+        self.pasos = pasos
+
+
+# Motivos de MovimientoRechazado
+EXCEDE_PISTA = "excede"
+CASILLA_LLENA = "llena"
+BLOQUEO_PROPIO = "bloqueo"
+SEGURO_OCUPADO = "seguro"
+NO_MOVIBLE = "no_movible"
+
+class MovimientoRechazado(EventoConsola):
+    __slots__ = ("ficha", "casilla", "motivo")
+    NIVEL = DETALLE
+
+    def __init__(self, ficha, casilla, motivo):
+        self.ficha = ficha
+        self.casilla = casilla
+        self.motivo = motivo
+
+    def texto(self):
+        if self.motivo == EXCEDE_PISTA:
+            return "Movimiento excede la pista interna; movimiento no permitido."
+        if self.motivo == CASILLA_LLENA:
+            return f"La casilla {self.casilla} está llena. No se puede mover {self.ficha}."
+        if self.motivo == BLOQUEO_PROPIO:
+            return f"Casilla {self.casilla} tiene bloqueo propio. No se permite mover {self.ficha}."
+        if self.motivo == SEGURO_OCUPADO:
+            return f"La casilla {self.casilla} es segura; no se puede capturar. Movimiento no permitido."
+        return "La ficha no se puede mover."
+
+
+class Captura(EventoConsola):
+    __slots__ = ("ficha", "capturada", "casilla")
+
+    def __init__(self, ficha, capturada, casilla):
+        self.ficha = ficha
+        self.capturada = capturada
+        self.casilla = casilla
+
+    def texto(self):
+        return f"{self.ficha} captura a {self.capturada} en la casilla {self.casilla}."
+
+
+class FichaEncarcelada(EventoConsola):
+    # Por captura o por tres dobles
+    __slots__ = ("ficha",)
+
+    def __init__(self, ficha):
+        self.ficha = ficha
+
+    def texto(self):
+        return f"{self.ficha} es capturada y regresa a la cárcel de {self.ficha.team}."
+
+# ---------------------------------------------------------------- Bonus
+
+class BonusOtorgado(EventoConsola):
+    __slots__ = ("equipo", "cantidad")
+
+    def __init__(self, equipo, cantidad):
+        self.equipo = equipo
+        self.cantidad = cantidad
+
+    def texto(self):
+        return f"Se otorgan {self.cantidad} movimientos extra para el equipo {self.equipo}."
+
+
+class BonusPendiente(EventoConsola):
+    __slots__ = ("equipo", "cantidad")
+
+    def __init__(self, equipo, cantidad):
+        self.equipo = equipo
+        self.cantidad = cantidad
+
+    def texto(self):
+        return f"El equipo {self.equipo} tiene {self.cantidad} movimientos extra pendientes."
+
+
+class BonusRestante(EventoConsola):
+    __slots__ = ("equipo", "cantidad")
+    NIVEL = DETALLE
+
+    def __init__(self, equipo, cantidad):
+        self.equipo = equipo
+        self.cantidad = cantidad
+
+    def texto(self):
+        return f"Movimientos bonus restantes: {self.cantidad}"
+
+# ---------------------------------------------------------------- Selección
+
+class FichasMovibles(EventoConsola):
+    __slots__ = ("equipo", "fichas", "bonus")
+
+    def __init__(self, equipo, fichas, bonus):
+        self.equipo = equipo
+        self.fichas = fichas
+        self.bonus = bonus
+
+    def texto(self):
+        if self.bonus:
+            return f"Fichas disponibles para bonus: {self.fichas}"
+        return f"Fichas movibles: {self.fichas}"
+
+
+class SinMovimiento(EventoConsola):
+    __slots__ = ("equipo", "bonus", "sin_fichas")
+    NIVEL = DETALLE
+
+    def __init__(self, equipo, bonus, sin_fichas):
+        self.equipo = equipo
+        self.bonus = bonus
+        self.sin_fichas = sin_fichas  # True: no había fichas; False: ninguna opción fue legal
+
+    def texto(self):
+        if self.bonus:
+            return "No hay fichas que se puedan mover con bonus." if self.sin_fichas else "Ningún movimiento bonus es posible."
+        return "No hay fichas movibles." if self.sin_fichas else "Ninguna ficha se puede mover."
+
+
+class EntradaInvalida(EventoConsola):
+    __slots__ = ("mensaje",)
+    NIVEL = AVISO
+
+    def __init__(self, mensaje):
+        self.mensaje = mensaje
+
+    def texto(self):
+        return self.mensaje
+
+# =============================================================================
+# BUS
+# =============================================================================
+
+class BusEventos:
+    def __init__(self):
+        self._suscripciones = {}  # id -> (función, tipos, nivel)
+        self._siguiente = 0
+        self._oyentes = {}  # tipo -> tupla de funciones, se arma al primer uso
+
+    def suscribir(self, funcion, tipos=Evento, nivel=DETALLE):
+        # `tipos` es una clase o tupla de clases (incluye sus subclases). Solo
+        # llegan los eventos de nivel mayor o igual a `nivel`. Devuelve un id
+        # para desuscribir.
+        self._siguiente += 1
+        self._suscripciones[self._siguiente] = (funcion, tipos, nivel)
+        self._oyentes = {}
+        return self._siguiente
+
+    def desuscribir(self, suscripcion):
+        del self._suscripciones[suscripcion]
+        self._oyentes = {}
+
+    def oyentes(self, tipo):
+        oyentes = self._oyentes.get(tipo)
+        if oyentes is None:
+            oyentes = tuple(funcion for funcion, tipos, nivel in self._suscripciones.values()
+                            if issubclass(tipo, tipos) and tipo.NIVEL >= nivel)
+            self._oyentes[tipo] = oyentes
+        return oyentes
+
+    def emitir(self, tipo, *args):
+        # Crea el evento solo si alguien lo escucha
+        oyentes = self._oyentes.get(tipo)
+        if oyentes is None:
+            oyentes = self.oyentes(tipo)
+        if oyentes:
+            evento = tipo(*args)
+            for funcion in oyentes:
+                funcion(evento)
+
+    def publicar(self, evento):
+        for funcion in self.oyentes(type(evento)):
+            funcion(evento)
+
+
+def imprimir_evento(evento):
+    print(evento.texto())
+
+def suscribir_consola(bus, nivel=DETALLE):
+    return bus.suscribir(imprimir_evento, EventoConsola, nivel)
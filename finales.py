@@ -0,0 +1,376 @@
+import mmap
+import struct
+import sys
+import time
+from math import comb
+
+from agentes import AgenteCodicioso
+from estado import BONUS, CARCEL, CASA, COLOR_INDICE, DOBLES, INTERNO, EstadoCompacto
+from movimientos import BONUS_CASA, make_move
+from nucleo import BOARD_SIZE, COLORS, FINISH_TRACK_LENGTH, HOME_SIZE, SEGURO_LLEGADA
+
+# =============================================================================
+# TABLA DE FINALES
+# =============================================================================
+# Cuando todas las fichas de un equipo están en la casa, en la pista interna o
+# a pocas casillas de su SEGURO_LLEGADA, lo que le falta a ese equipo depende
+# solo de sus dados y de sus decisiones. La tabla guarda, para cada una de esas
+# posiciones, el número esperado de rondas hasta meter las cuatro fichas
+# jugando de forma óptima (análisis retrógrado sobre la distribución de los
+# dados). Una ronda es un turno del equipo más los turnos extra por dobles.
+# Una decisión posible es no mover ninguna ficha (el agente puede no elegir
+# ninguna): sin ella, una ficha que tiene que moverse puede quedar en la
+# última casilla interna, de donde solo sale con bonus.
+#
+# Una posición es el multiconjunto de distancias a la casa (0 en la casa, 1..7
+# en la pista interna, 8.. en el tablero externo), el bonus pendiente y los
+# dobles de la ronda. Se ignoran las fichas rivales (la pista interna es
+# privada; en el tablero externo un rival puede bloquear o ser capturado) y el
+# castigo por tres dobles se cuenta como perder el turno, porque la ficha
+# castigada saldría del dominio de la tabla.
+#
+# Archivo: cabecera CABECERA y luego, por posición, dos float32: W (valor al
+# empezar el turno, antes de gastar el bonus) y R (valor si se deja de gastar
+# el bonus y se tiran los dados). Índice = ((rango * (max_bonus + 1) + bonus) * 3
+# + dobles) * 2; el rango de las distancias ordenadas se calcula con el sistema
+# combinatorio, así que cada consulta es O(1).
+
+MAGICO = b"PARQFIN1"
+CABECERA = struct.Struct("<8sHHI")  # mágico, casillas externas, máximo bonus, posiciones
+
+DISTANCIA_INTERNA = FINISH_TRACK_LENGTH - 1
+CASILLAS_EXTERNAS = 12
+MAX_BONUS = 30
+
+# Probabilidad de cada total de los dados, separando los dobles
+TIRADAS = {}
+for _d1 in range(1, 7):
+    for _d2 in range(1, 7):
+        _clave = (_d1 + _d2, _d1 == _d2)
+        TIRADAS[_clave] = TIRADAS.get(_clave, 0) + 1 / 36
+TIRADAS = sorted(TIRADAS.items())
+
+def rango(distancias):
+    # Rango colex de un multiconjunto ordenado de HOME_SIZE distancias
+    return sum(comb(d + i, i + 1) for i, d in enumerate(distancias))
+
+def distancia(equipo, codigo, casillas_externas=CASILLAS_EXTERNAS):
+    # Pasos que le faltan a la ficha para llegar a la casa, o None si está
+    # fuera del dominio de la tabla (cárcel o lejos del seguro de llegada)
+    if codigo >= INTERNO:
+        return CASA - codigo
+    if codigo == CARCEL:
+        return None
+    faltan = (SEGURO_LLEGADA[COLORS[equipo]] - codigo) % BOARD_SIZE
+    if 0 < faltan <= casillas_externas:
+        return DISTANCIA_INTERNA + faltan
+    return None
+
+def _posiciones(maxima):
+    # Todas las posiciones, de menor a mayor distancia total
+    posiciones = [(a, b, c, d) for a in range(maxima + 1) for b in range(a, maxima + 1)
+                  for c in range(b, maxima + 1) for d in range(c, maxima + 1)]
+    posiciones.sort(key=sum)
+    return posiciones
+
+def _movimientos(posicion, pasos):
+    # (posición nueva, llegó a casa) para cada ficha distinta que puede moverse
+    resultado = []
+    for i, d in enumerate(posicion):
+        if d < pasos or (i and posicion[i - 1] == d):
+            continue
+        nueva = d - pasos
+        # En el tablero externo no se puede caer en una casilla propia
+        if nueva > DISTANCIA_INTERNA and nueva in posicion:
+            continue
+        resto = posicion[:i] + posicion[i + 1:]
+        resultado.append((tuple(sorted(resto + (nueva,))), nueva == 0))
+    return resultado
+
+# =============================================================================
+# GENERACIÓN
+# =============================================================================
+
+def _ponderar(probabilidad, valor):
+    # probabilidad * valor, con 0 donde la probabilidad es 0 aunque el valor sea inf
+    import numpy as np
+
+    with np.errstate(invalid="ignore"):
+        return np.where(probabilidad > 0, probabilidad * valor, 0.0)
+
+def _resolver_posicion(W, R, r, A, tiradas, quietas):
+    # Llena W[r] y R[r] dados el mejor movimiento bonus A[d] y, por tirada,
+    # si se queda quieto (quietas) o hace su mejor movimiento.
+    # C[d] es lo esperado por las tiradas que mueven una ficha; sin_mover[d] y
+    # dobles_sin_mover[d] las probabilidades de las que no (por bonus, ya que
+    # quedarse quieto puede convenir con un bonus y no con otro)
+    import numpy as np
+
+    C = np.zeros(A.shape)
+    sin_mover = np.zeros(A.shape)
+    dobles_sin_mover = np.zeros(A.shape)
+    for (probabilidad, doble, mejores), quieta in zip(tiradas, quietas):
+        for dobles in range(3):
+            if doble and dobles == 2:
+                sin_mover[2] += probabilidad  # Castigo: se pierde el turno
+                continue
+            C[dobles] += probabilidad * np.where(quieta[dobles], 0.0, mejores[dobles])
+            if doble:
+                dobles_sin_mover[dobles] += probabilidad * quieta[dobles]
+            else:
+                sin_mover[dobles] += probabilidad * quieta[dobles]
+    # W[d] = min(A[d], R[d]) con
+    #   R[2] = C[2] + s2 (1 + W[0])
+    #   R[1] = C[1] + s1 (1 + W[0]) + t1 W[2]
+    #   R[0] = C[0] + s0 (1 + W[0]) + t0 W[1]
+    # Cada política (bonus o tirar en cada d) es lineal en W[0]; el valor
+    # óptimo de W[0] es el menor entre las ocho.
+    mejor_w0 = np.full(A.shape[1], np.inf)
+    for politica in range(8):
+        usa_bonus = [politica >> d & 1 for d in range(3)]
+        coeficientes = []
+        for d in (2, 1, 0):
+            if usa_bonus[d]:
+                coeficientes.append((A[d], np.zeros(A.shape[1])))
+                continue
+            a = C[d] + sin_mover[d]
+            b = sin_mover[d]
+            if d < 2:
+                a2, b2 = coeficientes[-1]
+                a = a + _ponderar(dobles_sin_mover[d], a2)
+                b = b + dobles_sin_mover[d] * b2
+            coeficientes.append((a, b))
+        a0, b0 = coeficientes[-1]
+        # Con b0 = 1 la política nunca termina
+        termina = b0 < 1 - 1e-9
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.minimum(mejor_w0, np.where(termina, a0 / (1 - b0), np.inf), out=mejor_w0)
+    ronda_nueva = 1 + mejor_w0
+    R[r, :, 2] = C[2] + _ponderar(sin_mover[2], ronda_nueva)
+    W[r, :, 2] = np.minimum(A[2], R[r, :, 2])
+    for d in (1, 0):
+        R[r, :, d] = C[d] + _ponderar(sin_mover[d], ronda_nueva) + _ponderar(dobles_sin_mover[d], W[r, :, d + 1])
+        W[r, :, d] = np.minimum(A[d], R[r, :, d])
+
+
+def generar(ruta, casillas_externas=CASILLAS_EXTERNAS, max_bonus=MAX_BONUS):
+    import numpy as np
+
+    maxima = DISTANCIA_INTERNA + casillas_externas
+    posiciones = _posiciones(maxima)
+    n = len(posiciones)
+    W = np.full((n, max_bonus + 1, 3), np.inf)
+    R = np.full((n, max_bonus + 1, 3), np.inf)
+    bonus = np.arange(max_bonus + 1)
+    # Bonus después de usar `pasos` (desde el índice `pasos`) y al llegar a casa
+    despues = {(p, llega): np.minimum(bonus[p:] - p + BONUS_CASA * llega, max_bonus)
+               for p in range(max_bonus + 1) for llega in (False, True)}
+    llegada = np.minimum(bonus + BONUS_CASA, max_bonus)
+    final = (0,) * HOME_SIZE
+    W[rango(final)] = R[rango(final)] = 0
+
+    for posicion in posiciones[1:]:
+        r = rango(posicion)
+        # A[d]: mejor movimiento bonus (inf si no hay bonus o ningún movimiento)
+        A = np.full((3, max_bonus + 1), np.inf)
+        for p in range(1, max_bonus + 1):
+            for nueva, llega in _movimientos(posicion, p):
+                if nueva == final:
+                    valores = np.ones((3, max_bonus + 1 - p))
+                else:
+                    valores = W[rango(nueva), despues[p, llega]].T
+                np.minimum(A[:, p:], valores, out=A[:, p:])
+        # Tirada: mejores[d] es el mejor movimiento de cada tirada (inf si no
+        # hay). Siempre se puede no mover ninguna ficha, lo que deja la misma
+        # posición; como su valor depende de W[r], que todavía no se conoce, se
+        # resuelve por iteración de políticas: se empieza quieto solo donde no
+        # hay movimiento y se cambia a quieto cada tirada en la que eso valga
+        # menos, hasta que no cambie ninguna.
+        tiradas = []
+        for (total, doble), probabilidad in TIRADAS:
+            opciones = _movimientos(posicion, total)
+            mejores = []
+            for dobles in range(3):
+                mejor = np.full(max_bonus + 1, np.inf)
+                if doble and dobles == 2:
+                    mejores.append(mejor)  # Castigo: no se mueve
+                    continue
+                for nueva, llega in opciones:
+                    if nueva == final:
+                        valor = np.ones(max_bonus + 1)
+                    else:
+                        siguiente = llegada if llega else bonus
+                        valor = W[rango(nueva), siguiente, dobles + 1] if doble else 1 + W[rango(nueva), siguiente, 0]
+                    np.minimum(mejor, valor, out=mejor)
+                mejores.append(mejor)
+            tiradas.append((probabilidad, doble, mejores))
+        quietas = [[np.isinf(mejor) for mejor in mejores] for _, _, mejores in tiradas]
+        while True:
+            _resolver_posicion(W, R, r, A, tiradas, quietas)
+            nuevas = []
+            for probabilidad, doble, mejores in tiradas:
+                nuevas.append([])
+                for dobles in range(3):
+                    quieto = W[r, :, dobles + 1] if doble and dobles < 2 else 1 + W[r, :, 0]
+                    # Solo se cambia si la otra opción es claramente mejor, para no oscilar en empates
+                    actual = quietas[len(nuevas) - 1][dobles]
+                    nuevas[-1].append(np.isinf(mejores[dobles]) | np.where(actual, quieto <= mejores[dobles] + 1e-9,
+                                                                            quieto < mejores[dobles] - 1e-9))
+            if all((n == q).all() for fila_n, fila_q in zip(nuevas, quietas) for n, q in zip(fila_n, fila_q)):
+                break
+            quietas = nuevas
+
+    datos = np.stack((W, R), axis=-1).astype(np.float32)
+    with open(ruta, "wb") as archivo:
+        archivo.write(CABECERA.pack(MAGICO, casillas_externas, max_bonus, n))
+        archivo.write(datos.tobytes())
+    return n
+
+# =============================================================================
+# CONSULTA
+# =============================================================================
+
+class TablaFinales:
+    def __init__(self, ruta):
+        self.archivo = open(ruta, "rb")
+        self.mapa = mmap.mmap(self.archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, self.casillas_externas, self.max_bonus, self.posiciones = CABECERA.unpack_from(self.mapa)
+        if magico != MAGICO:
+            self.close()
+            raise Exception(f"{ruta} no es una tabla de finales.")
+        self.valores = memoryview(self.mapa)[CABECERA.size:].cast("f")
+
+    def distancias(self, estado, equipo):
+        # Distancias ordenadas de las fichas del equipo, o None si el equipo
+        # no está en el dominio de la tabla
+        base = equipo * HOME_SIZE
+        distancias = []
+        for codigo in estado.datos[base:base + HOME_SIZE]:
+            d = distancia(equipo, codigo, self.casillas_externas)
+            if d is None:
+                return None
+            distancias.append(d)
+        distancias.sort()
+        return distancias
+
+    def _indice(self, distancias, bonus, dobles):
+        return ((rango(distancias) * (self.max_bonus + 1) + min(bonus, self.max_bonus)) * 3 + dobles) * 2
+
+    def valor(self, distancias, bonus=0, dobles=0):
+        # Rondas esperadas al empezar el turno (0 si ya están todas en casa)
+        return self.valores[self._indice(distancias, bonus, dobles)]
+
+    def valor_tirando(self, distancias, bonus=0, dobles=0):
+        # Rondas esperadas si no se gasta (más) bonus y se tiran los dados
+        return self.valores[self._indice(distancias, bonus, dobles) + 1]
+
+    def esperado(self, estado, equipo):
+        distancias = self.distancias(estado, equipo)
+        if distancias is None:
+            return None
+        datos = estado.datos
+        return self.valor(distancias, datos[BONUS + equipo], datos[DOBLES + equipo])
+
+    def valor_jugada(self, estado, equipo, jugada, turno_extra):
+        # Rondas esperadas después de hacer la jugada con los dados ya
+        # tirados (los dobles de esta tirada ya están contados en el estado)
+        copia = estado.copia()
+        for movimiento in jugada:
+            if make_move(copia, movimiento) is None:
+                return None
+        distancias = self.distancias(copia, equipo)
+        if distancias is None:
+            return None
+        if not any(distancias):
+            return 1
+        bonus = copia.datos[BONUS + equipo]
+        if turno_extra:
+            return self.valor(distancias, bonus, copia.datos[DOBLES + equipo])
+        return 1 + self.valor(distancias, bonus, 0)
+
+    def close(self):
+        self.valores = None
+        self.mapa.close()
+        self.archivo.close()
+
+
+class AgenteFinales:
+    # Juega con la tabla cuando su equipo está en el dominio y si no deja
+    # decidir al agente de respaldo
+    def __init__(self, tabla, respaldo=None):
+        self.tabla = tabla
+        self.respaldo = respaldo or AgenteCodicioso()
+
+    def sacar_de_carcel(self, juego, equipo, dados):
+        return self.respaldo.sacar_de_carcel(juego, equipo, dados)
+
+    def ordenar_fichas(self, juego, equipo, movibles, pasos):
+        # Fichas ordenadas por rondas esperadas (vacía si conviene no mover),
+        # o None fuera del dominio
+        estado = EstadoCompacto.desde_juego(juego)
+        t = COLOR_INDICE[equipo.color]
+        if self.tabla.distancias(estado, t) is None:
+            return None
+        turno_extra = juego.doubles_count[equipo.color] > 0
+        # Mover solo las fichas que no dejan peor que quedarse quieto
+        quieto = self.tabla.valor_jugada(estado, t, (), turno_extra)
+        valores = {}
+        for ficha in movibles:
+            valor = self.tabla.valor_jugada(estado, t, ((t * HOME_SIZE + ficha.id, pasos),), turno_extra)
+            if valor is not None and valor <= quieto:
+                valores[ficha.id] = valor
+        return sorted((f for f in movibles if f.id in valores), key=lambda f: valores[f.id])
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        fichas = self.ordenar_fichas(juego, equipo, movibles, pasos)
+        if fichas is None:
+            return self.respaldo.elegir_fichas(juego, equipo, movibles, pasos)
+        return fichas
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        estado = EstadoCompacto.desde_juego(juego)
+        t = COLOR_INDICE[equipo.color]
+        distancias = self.tabla.distancias(estado, t)
+        if distancias is None:
+            return self.respaldo.elegir_bonus(juego, equipo, movibles, restantes)
+        dobles = juego.doubles_count[equipo.color]
+        valores = {}
+        for ficha in movibles:
+            for pasos in range(1, restantes + 1):
+                copia = estado.copia()
+                if make_move(copia, (t * HOME_SIZE + ficha.id, pasos)) is None:
+                    continue
+                nuevas = self.tabla.distancias(copia, t)
+                if nuevas is None:
+                    continue
+                llega = BONUS_CASA if copia.datos[t * HOME_SIZE + ficha.id] == CASA else 0
+                valor = self.tabla.valor(nuevas, restantes - pasos + llega, dobles) if any(nuevas) else 1
+                valores[ficha, pasos] = valor
+        # Seguir gastando el bonus solo si mejora lo esperado al tirar
+        plantarse = self.tabla.valor_tirando(distancias, restantes, dobles)
+        return sorted((o for o, v in valores.items() if v < plantarse), key=valores.get)
+
+
+if __name__ == "__main__":
+    # python finales.py generar [archivo] [casillas_externas] [max_bonus]
+    # python finales.py probar [archivo] [partidas]
+    accion = sys.argv[1] if len(sys.argv) > 1 else "generar"
+    ruta = sys.argv[2] if len(sys.argv) > 2 else "finales.bin"
+    if accion == "generar":
+        casillas = int(sys.argv[3]) if len(sys.argv) > 3 else CASILLAS_EXTERNAS
+        maximo = int(sys.argv[4]) if len(sys.argv) > 4 else MAX_BONUS
+        inicio = time.perf_counter()
+        n = generar(ruta, casillas, maximo)
+        print(f"{n} posiciones x {maximo + 1} bonus x 3 dobles en {time.perf_counter() - inicio:.1f} s")
+    else:
+        from simulacion import simulate
+
+        n = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+        tabla = TablaFinales(ruta)
+        agentes = {color: AgenteCodicioso() for color in COLORS}
+        agentes[COLORS[0]] = AgenteFinales(tabla)
+        # Se rota el orden de turnos para que el puesto no favorezca a nadie
+        victorias = 0
+        for orden in ("YGRB", "GRBY", "RBYG", "BYGR"):
+            victorias += simulate(n // 4, 0, agentes, orden)["victorias"][COLORS[0]]
+        print(f"AgenteFinales contra tres AgenteCodicioso: {victorias / (n // 4 * 4):.1%} de victorias")
@@ -0,0 +1,134 @@
+import os
+import struct
+import sys
+import time
+
+from estado import CARCEL, CASA, COLOR_INDICE, INTERNO, codificar, decodificar
+from nucleo import COLORS, FINISH_TRACK_LENGTH, HOME_SIZE, Game
+
+# =============================================================================
+# PARTIDAS GUARDADAS
+# =============================================================================
+# Una partida se empaqueta con un único struct de 58 bytes:
+#   versión, orden de turnos (4 índices de COLORS), turn_index, turnos,
+#   código de cada ficha (como en estado.py), bonus_moves, doubles_count,
+#   Team.internal (8 casillas x 4 bits por equipo: id + 1, 0 si está vacía)
+#   y el orden de llegada de Team.home (2 bits por ficha en casa).
+# El tablero no se guarda: se rearma con las posiciones de las fichas.
+# Agentes, dados y bus no son parte de la posición; se dan al cargar.
+
+VERSION = 1
+
+_PARTIDA = struct.Struct("<B4BBI16B4H4B4I4B")
+TAMANO_PARTIDA = _PARTIDA.size
+
+LETRAS = {"amarillas": "Y", "verdes": "G", "rojas": "R", "azules": "B"}
+
+def empaquetar(juego):
+    fichas = []
+    internas = []
+    casas = []
+    for color in COLORS:
+        team = juego.teams[color]
+        fichas.extend(codificar(p.state, p.position) for p in team.pieces)
+        interna = 0
+        for casilla, ficha in enumerate(team.internal):
+            if ficha is not None:
+                interna |= (ficha.id + 1) << (4 * casilla)
+        internas.append(interna)
+        casa = 0
+        for orden, ficha in enumerate(team.home):
+            casa |= ficha.id << (2 * orden)
+        casas.append(casa)
+    return _PARTIDA.pack(
+        VERSION,
+        *[COLOR_INDICE[color] for color in juego.turn_order],
+        juego.turn_index,
+        juego.turnos,
+        *fichas,
+        *[juego.bonus_moves.get(color, 0) for color in COLORS],
+        *[juego.doubles_count[color] for color in COLORS],
+        *internas,
+        *casas,
+    )
+
+def desempaquetar(datos, clase_juego=Game, **kwargs):
+    # Crea un juego nuevo e independiente con la posición guardada; kwargs
+    # (agentes, rng, dados, silencioso, ...) se pasan a clase_juego
+    if len(datos) != TAMANO_PARTIDA or datos[0] != VERSION:
+        raise Exception("Los datos no son una partida guardada de esta versión.")
+    valores = _PARTIDA.unpack(datos)
+    orden = valores[1:5]
+    fichas = valores[7:23]
+    bonus = valores[23:27]
+    dobles = valores[27:31]
+    internas = valores[31:35]
+    casas = valores[35:39]
+    if sorted(orden) != list(range(len(COLORS))) or max(fichas) > CASA:
+        raise Exception("La partida guardada está dañada.")
+
+    juego = clase_juego("".join(LETRAS[COLORS[t]] for t in orden), **kwargs)
+    juego.turn_index = valores[5]
+    juego.turnos = valores[6]
+    for t, color in enumerate(COLORS):
+        team = juego.teams[color]
+        for ficha in team.pieces:
+            codigo = fichas[t * HOME_SIZE + ficha.id]
+            ficha.state, ficha.position = decodificar(codigo)
+            if CARCEL < codigo < INTERNO:
+                juego.board.add_piece(codigo, ficha)
+        interna = internas[t]
+        if interna:
+            team.internal[:] = [team.pieces[(interna >> (4 * casilla) & 0xF) - 1] if interna >> (4 * casilla) & 0xF else None
+                                for casilla in range(FINISH_TRACK_LENGTH)]
+        en_casa = fichas[t * HOME_SIZE:(t + 1) * HOME_SIZE].count(CASA)
+        if en_casa:
+            team.home[:] = [team.pieces[casas[t] >> (2 * orden) & 3] for orden in range(en_casa)]
+        if bonus[t]:
+            juego.bonus_moves[color] = bonus[t]
+        juego.doubles_count[color] = dobles[t]
+    return juego
+
+def bifurcar(juego, n=1, **kwargs):
+    # n juegos independientes que siguen desde la posición actual de `juego`
+    datos = empaquetar(juego)
+    return [desempaquetar(datos, type(juego), **kwargs) for _ in range(n)]
+
+def guardar_archivo(juego, ruta):
+    # Punto de control: se escribe aparte y se reemplaza de una vez, así que
+    # una caída a mitad de la escritura deja el archivo anterior intacto
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(empaquetar(juego))
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+
+def cargar_archivo(ruta, clase_juego=Game, **kwargs):
+    with open(ruta, "rb") as archivo:
+        return desempaquetar(archivo.read(), clase_juego, **kwargs)
+
+
+if __name__ == "__main__":
+    # python guardado.py medir [partidas]
+    import random
+    from agentes import AgenteCodicioso
+
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    juegos = []
+    for seed in range(n):
+        juego = Game("YGRB", agentes={color: AgenteCodicioso() for color in COLORS},
+                     rng=random.Random(seed), silencioso=True)
+        juego.run(40 + 5 * seed)
+        juegos.append(juego)
+    vueltas = 200
+    inicio = time.perf_counter()
+    for _ in range(vueltas):
+        guardados = [empaquetar(juego) for juego in juegos]
+    guardar = (time.perf_counter() - inicio) / (vueltas * n)
+    inicio = time.perf_counter()
+    for _ in range(vueltas):
+        for datos in guardados:
+            desempaquetar(datos, silencioso=True)
+    cargar = (time.perf_counter() - inicio) / (vueltas * n)
+    print(f"{TAMANO_PARTIDA} bytes por partida: guardar {guardar * 1e6:.1f} us, cargar {cargar * 1e6:.1f} us")
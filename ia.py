@@ -0,0 +1,289 @@
+import math
+import random
+import time
+
+from agentes import AgenteCodicioso
+from estado import BONUS, CARCEL, CASA, COLOR_INDICE, DOBLES, INTERNO, NUM_FICHAS, ORDEN, TURNO, EstadoCompacto
+from movimientos import (NUM_CODIGOS, SALIR, aplicar_castigo, destino_legal, legal_moves, make_move,
+                         registrar_dados, siguiente_turno, unmake_move)
+from nucleo import BOARD_SIZE, COLORS, HOME_SIZE, SALIDAS
+
+# =============================================================================
+# ZOBRIST
+# =============================================================================
+# Un entero aleatorio de 64 bits por (ficha, código), (equipo, bonus),
+# (equipo, dobles), equipo que juega y (puesto, equipo) del orden de turnos.
+# El hash de un estado es el XOR de los que le corresponden y se actualiza con
+# cada movimiento sin recorrer el estado. El turno se cuenta por equipo y no
+# por puesto: el mismo puesto es otro equipo en otro orden de turnos.
+
+_rng = random.Random(0x5A0B)
+Z_FICHA = [_rng.getrandbits(64) for _ in range(NUM_FICHAS * NUM_CODIGOS)]
+Z_BONUS = [[_rng.getrandbits(64) for _ in range(256)] for _ in COLORS]
+Z_DOBLES = [_rng.getrandbits(64) for _ in range(len(COLORS) * 3)]
+Z_TURNO = [_rng.getrandbits(64) for _ in range(len(COLORS))]
+Z_ORDEN = [_rng.getrandbits(64) for _ in range(len(COLORS) * len(COLORS))]
+
+def z_bonus(equipo, bonus):
+    # Las tablas crecen si aparece un bonus mayor, así no hay dos valores
+    # con el mismo número
+    tabla = Z_BONUS[equipo]
+    while bonus >= len(tabla):
+        tabla.append(_rng.getrandbits(64))
+    return tabla[bonus]
+
+def zobrist(estado):
+    datos = estado.datos
+    h = 0
+    for i in range(NUM_FICHAS):
+        h ^= Z_FICHA[i * NUM_CODIGOS + datos[i]]
+    for t in range(len(COLORS)):
+        h ^= z_bonus(t, datos[BONUS + t]) ^ Z_DOBLES[t * 3 + datos[DOBLES + t]]
+        h ^= Z_ORDEN[t * len(COLORS) + datos[ORDEN + t]]
+    return h ^ Z_TURNO[estado.equipo_actual()]
+
+# =============================================================================
+# TABLA DE TRANSPOSICIÓN
+# =============================================================================
+# Tamaño fijo (2**bits entradas). Una entrada nueva reemplaza a la guardada si
+# es de una búsqueda anterior o si se calculó con igual o mayor profundidad.
+
+class TablaTransposicion:
+    def __init__(self, bits=16):
+        self.mascara = (1 << bits) - 1
+        self.claves = [0] * (1 << bits)
+        self.profundidades = [-1] * (1 << bits)
+        self.generaciones = [0] * (1 << bits)
+        self.valores = [None] * (1 << bits)
+        self.generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def nueva_busqueda(self):
+        self.generacion += 1
+
+    def buscar(self, h, profundidad):
+        i = h & self.mascara
+        if self.claves[i] == h and self.profundidades[i] >= profundidad:
+            self.aciertos += 1
+            return self.valores[i]
+        self.fallos += 1
+        return None
+
+    def guardar(self, h, profundidad, valor):
+        i = h & self.mascara
+        if self.generaciones[i] != self.generacion or profundidad >= self.profundidades[i]:
+            self.claves[i] = h
+            self.profundidades[i] = profundidad
+            self.generaciones[i] = self.generacion
+            self.valores[i] = valor
+
+# =============================================================================
+# EXPECTIMAX
+# =============================================================================
+# Los nodos de azar promedian los 21 resultados distintos de los dados. En los
+# nodos de decisión cada equipo maximiza su puntaje menos el del mejor rival
+# (max-n), y la profundidad se cuenta en turnos.
+
+RESULTADOS = [((d1, d2), (1 if d1 == d2 else 2) / 36) for d1 in range(1, 7) for d2 in range(d1, 7)]
+
+PESO_BONUS = 0.8
+VALOR_FUERA = 20  # Valor de tener la ficha fuera de la cárcel, además del avance
+PUNTAJE_VICTORIA = 10_000
+
+AVANCE = [[0] * NUM_CODIGOS for _ in COLORS]
+for _t, _color in enumerate(COLORS):
+    for _codigo in range(1, NUM_CODIGOS):
+        if _codigo < INTERNO:
+            AVANCE[_t][_codigo] = (_codigo - SALIDAS[_color]) % BOARD_SIZE + 1
+        else:
+            AVANCE[_t][_codigo] = BOARD_SIZE + _codigo - INTERNO
+        AVANCE[_t][_codigo] += VALOR_FUERA
+
+def evaluar(estado):
+    datos = estado.datos
+    puntajes = []
+    for t in range(len(COLORS)):
+        avance = AVANCE[t]
+        codigos = datos[t * HOME_SIZE:(t + 1) * HOME_SIZE]
+        puntaje = sum(avance[c] for c in codigos) + PESO_BONUS * datos[BONUS + t]
+        if all(c == CASA for c in codigos):
+            puntaje += PUNTAJE_VICTORIA
+        puntajes.append(puntaje)
+    return puntajes
+
+# Con una tabla de finales (finales.TablaFinales) el equipo que está en su
+# dominio se evalúa por las rondas que le faltan en vez de por su avance: cada
+# ronda vale lo que avanza en promedio un equipo por ronda, así que el puntaje
+# queda en la misma escala que el de evaluar.
+PASOS_POR_RONDA = 8
+
+def evaluar_con_finales(estado, finales):
+    puntajes = evaluar(estado)
+    for t in range(len(COLORS)):
+        if puntajes[t] >= PUNTAJE_VICTORIA:
+            continue
+        rondas = finales.esperado(estado, t)
+        if rondas is not None and not math.isinf(rondas):
+            puntajes[t] = HOME_SIZE * AVANCE[t][CASA] - PASOS_POR_RONDA * rondas
+    return puntajes
+
+def utilidad(puntajes, equipo):
+    return puntajes[equipo] - max(p for t, p in enumerate(puntajes) if t != equipo)
+
+def hay_ganador(estado):
+    datos = estado.datos
+    return any(all(c == CASA for c in datos[t * HOME_SIZE:(t + 1) * HOME_SIZE]) for t in range(len(COLORS)))
+
+
+class _TiempoAgotado(Exception):
+    pass
+
+
+class Expectimax:
+    def __init__(self, profundidad=3, tiempo=0.05, bits_tabla=16, finales=None):
+        self.profundidad = profundidad
+        self.tiempo = tiempo
+        self.tabla = TablaTransposicion(bits_tabla)
+        self.finales = finales  # finales.TablaFinales para evaluar las hojas, o None
+        self.nodos = 0
+        self.profundidad_alcanzada = 0
+
+    def _hacer(self, estado, h, jugada):
+        # Aplica la jugada con make_move y actualiza el hash con los registros
+        datos = estado.datos
+        registros = []
+        for movimiento in jugada:
+            registro = make_move(estado, movimiento)
+            indice, anterior, capturada, bonus = registro
+            codigo = datos[indice]
+            h ^= Z_FICHA[indice * NUM_CODIGOS + anterior] ^ Z_FICHA[indice * NUM_CODIGOS + codigo]
+            if capturada >= 0:
+                h ^= Z_FICHA[capturada * NUM_CODIGOS + codigo] ^ Z_FICHA[capturada * NUM_CODIGOS + CARCEL]
+            if bonus:
+                equipo = indice // HOME_SIZE
+                total = datos[BONUS + equipo]
+                h ^= z_bonus(equipo, total - bonus) ^ z_bonus(equipo, total)
+            registros.append(registro)
+        return registros, h
+
+    def _pasar(self, estado, h, turno_extra):
+        antes = estado.equipo_actual()
+        siguiente_turno(estado, turno_extra)
+        return h ^ Z_TURNO[antes] ^ Z_TURNO[estado.equipo_actual()]
+
+    def _jugar(self, estado, h, jugada, turno_extra, profundidad):
+        # Valor de hacer la jugada y pasar el turno; el estado queda como estaba
+        turno = estado.datos[TURNO]
+        registros, h = self._hacer(estado, h, jugada)
+        puntajes = self._azar(estado, self._pasar(estado, h, turno_extra), profundidad)
+        for registro in reversed(registros):
+            unmake_move(estado, registro)
+        estado.datos[TURNO] = turno
+        return puntajes
+
+    def _azar(self, estado, h, profundidad):
+        self.nodos += 1
+        if profundidad == 0 or hay_ganador(estado):
+            return evaluar(estado) if self.finales is None else evaluar_con_finales(estado, self.finales)
+        if time.perf_counter() > self.limite:
+            raise _TiempoAgotado
+        valor = self.tabla.buscar(h, profundidad)
+        if valor is not None:
+            return valor
+        datos = estado.datos
+        equipo = estado.equipo_actual()
+        dobles_antes = datos[DOBLES + equipo]
+        z_dobles = h ^ Z_DOBLES[equipo * 3 + dobles_antes]
+        acumulado = [0.0] * len(COLORS)
+        for dados, probabilidad in RESULTADOS:
+            castigo = registrar_dados(estado, equipo, dados)
+            hh = z_dobles ^ Z_DOBLES[equipo * 3 + datos[DOBLES + equipo]]
+            if castigo:
+                castigada = aplicar_castigo(estado, equipo)
+                if castigada is not None:
+                    indice, codigo = castigada
+                    hh ^= Z_FICHA[indice * NUM_CODIGOS + codigo] ^ Z_FICHA[indice * NUM_CODIGOS + CARCEL]
+                puntajes = self._jugar(estado, hh, (), False, profundidad - 1)
+                if castigada is not None:
+                    estado.poner(*castigada)
+            else:
+                puntajes = self._decidir(estado, hh, equipo, dados, profundidad)
+            datos[DOBLES + equipo] = dobles_antes
+            for t in range(len(COLORS)):
+                acumulado[t] += probabilidad * puntajes[t]
+        self.tabla.guardar(h, profundidad, acumulado)
+        return acumulado
+
+    def _decidir(self, estado, h, equipo, dados, profundidad):
+        turno_extra = dados[0] == dados[1]
+        mejor = None
+        for jugada in legal_moves(estado, dados, equipo):
+            puntajes = self._jugar(estado, h, jugada, turno_extra, profundidad - 1)
+            if mejor is None or utilidad(puntajes, equipo) > utilidad(mejor, equipo):
+                mejor = puntajes
+        if mejor is None:
+            return self._jugar(estado, h, (), turno_extra, profundidad - 1)
+        return mejor
+
+    def mejor_jugada(self, estado, jugadas, turno_extra=False):
+        # Profundización iterativa hasta agotar el tiempo; devuelve la mejor
+        # jugada de la última profundidad completa. Con tiempo=None no se mira
+        # el reloj y siempre se llega a self.profundidad (resultado reproducible).
+        if len(jugadas) <= 1:
+            return jugadas[0] if jugadas else None
+        self.limite = time.perf_counter() + self.tiempo if self.tiempo is not None else float("inf")
+        self.tabla.nueva_busqueda()
+        # La búsqueda hace y deshace sobre una sola copia; si se agota el tiempo
+        # a mitad de camino, la copia simplemente se descarta.
+        estado = estado.copia()
+        equipo = estado.equipo_actual()
+        h = zobrist(estado)
+        mejor = jugadas[0]
+        for profundidad in range(1, self.profundidad + 1):
+            try:
+                valores = {}
+                for jugada in jugadas:
+                    valores[jugada] = utilidad(self._jugar(estado, h, jugada, turno_extra, profundidad - 1), equipo)
+            except _TiempoAgotado:
+                break
+            mejor = max(jugadas, key=valores.get)
+            # La mejor jugada se explora primero en la siguiente iteración
+            jugadas = [mejor] + [j for j in jugadas if j != mejor]
+            self.profundidad_alcanzada = profundidad
+        return mejor
+
+
+class AgenteExpectimax:
+    # Agente para Game: decide la jugada completa al preguntarle por la cárcel
+    # (o al elegir ficha si no hubo pregunta) y la ejecuta paso a paso.
+    # El bonus lo reparte bonus.AgenteBonus.
+    def __init__(self, profundidad=3, tiempo=0.05, bits_tabla=16, finales=None):
+        from bonus import AgenteBonus  # bonus.py importa este módulo
+
+        self.buscador = Expectimax(profundidad, tiempo, bits_tabla, finales)
+        self.respaldo = AgenteCodicioso()
+        self.bonus = AgenteBonus(self.respaldo)
+        self._plan = None
+
+    def sacar_de_carcel(self, juego, equipo, dados):
+        estado = EstadoCompacto.desde_juego(juego)
+        jugada = self.buscador.mejor_jugada(estado, legal_moves(estado, dados), dados[0] == dados[1])
+        self._plan = [m for m in jugada or () if m[1] != SALIR]
+        return bool(jugada) and jugada[0][1] == SALIR
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        plan, self._plan = self._plan, None
+        if plan is None:
+            estado = EstadoCompacto.desde_juego(juego)
+            t = COLOR_INDICE[equipo.color]
+            jugadas = [((f.id + t * HOME_SIZE, pasos),) for f in movibles
+                       if destino_legal(estado, t, f.id + t * HOME_SIZE, pasos) >= 0]
+            # Game ya contó los dobles de este lanzamiento
+            turno_extra = juego.doubles_count[equipo.color] > 0
+            jugada = self.buscador.mejor_jugada(estado, jugadas, turno_extra)
+            plan = list(jugada or ())
+        return [f for f in movibles for indice, _ in plan if f.id == indice % HOME_SIZE]
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        return self.bonus.elegir_bonus(juego, equipo, movibles, restantes)
@@ -0,0 +1,336 @@
+import threading
+import time
+from types import MappingProxyType
+
+from eventos import EstadoCambiado
+from nucleo import COLORS, HOME_SIZE, Game
+
+# =============================================================================
+# INTERFAZ
+# =============================================================================
+
+# Mapeo de posiciones (para el tablero externo)
+CELL_SIZE = 30
+color_map = {
+    "W": "#D3D3D3",
+    "HW": "#A9A9A9",
+    "Y": "#FFFF00",
+    "BR": "#FF00FF",
+    "B": "#0000FF",
+    "GO": "#800080",
+    "HY": "#FFFF66",
+    "HG": "#66FF66",
+    "HB": "#66CCFF",
+    "HR": "#FF6666",
+    "G": "#008000",
+    "R": "#FF0000"
+}
+
+grid_str = """
+W	W	W	W	W	W	HW	Y	Y	Y	BR	BR	BR	B	B	B	HW	W	W	W	W	W	W
+W	W	W	W	W	W	HW	Y	Y	Y	HY	HY	HY	B	B	B	HW	W	W	W	W	W	W
+W	W	W	W	W	W	HW	Y	Y	Y	HY	HY	HY	B	B	B	HW	W	W	W	W	W	W
+W	W	W	W	W	W	HW	Y	Y	Y	HY	HY	HY	B	B	B	HW	W	W	W	W	W	W
+W	W	W	W	W	W	HW	GO	GO	GO	HY	HY	HY	BR	BR	BR	HW	W	W	W	W	W	W
+W	W	W	W	W	W	HW	Y	Y	Y	HY	HY	HY	B	B	B	HW	W	W	W	W	W	W
+HW	HW	HW	HW	HW	HW	HW	Y	Y	Y	HY	HY	HY	B	B	B	HW	HW	HW	HW	HW	HW	HW
+Y	Y	Y	Y	BR	Y	Y	Y	Y	Y	HY	HY	HY	B	B	B	B	B	GO	B	B	B	B
+Y	Y	Y	Y	BR	Y	Y	Y	Y	HW	Y	Y	Y	HW	B	B	B	B	GO	B	B	B	B
+Y	Y	Y	Y	BR	Y	Y	Y	HW	W	W	W	W	W	HW	B	B	B	GO	B	B	B	B
+BR	HG	HG	HG	HG	HG	HG	HG	G	W	HW	HW	HW	W	B	HB	HB	HB	HB	HB	HB	HB	BR
+BR	HG	HG	HG	HG	HG	HG	HG	G	W	HW	W	HW	W	B	HB	HB	HB	HB	HB	HB	HB	BR
+BR	HG	HG	HG	HG	HG	HG	HG	G	W	HW	HW	HW	W	B	HB	HB	HB	HB	HB	HB	HB	BR
+G	G	G	G	GO	G	G	G	HW	W	W	W	W	W	HW	R	R	R	BR	R	R	R	R
+G	G	G	G	GO	G	G	G	G	HW	R	R	R	HW	R	R	R	R	BR	R	R	R	R
+G	G	G	G	GO	G	G	G	G	G	HR	HR	HR	R	R	R	R	R	BR	R	R	R	R
+HW	HW	HW	HW	HW	HW	HW	G	G	G	HR	HR	HR	R	R	R	HW	HW	HW	HW	HW	HW	HW
+W	W	W	W	W	W	HW	G	G	G	HR	HR	HR	R	R	R	HW	W	W	W	W	W	W
+W	W	W	W	W	W	HW	BR	BR	BR	HR	HR	HR	GO	GO	GO	HW	W	W	W	W	W	W
+W	W	W	W	W	W	HW	G	G	G	HR	HR	HR	R	R	R	HW	W	W	W	W	W	W
+W	W	W	W	W	W	HW	G	G	G	HR	HR	HR	R	R	R	HW	W	W	W	W	W	W
+W	W	W	W	W	W	HW	G	G	G	HR	HR	HR	R   R   R   HW  W   W   W   W   W   W
+W	W	W	W	W	W	HW	G	G	G	BR	BR	BR	R	R	R	HW	W	W	W	W	W	W
+"""  # La cuadrícula puede ajustarse según tus necesidades
+
+def parse_grid(grid_str):
+    grid = []
+    for line in grid_str.strip().splitlines():
+        row = [cell for cell in line.split() if cell]
+        grid.append(row)
+    return grid
+
+board_grid = parse_grid(grid_str)
+
+external_positions = {
+    0: (0,8), 1: (1,8), 2: (2,8), 3: (3,8), 4: (4,8), 5: (5,8), 6: (6,8), 7: (7,8),
+    8: (8,7), 9: (8,6), 10: (8,5), 11: (8,4), 12: (8,3), 13: (8,2), 14: (8,1), 15: (8,0),
+    16: (11,0), 17: (14,0), 18: (14,1), 19: (14,2), 20: (14,3), 21: (14,4), 22: (14,5),
+    23: (14,6), 24: (14,7), 25: (15,8), 26: (16,8), 27: (17,8), 28: (18,8), 29: (19,8),
+    30: (20,8), 31: (21,8), 32: (22,8), 33: (22,11), 34: (22,14), 35: (21,14), 36: (20,14),
+    37: (19,14), 38: (18,14), 39: (17,14), 40: (16,14), 41: (15,14), 42: (14,15), 43: (14,16),
+    44: (14,17), 45: (14,18), 46: (14,19), 47: (14,20), 48: (14,21), 49: (14,22), 50: (11,22),
+    51: (8,22), 52: (8,21), 53: (8,20), 54: (8,19), 55: (8,18), 56: (8,17), 57: (8,16),
+    58: (8,15), 59: (7,14), 60: (6,14), 61: (5,14), 62: (4,14), 63: (3,14), 64: (2,14),
+    65: (1,14), 66: (0,14), 67: (0,11)
+}
+
+internal_positions = {
+    "amarillas": [(11,1), (11,2), (11,3), (11,4), (11,5), (11,6), (11,7), (11,8)],
+    "verdes":    [(1,11), (2,11), (3,11), (4,11), (5,11), (6,11), (7,11), (8,11)],
+    "rojas":     [(11,21), (11,20), (11,19), (11,18), (11,17), (11,16), (11,15), (11,14)],
+    "azules":    [(21,11), (20,11), (19,11), (18,11), (17,11), (16,11), (15,11), (14,11)]
+}
+
+jail_positions = {
+    "amarillas": [(2,2), (3,2), (2,3), (3,3)],
+    "verdes":    [(19,2), (20,2), (19,3), (20,3)],
+    "rojas":     [(19,19), (20,19), (19,20), (20,20)],
+    "azules":    [(2,19), (3,19), (2,20), (3,20)]
+}
+
+team_token_colors = {
+    "amarillas": "#FFFF00",
+    "verdes": "#008000",
+    "rojas": "#FF0000",
+    "azules": "#0000FF"
+}
+
+def draw_board(canvas, grid):
+    for i, row in enumerate(grid):
+        for j, cell in enumerate(row):
+            x1 = j * CELL_SIZE
+            y1 = i * CELL_SIZE
+            x2 = x1 + CELL_SIZE
+            y2 = y1 + CELL_SIZE
+            fill_color = color_map.get(cell, "#FFFFFF")
+            canvas.create_rectangle(x1, y1, x2, y2, fill=fill_color, outline="black")
+
+def token_bbox(row, col):
+    pad = 4
+    x1 = col * CELL_SIZE + pad
+    y1 = row * CELL_SIZE + pad
+    x2 = (col + 1) * CELL_SIZE - pad
+    y2 = (row + 1) * CELL_SIZE - pad
+    return x1, y1, x2, y2
+
+def draw_token(canvas, row, col, token_color, text=""):
+    # Devuelve los ids del óvalo y del texto (None si no hay texto)
+    x1, y1, x2, y2 = token_bbox(row, col)
+    oval = canvas.create_oval(x1, y1, x2, y2, fill=token_color, outline="black")
+    label = None
+    if text:
+        label = canvas.create_text((x1+x2)//2, (y1+y2)//2, text=text, fill="white", font=("Arial", 10, "bold"))
+    return oval, label
+
+class BoardRenderer:
+    # Dibuja el tablero una sola vez y conserva los ítems del canvas de cada
+    # ficha; en cada cuadro solo mueve, recolorea u oculta las fichas que
+    # cambiaron desde el cuadro anterior.
+    def __init__(self, canvas, grid):
+        self.canvas = canvas
+        draw_board(canvas, grid)
+        self.tokens = {}  # (equipo, etiqueta) -> [óvalo, texto, (fila, columna, color) o None]
+        self.last_state = None
+
+    def render(self, state):
+        # Devuelve cuántas fichas se actualizaron
+        if state == self.last_state:
+            return 0
+        self.last_state = state
+        canvas = self.canvas
+        cambios = 0
+        vistas = set()
+        for key in ("external", "internal", "jail"):
+            for row, col, team, label in state.get(key, []):
+                clave = (team, label)
+                vistas.add(clave)
+                color = team_token_colors[team]
+                token = self.tokens.get(clave)
+                if token is None:
+                    oval, text = draw_token(canvas, row, col, color, text=label)
+                    self.tokens[clave] = [oval, text, (row, col, color)]
+                    cambios += 1
+                    continue
+                oval, text, anterior = token
+                if anterior == (row, col, color):
+                    continue
+                if anterior is None:
+                    canvas.itemconfigure(oval, state="normal")
+                    if text is not None:
+                        canvas.itemconfigure(text, state="normal")
+                if anterior is None or anterior[:2] != (row, col):
+                    x1, y1, x2, y2 = token_bbox(row, col)
+                    canvas.coords(oval, x1, y1, x2, y2)
+                    if text is not None:
+                        canvas.coords(text, (x1+x2)//2, (y1+y2)//2)
+                    # La ficha movida queda encima de las que ya estaban en la casilla
+                    canvas.tag_raise(oval)
+                    if text is not None:
+                        canvas.tag_raise(text)
+                if anterior is None or anterior[2] != color:
+                    canvas.itemconfigure(oval, fill=color)
+                token[2] = (row, col, color)
+                cambios += 1
+        # Las fichas que ya no aparecen (p. ej. en la casa) se ocultan
+        for clave, token in self.tokens.items():
+            if clave not in vistas and token[2] is not None:
+                canvas.itemconfigure(token[0], state="hidden")
+                if token[1] is not None:
+                    canvas.itemconfigure(token[1], state="hidden")
+                token[2] = None
+                cambios += 1
+        return cambios
+
+# Función de refresco de la interfaz; se llama periódicamente
+def run_interface(game_state_updater):
+    import tkinter as tk  # Solo al abrir la ventana; sin Tk el resto del módulo funciona igual
+
+    root = tk.Tk()
+    root.title("Tablero de Parqués")
+    canvas_width = len(board_grid[0]) * CELL_SIZE
+    canvas_height = len(board_grid) * CELL_SIZE
+    canvas = tk.Canvas(root, width=canvas_width, height=canvas_height)
+    canvas.pack()
+
+    renderer = BoardRenderer(canvas, board_grid)
+    pending = False
+    version_dibujada = None
+
+    def refresh():
+        nonlocal pending, version_dibujada
+        pending = False
+        version, foto = game_state_updater()
+        if version != version_dibujada:
+            version_dibujada = version
+            renderer.render(foto)
+
+    def poll():
+        # Si nada cambió, solo se compara la versión de la foto
+        refresh()
+        root.after(100, poll)
+
+    def on_refresh(event):
+        # Una ráfaga de EstadoCambiado del hilo del juego produce un solo cuadro
+        nonlocal pending
+        if not pending:
+            pending = True
+            root.after_idle(refresh)
+
+    poll()
+
+    # Configuramos la función de callback para actualización desde el hilo del juego.
+    global update_ui_callback
+    update_ui_callback = lambda: root.event_generate("<<Refresh>>")
+    root.bind("<<Refresh>>", on_refresh)
+
+    root.mainloop()
+
+def run_game():
+    print("Bienvenido al juego de Parqués (consola)")
+    orden = input("Orden de turnos (ejemplo: RBGY): ")
+    auto = input("¿Repartir el bonus automáticamente? (s/n): ").strip().lower() == "s"
+    juego = Game(orden, auto_bonus=auto)
+    global game_instance, fotos_tablero
+    game_instance = juego
+    fotos_tablero = FotosTablero(juego)
+    while not juego.juego_terminado():
+        juego.estado_tablero()
+        juego.turno()
+        time.sleep(0.1)
+    print("¡Fin del juego!")
+    update_ui_callback()
+
+FOTO_VACIA = MappingProxyType({"external": (), "internal": (), "jail": ()})
+
+def foto_tablero(juego):
+    # Fichas visibles del juego como tuplas (fila, columna, equipo, etiqueta)
+    # en un diccionario de solo lectura
+    external, internal, jail = [], [], []
+    for color, team in juego.teams.items():
+        for ficha in team.fichas_en_tablero():
+            pos = ficha.position
+            if pos in external_positions:
+                row, col = external_positions[pos]
+                external.append((row, col, color, ficha.__repr__()))
+        for ficha in team.fichas_internas():
+            idx = ficha.position
+            row, col = internal_positions[color][idx]
+            internal.append((row, col, color, ficha.__repr__()))
+        for ficha in team.fichas_en_carcel():
+            pos = jail_positions[color][0]
+            jail.append((pos[0], pos[1], color, ficha.__repr__()))
+    return MappingProxyType({"external": tuple(external), "internal": tuple(internal), "jail": tuple(jail)})
+
+
+def foto_codigos(codigos):
+    # La misma foto a partir de los 16 códigos de estado.py (p. ej. los que
+    # recibe un espectador)
+    from estado import CARCEL, CASA, INTERNO  # Solo quien la usa carga estado.py
+    external, internal, jail = [], [], []
+    for t, color in enumerate(COLORS):
+        fichas = [(codigos[t * HOME_SIZE + id], f"{color[0].upper()}{id}") for id in range(HOME_SIZE)]
+        for codigo, etiqueta in fichas:
+            if CARCEL < codigo < INTERNO and codigo in external_positions:
+                row, col = external_positions[codigo]
+                external.append((row, col, color, etiqueta))
+        for codigo, etiqueta in fichas:
+            if INTERNO <= codigo < CASA:
+                row, col = internal_positions[color][codigo - INTERNO]
+                internal.append((row, col, color, etiqueta))
+        for codigo, etiqueta in fichas:
+            if codigo == CARCEL:
+                pos = jail_positions[color][0]
+                jail.append((pos[0], pos[1], color, etiqueta))
+    return MappingProxyType({"external": tuple(external), "internal": tuple(internal), "jail": tuple(jail)})
+
+
+class FotosTablero:
+    # El hilo del juego arma una foto nueva con cada EstadoCambiado y la
+    # publica con su versión en un solo atributo (actual), así que la interfaz
+    # nunca recorre fichas que se están moviendo ni ve una foto a medias.
+    # La versión solo sube si la foto cambió.
+    def __init__(self, juego):
+        self.juego = juego
+        self.actual = (1, foto_tablero(juego))
+        self.suscripcion = juego.bus.suscribir(self.publicar, EstadoCambiado)
+
+    def publicar(self, evento=None):
+        version, anterior = self.actual
+        foto = foto_tablero(self.juego)
+        if foto != anterior:
+            self.actual = (version + 1, foto)
+
+    def terminar(self):
+        self.juego.bus.desuscribir(self.suscripcion)
+
+def game_state_updater():
+    # (versión, foto) más reciente publicada por el hilo del juego
+    if fotos_tablero is None:
+        return 0, FOTO_VACIA
+    return fotos_tablero.actual
+
+# Variables globales
+game_instance = None
+fotos_tablero = None
+update_ui_callback = lambda: None
+
+def iniciar():
+    # Se ejecuta la lógica del juego en un hilo separado (usa input() en consola)
+    def game_thread():
+        global game_instance, fotos_tablero
+        orden = input("Orden de turnos (ejemplo: RBGY): ")
+        auto = input("¿Repartir el bonus automáticamente? (s/n): ").strip().lower() == "s"
+        game_instance = Game(orden, auto_bonus=auto)
+        fotos_tablero = FotosTablero(game_instance)
+        # La UI se suscribe a los cambios de estado; aquí se invoca la función global
+        game_instance.bus.suscribir(lambda evento: update_ui_callback(), EstadoCambiado)
+        game_instance.run()
+    t = threading.Thread(target=game_thread)
+    t.daemon = True
+    t.start()
+
+    run_interface(game_state_updater)
+
+
+if __name__ == "__main__":
+    iniciar()
@@ -0,0 +1,328 @@
+import json
+import sys
+import threading
+import time
+
+from eventos import (BonusOtorgado, Captura, CastigoDobles, Dobles, LlegadaCasa, MovimientoRechazado, SalidaBloqueada,
+                     SalidaCarcel, TurnoOmitido)
+
+# =============================================================================
+# MÉTRICAS
+# =============================================================================
+# Contadores e histogramas de tiempo por fase de Game.turno. Game no sabe nada
+# de esto: InstrumentosJuego reemplaza los métodos de las fases en la
+# instancia (no en la clase) por versiones que miden, y cuenta los rechazos y
+# capturas escuchando el bus. Un juego sin instrumentar no paga nada.
+#
+# Las fases se anidan: "turno" incluye todas, "movimiento" incluye las
+# capturas que provoca y "bonus" los movimientos que hace.
+
+FASES = {
+    "turno": "turno",
+    "dados": "roll_dice",
+    "carcel": "sacar_ficha_de_carcel",
+    "movimiento": "mover_ficha",
+    "bonus": "aplicar_bonus",
+}
+# capturar_ficha se mide aparte: "captura" si la provoca un movimiento y
+# "castigo" si la provoca el castigo de tres dobles
+CAPTURA = "captura"
+CASTIGO = "castigo"
+
+CUBETAS = 48  # La cubeta i cuenta duraciones de menos de 2**i ns
+
+
+class Histograma:
+    __slots__ = ("cuenta", "total", "minimo", "maximo", "cubetas")
+
+    def __init__(self):
+        self.cuenta = 0
+        self.total = 0
+        self.minimo = None
+        self.maximo = 0
+        self.cubetas = [0] * CUBETAS
+
+    def registrar(self, ns):
+        self.cuenta += 1
+        self.total += ns
+        if self.minimo is None or ns < self.minimo:
+            self.minimo = ns
+        if ns > self.maximo:
+            self.maximo = ns
+        self.cubetas[min(ns.bit_length(), CUBETAS - 1)] += 1
+
+    def combinar(self, otro):
+        self.cuenta += otro.cuenta
+        self.total += otro.total
+        if otro.minimo is not None and (self.minimo is None or otro.minimo < self.minimo):
+            self.minimo = otro.minimo
+        self.maximo = max(self.maximo, otro.maximo)
+        for i, n in enumerate(otro.cubetas):
+            self.cubetas[i] += n
+
+    def percentil(self, q):
+        # Cota superior (en ns) de la cubeta donde cae el percentil q
+        objetivo = q * self.cuenta
+        acumulado = 0
+        for i, n in enumerate(self.cubetas):
+            acumulado += n
+            if n and acumulado >= objetivo:
+                return min(1 << i, self.maximo)
+        return self.maximo
+
+    def a_dict(self):
+        return {
+            "cuenta": self.cuenta,
+            "total_ns": self.total,
+            "media_ns": self.total / self.cuenta if self.cuenta else 0,
+            "min_ns": self.minimo or 0,
+            "max_ns": self.maximo,
+            "p50_ns": self.percentil(0.5),
+            "p99_ns": self.percentil(0.99),
+            "cubetas": {1 << i: n for i, n in enumerate(self.cubetas) if n},
+        }
+
+
+class Metricas:
+    # Acumula las métricas de una o varias partidas. Con `perfil` (un
+    # cProfile.Profile) cada turno de los juegos instrumentados se perfila.
+    def __init__(self, perfil=None):
+        self.contadores = {}
+        self.tiempos = {}
+        self.partidas = 0
+        self.perfil = perfil
+        self.cerrojo = threading.Lock()  # Para leer desde el servidor HTTP
+
+    def contar(self, nombre, n=1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+    def tiempo(self, fase):
+        histograma = self.tiempos.get(fase)
+        if histograma is None:
+            histograma = self.tiempos[fase] = Histograma()
+        return histograma
+
+    def combinar(self, otras):
+        # Suma otras métricas, p. ej. las de otro proceso
+        with self.cerrojo:
+            self.partidas += otras.partidas
+            for nombre, n in otras.contadores.items():
+                self.contar(nombre, n)
+            for fase, histograma in otras.tiempos.items():
+                self.tiempo(fase).combinar(histograma)
+
+    def a_dict(self):
+        with self.cerrojo:
+            return {
+                "partidas": self.partidas,
+                "contadores": dict(sorted(self.contadores.items())),
+                "tiempos": {fase: h.a_dict() for fase, h in sorted(self.tiempos.items())},
+            }
+
+    def volcar(self, ruta):
+        with open(ruta, "w") as archivo:
+            json.dump(self.a_dict(), archivo, indent=2)
+
+    def texto_prometheus(self):
+        datos = self.a_dict()
+        lineas = ["# TYPE parques_partidas counter", f"parques_partidas {datos['partidas']}",
+                  "# TYPE parques_eventos counter"]
+        for nombre, n in datos["contadores"].items():
+            lineas.append(f'parques_eventos{{nombre="{nombre}"}} {n}')
+        lineas.append("# TYPE parques_fase_segundos histogram")
+        for fase, h in datos["tiempos"].items():
+            acumulado = 0
+            for limite, n in h["cubetas"].items():
+                acumulado += n
+                lineas.append(f'parques_fase_segundos_bucket{{fase="{fase}",le="{limite / 1e9:g}"}} {acumulado}')
+            lineas.append(f'parques_fase_segundos_bucket{{fase="{fase}",le="+Inf"}} {h["cuenta"]}')
+            lineas.append(f'parques_fase_segundos_sum{{fase="{fase}"}} {h["total_ns"] / 1e9:g}')
+            lineas.append(f'parques_fase_segundos_count{{fase="{fase}"}} {h["cuenta"]}')
+        return "\n".join(lineas) + "\n"
+
+    def resumen(self):
+        datos = self.a_dict()
+        lineas = [f"{datos['partidas']} partidas"]
+        for fase, h in datos["tiempos"].items():
+            lineas.append(f"{fase:12} {h['cuenta']:9} llamadas  media {h['media_ns'] / 1000:8.1f} µs  "
+                          f"p50 <= {h['p50_ns'] / 1000:8.1f} µs  p99 <= {h['p99_ns'] / 1000:8.1f} µs")
+        for nombre, n in datos["contadores"].items():
+            lineas.append(f"{nombre:30} {n}")
+        return "\n".join(lineas)
+
+
+class InstrumentosJuego:
+    # Instrumenta un juego mientras dura la partida; terminar() lo deja como estaba
+    def __init__(self, metricas, juego):
+        self.metricas = metricas
+        self.juego = juego
+        self.castigo = False
+        for fase, nombre in FASES.items():
+            setattr(juego, nombre, self._medir(fase, getattr(juego, nombre)))
+        # El castigo de tres dobles se avisa (CastigoDobles) justo antes de su capturar_ficha
+        capturar = juego.capturar_ficha
+        captura, castigo = metricas.tiempo(CAPTURA), metricas.tiempo(CASTIGO)
+
+        def capturar_ficha(ficha):
+            histograma = castigo if self.castigo else captura
+            self.castigo = False
+            inicio = time.perf_counter_ns()
+            try:
+                return capturar(ficha)
+            finally:
+                histograma.registrar(time.perf_counter_ns() - inicio)
+        juego.capturar_ficha = capturar_ficha
+        self.suscripcion = juego.bus.suscribir(self._contar, (MovimientoRechazado, Captura, CastigoDobles, Dobles,
+                                                              SalidaCarcel, SalidaBloqueada, LlegadaCasa,
+                                                              BonusOtorgado, TurnoOmitido))
+
+    def _medir(self, fase, metodo):
+        histograma = self.metricas.tiempo(fase)
+        reloj = time.perf_counter_ns
+        perfil = self.metricas.perfil if fase == "turno" else None
+
+        def medido(*args):
+            if perfil is not None:
+                perfil.enable()
+            inicio = reloj()
+            try:
+                return metodo(*args)
+            finally:
+                histograma.registrar(reloj() - inicio)
+                if perfil is not None:
+                    perfil.disable()
+        return medido
+
+    def _contar(self, evento):
+        if isinstance(evento, MovimientoRechazado):
+            self.metricas.contar(f"rechazo_{evento.motivo}")
+            return
+        if isinstance(evento, CastigoDobles):
+            self.castigo = True
+        self.metricas.contar(type(evento).__name__)
+
+    def terminar(self):
+        self.juego.bus.desuscribir(self.suscripcion)
+        for nombre in (*FASES.values(), "capturar_ficha"):
+            del self.juego.__dict__[nombre]
+        self.metricas.partidas += 1
+
+# =============================================================================
+# MUESTREO Y SERVIDOR
+# =============================================================================
+
+class Muestreador:
+    # Perfil por muestreo: un hilo mira cada `intervalo` segundos qué funciones
+    # están en la pila del hilo observado. Mucho más barato que cProfile.
+    def __init__(self, intervalo=0.001, hilo=None):
+        self.intervalo = intervalo
+        self.hilo = hilo if hilo is not None else threading.get_ident()
+        self.muestras = 0
+        self.propias = {}     # Función en el tope de la pila
+        self.acumuladas = {}  # Función en cualquier parte de la pila
+        self._detener = threading.Event()
+        self._hilo_muestreo = None
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            marco = sys._current_frames().get(self.hilo)
+            if marco is None:
+                continue
+            self.muestras += 1
+            vistas = set()
+            tope = True
+            while marco is not None:
+                codigo = marco.f_code
+                clave = f"{codigo.co_filename.rsplit('/', 1)[-1]}:{codigo.co_firstlineno} {codigo.co_name}"
+                if tope:
+                    self.propias[clave] = self.propias.get(clave, 0) + 1
+                    tope = False
+                if clave not in vistas:
+                    vistas.add(clave)
+                    self.acumuladas[clave] = self.acumuladas.get(clave, 0) + 1
+                marco = marco.f_back
+
+    def __enter__(self):
+        self._hilo_muestreo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo_muestreo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._detener.set()
+        self._hilo_muestreo.join()
+
+    def resumen(self, n=15):
+        lineas = [f"{self.muestras} muestras", "propias:"]
+        for clave, cuenta in sorted(self.propias.items(), key=lambda x: -x[1])[:n]:
+            lineas.append(f"  {cuenta / self.muestras:6.1%}  {clave}")
+        lineas.append("acumuladas:")
+        for clave, cuenta in sorted(self.acumuladas.items(), key=lambda x: -x[1])[:n]:
+            lineas.append(f"  {cuenta / self.muestras:6.1%}  {clave}")
+        return "\n".join(lineas)
+
+
+def servir(metricas, puerto=9100, host="127.0.0.1"):
+    # Expone las métricas en http://host:puerto/metrics (formato Prometheus) y
+    # /json. Devuelve el servidor; shutdown() lo detiene.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Solo quien sirve paga la importación
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                cuerpo, tipo = metricas.texto_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/json":
+                cuerpo, tipo = json.dumps(metricas.a_dict()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            datos = cuerpo.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, puerto), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    # python metricas.py simular [partidas] [salida.json] [perfil.prof]
+    # python metricas.py muestrear [partidas]
+    # python metricas.py servir [partidas] [puerto]
+    import cProfile
+    from simulacion import simulate
+
+    accion = sys.argv[1] if len(sys.argv) > 1 else "simular"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    if accion == "simular":
+        perfil = cProfile.Profile() if len(sys.argv) > 4 else None
+        metricas = Metricas(perfil)
+        simulate(n, 0, metricas=metricas)
+        print(metricas.resumen())
+        if len(sys.argv) > 3:
+            metricas.volcar(sys.argv[3])
+        if perfil is not None:
+            perfil.dump_stats(sys.argv[4])
+    elif accion == "muestrear":
+        with Muestreador() as muestreador:
+            simulate(n, 0)
+        print(muestreador.resumen())
+    else:
+        puerto = int(sys.argv[3]) if len(sys.argv) > 3 else 9100
+        metricas = Metricas()
+        servidor = servir(metricas, puerto)
+        print(f"Métricas en http://127.0.0.1:{puerto}/metrics")
+        # Las partidas se instrumentan con métricas propias y se suman al
+        # terminar, así el servidor nunca ve un histograma a medio escribir
+        try:
+            while True:
+                parciales = Metricas()
+                simulate(n, None, metricas=parciales)
+                metricas.combinar(parciales)
+        except KeyboardInterrupt:
+            servidor.shutdown()
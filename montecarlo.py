@@ -0,0 +1,233 @@
+import os
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from agentes import AgenteCodicioso
+from estado import BONUS, CASA, COLOR_INDICE, TAMANO, EstadoCompacto
+from movimientos import destino_legal, fichas_movibles, legal_moves, make_move, make_turn, siguiente_turno
+from nucleo import COLORS, HOME_SIZE
+
+# =============================================================================
+# MONTE CARLO EN PARALELO
+# =============================================================================
+# Para elegir ficha se juegan partidas al azar (rollouts) desde la posición
+# que deja cada candidata y se elige la que más gana. La paralelización es en
+# la raíz: cada proceso juega rollouts de todas las candidatas por turnos y
+# devuelve sus victorias; al vencer el presupuesto de tiempo se suman las de
+# los procesos que respondieron.
+#
+# La posición no se envía con pickle: se escribe en un bloque de
+# multiprocessing.shared_memory como un array("h") con
+#   [número de candidatas, turno extra, estado compacto, (ficha, pasos)...]
+# y a cada proceso solo le llega el nombre del bloque, la hora límite y su
+# semilla.
+
+PRESUPUESTO = 0.1       # Segundos por decisión
+MARGEN = 0.05           # Espera extra por los procesos antes de sumar lo que haya
+MAX_TURNOS_ROLLOUT = 1000
+
+_CABECERA = 2
+
+# -------------------------------------------------------------- Rollouts
+
+def gastar_bonus(estado, equipo):
+    # Política de los rollouts: cada vez la ficha que pueda mover más pasos
+    # del bonus los mueve, hasta que se acabe o nadie pueda moverse
+    datos = estado.datos
+    while datos[BONUS + equipo] > 0:
+        restante = datos[BONUS + equipo]
+        mejor = None
+        for indice in fichas_movibles(estado, equipo):
+            for pasos in range(restante, 0, -1):
+                if destino_legal(estado, equipo, indice, pasos) >= 0:
+                    if mejor is None or pasos > mejor[1]:
+                        mejor = (indice, pasos)
+                    break
+        if mejor is None:
+            return
+        datos[BONUS + equipo] -= mejor[1]
+        make_move(estado, mejor)
+
+def ganador(estado, equipo):
+    base = equipo * HOME_SIZE
+    return all(codigo == CASA for codigo in estado.datos[base:base + HOME_SIZE])
+
+def rollout(estado, rng, max_turnos=MAX_TURNOS_ROLLOUT):
+    # Juega al azar sobre el estado (lo modifica) hasta que alguien gana;
+    # devuelve el índice del ganador o -1 si se llega al límite de turnos
+    for _ in range(max_turnos):
+        equipo = estado.equipo_actual()
+        gastar_bonus(estado, equipo)
+        if ganador(estado, equipo):
+            return equipo
+        dados = (rng.randint(1, 6), rng.randint(1, 6))
+        jugadas = legal_moves(estado, dados, equipo)
+        make_turn(estado, dados, rng.choice(jugadas) if jugadas else ())
+        if ganador(estado, equipo):
+            return equipo
+    return -1
+
+def _leer_raiz(buffer):
+    valores = array("h")
+    valores.frombytes(bytes(buffer))
+    n, turno_extra = valores[0], valores[1]
+    raiz = EstadoCompacto(valores[_CABECERA:_CABECERA + TAMANO])
+    raiz.recalcular_mascaras()
+    candidatas = [(valores[i], valores[i + 1]) for i in range(_CABECERA + TAMANO, _CABECERA + TAMANO + 2 * n, 2)]
+    return raiz, candidatas, bool(turno_extra)
+
+def _posiciones(raiz, candidatas, turno_extra):
+    # Estado después de cada candidata, ya con el turno avanzado
+    posiciones = []
+    for movimiento in candidatas:
+        estado = raiz.copia()
+        make_move(estado, movimiento)
+        siguiente_turno(estado, turno_extra)
+        posiciones.append(estado)
+    return posiciones
+
+def _trabajar(nombre, limite, semilla):
+    # Proceso trabajador: lee la raíz del bloque compartido y juega rollouts
+    # por turnos hasta la hora límite. Devuelve [(victorias, rollouts)].
+    try:
+        bloque = shared_memory.SharedMemory(name=nombre)
+    except FileNotFoundError:
+        return None  # La decisión ya se tomó sin este proceso
+    try:
+        raiz, candidatas, turno_extra = _leer_raiz(bloque.buf)
+    finally:
+        bloque.close()
+    equipo = raiz.equipo_actual()
+    posiciones = _posiciones(raiz, candidatas, turno_extra)
+    conteos = [[0, 0] for _ in candidatas]
+    rng = random.Random(semilla)
+    while time.time() < limite:
+        for posicion, conteo in zip(posiciones, conteos):
+            conteo[0] += rollout(posicion.copia(), rng) == equipo
+            conteo[1] += 1
+    return conteos
+
+# -------------------------------------------------------------- Raíz
+
+class MonteCarloRaiz:
+    def __init__(self, procesos=None, presupuesto=PRESUPUESTO, seed=None):
+        self.procesos = procesos or os.cpu_count()
+        self.presupuesto = presupuesto
+        self.rng = random.Random(seed)
+        self._executor = None
+
+    def _pool(self):
+        # Los procesos se crean una vez y se reutilizan en cada decisión
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.procesos)
+        return self._executor
+
+    def evaluar(self, estado, candidatas, turno_extra, presupuesto=None):
+        # [(victorias, rollouts)] por candidata (ficha, pasos) del equipo actual
+        limite = time.time() + (presupuesto or self.presupuesto)
+        valores = array("h", [len(candidatas), int(turno_extra)])
+        valores.extend(estado.datos)
+        for indice, pasos in candidatas:
+            valores.extend((indice, pasos))
+        crudo = valores.tobytes()
+        bloque = shared_memory.SharedMemory(create=True, size=len(crudo))
+        try:
+            bloque.buf[:len(crudo)] = crudo
+            futuros = [self._pool().submit(_trabajar, bloque.name, limite, self.rng.getrandbits(64))
+                       for _ in range(self.procesos)]
+            listos, _ = wait(futuros, timeout=max(0.0, limite - time.time()) + MARGEN)
+        finally:
+            bloque.close()
+            bloque.unlink()
+        totales = [[0, 0] for _ in candidatas]
+        for futuro in listos:
+            conteos = futuro.result()
+            for total, conteo in zip(totales, conteos or ()):
+                total[0] += conteo[0]
+                total[1] += conteo[1]
+        return [tuple(total) for total in totales]
+
+    def cerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+class AgenteMonteCarlo:
+    # Elige ficha con MonteCarloRaiz; la cárcel y el bonus los decide el
+    # agente de respaldo. Llamar a cerrar() al terminar para liberar los procesos.
+    def __init__(self, procesos=None, presupuesto=PRESUPUESTO, seed=None, respaldo=None):
+        self.raiz = MonteCarloRaiz(procesos, presupuesto, seed)
+        self.respaldo = respaldo or AgenteCodicioso()
+        self.ultima = []  # [(ficha, victorias, rollouts)] de la última decisión
+
+    def sacar_de_carcel(self, juego, equipo, dados):
+        return self.respaldo.sacar_de_carcel(juego, equipo, dados)
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        estado = EstadoCompacto.desde_juego(juego)
+        t = COLOR_INDICE[equipo.color]
+        legales = [f for f in movibles if destino_legal(estado, t, t * HOME_SIZE + f.id, pasos) >= 0]
+        if len(legales) < 2:
+            return legales
+        # Game ya contó los dobles de este lanzamiento
+        turno_extra = juego.doubles_count[equipo.color] > 0
+        conteos = self.raiz.evaluar(estado, [(t * HOME_SIZE + f.id, pasos) for f in legales], turno_extra)
+        self.ultima = [(f, victorias, n) for f, (victorias, n) in zip(legales, conteos)]
+        orden = sorted(self.ultima, key=lambda c: c[1] / c[2] if c[2] else 0.0, reverse=True)
+        return [f for f, _, _ in orden]
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        return self.respaldo.elegir_bonus(juego, equipo, movibles, restantes)
+
+    def cerrar(self):
+        self.raiz.cerrar()
+
+
+if __name__ == "__main__":
+    # python montecarlo.py medir [presupuesto] [procesos]
+    # python montecarlo.py probar [partidas] [presupuesto] [procesos]
+    from simulacion import jugar_partida
+
+    accion = sys.argv[1] if len(sys.argv) > 1 else "medir"
+    if accion == "medir":
+        # Rollouts por segundo desde una posición de media partida
+        from nucleo import Game
+
+        presupuesto = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+        procesos = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        juego = Game("YGRB", agentes={color: AgenteCodicioso() for color in COLORS},
+                     rng=random.Random(0), silencioso=True)
+        juego.run(80)
+        estado = EstadoCompacto.desde_juego(juego)
+        equipo = estado.equipo_actual()
+        candidatas = [(indice, 7) for indice in fichas_movibles(estado, equipo)
+                      if destino_legal(estado, equipo, indice, 7) >= 0]
+        raiz = MonteCarloRaiz(procesos, presupuesto, seed=0)
+        raiz.evaluar(estado, candidatas, False, 0.05)  # Arranca los procesos
+        inicio = time.perf_counter()
+        conteos = raiz.evaluar(estado, candidatas, False)
+        duracion = time.perf_counter() - inicio
+        raiz.cerrar()
+        total = sum(n for _, n in conteos)
+        print(f"{len(candidatas)} candidatas, {raiz.procesos} procesos: {total} rollouts en {duracion:.3f} s "
+              f"({total / duracion:.0f}/s)")
+        for (indice, pasos), (victorias, n) in zip(candidatas, conteos):
+            print(f"  ficha {indice} +{pasos}: {victorias}/{n}")
+    else:
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+        presupuesto = float(sys.argv[3]) if len(sys.argv) > 3 else PRESUPUESTO
+        procesos = int(sys.argv[4]) if len(sys.argv) > 4 else None
+        agente = AgenteMonteCarlo(procesos, presupuesto, seed=0)
+        agentes = {color: AgenteCodicioso() for color in COLORS}
+        agentes[COLORS[0]] = agente
+        victorias = 0
+        for i in range(n):
+            orden = ("YGRB", "GRBY", "RBYG", "BYGR")[i % 4]
+            victorias += jugar_partida(agentes, orden, i).ganador() == COLORS[0]
+        agente.cerrar()
+        print(f"AgenteMonteCarlo contra tres AgenteCodicioso: {victorias / n:.1%} de victorias")
@@ -0,0 +1,228 @@
+from array import array
+
+from estado import BONUS, CARCEL, CASA, COLOR_INDICE, DOBLES, INTERNO, TURNO
+from nucleo import BOARD_SIZE, COLORS, FINISH_TRACK_LENGTH, HOME_SIZE, SAFE_CELLS, SALIDAS, SEGURO_LLEGADA
+
+# =============================================================================
+# TABLAS DE TRANSICIÓN
+# =============================================================================
+# DESTINOS[(equipo, código, pasos)] da el código de destino de una ficha (ver
+# estado.py) o -1 si el movimiento excede la pista interna. Se calcula una sola
+# vez al importar con las mismas reglas de Game.mover_ficha_externa y
+# Game.mover_ficha_interna; la ocupación de las casillas se revisa aparte.
+
+# Ningún recorrido desde la salida hasta la casa supera estos pasos
+MAX_PASOS = BOARD_SIZE + FINISH_TRACK_LENGTH
+NUM_CODIGOS = CASA + 1
+
+# Pasos usados para indicar que la ficha sale de la cárcel
+SALIR = 0
+
+BONUS_CASA = 10
+BONUS_CAPTURA = 20
+
+SALIDA_EQUIPO = [SALIDAS[color] for color in COLORS]
+
+def _calcular_destino(color, codigo, pasos):
+    if CARCEL < codigo < INTERNO:
+        nueva_pos = (codigo + pasos - 1) % BOARD_SIZE + 1
+        distancia = (SEGURO_LLEGADA[color] - codigo) % BOARD_SIZE
+        if 0 < distancia <= pasos:
+            pasos_internos = pasos - distancia
+            return INTERNO + pasos_internos if pasos_internos < FINISH_TRACK_LENGTH else -1
+        return nueva_pos
+    if INTERNO <= codigo < CASA:
+        nueva = codigo + pasos
+        return nueva if nueva <= CASA else -1
+    return -1
+
+def _construir_tabla():
+    tabla = array("b")
+    for color in COLORS:
+        for codigo in range(NUM_CODIGOS):
+            for pasos in range(MAX_PASOS + 1):
+                tabla.append(_calcular_destino(color, codigo, pasos) if pasos else -1)
+    return tabla
+
+DESTINOS = _construir_tabla()
+
+def destino(equipo, codigo, pasos):
+    if pasos > MAX_PASOS:
+        return -1
+    return DESTINOS[(equipo * NUM_CODIGOS + codigo) * (MAX_PASOS + 1) + pasos]
+
+# =============================================================================
+# GENERADOR DE MOVIMIENTOS LEGALES
+# =============================================================================
+# Un movimiento es (índice de ficha, pasos); pasos == SALIR saca la ficha de la
+# cárcel. Una jugada es la tupla de movimientos de un lanzamiento: mover una
+# ficha la suma de los dados, o con un 5 sacar una ficha y, opcionalmente,
+# mover otra con el valor del otro dado (como en Game.turno).
+
+def destino_legal(estado, equipo, indice, pasos):
+    # Código de destino si el movimiento es legal, -1 si no
+    codigo = destino(equipo, estado.datos[indice], pasos)
+    if CARCEL < codigo < INTERNO:
+        bit = 1 << (codigo - 1)
+        if estado.ocupadas[equipo] & bit:
+            return -1  # Casilla llena o bloqueo propio
+        rivales = 0
+        for otro in range(len(COLORS)):
+            if otro != equipo and estado.ocupadas[otro] & bit:
+                rivales += 2 if estado.pares[otro] & bit else 1
+        if rivales >= 2 or (rivales and codigo in SAFE_CELLS):
+            return -1  # Casilla llena o seguro con ficha rival
+    return codigo
+
+def fichas_movibles(estado, equipo):
+    base = equipo * HOME_SIZE
+    datos = estado.datos
+    return [i for i in range(base, base + HOME_SIZE) if CARCEL < datos[i] < CASA]
+
+def ficha_en_carcel(estado, equipo):
+    # Game siempre saca la primera ficha de la cárcel
+    base = equipo * HOME_SIZE
+    for i in range(base, base + HOME_SIZE):
+        if estado.datos[i] == CARCEL:
+            return i
+    return None
+
+def puede_salir(estado, equipo):
+    indice = ficha_en_carcel(estado, equipo)
+    if indice is None or not estado.casilla_disponible(SALIDA_EQUIPO[equipo]):
+        return None
+    return indice
+
+def aplicar_movimiento(estado, equipo, indice, pasos):
+    # Aplica un movimiento legal con capturas y bonus; devuelve False si no lo es
+    return make_move(estado, (indice, pasos)) is not None
+
+def legal_moves(estado, dados, equipo=None):
+    if equipo is None:
+        equipo = estado.equipo_actual()
+    elif isinstance(equipo, str):
+        equipo = COLOR_INDICE[equipo]
+    d1, d2 = dados
+    total = d1 + d2
+    jugadas = [((i, total),) for i in fichas_movibles(estado, equipo)
+               if destino_legal(estado, equipo, i, total) >= 0]
+    if 5 in dados:
+        indice = puede_salir(estado, equipo)
+        if indice is not None:
+            otro_valor = d2 if d1 == 5 else d1
+            salida = (indice, SALIR)
+            jugadas.append((salida,))
+            registro = make_move(estado, salida)
+            jugadas.extend((salida, (i, otro_valor)) for i in fichas_movibles(estado, equipo)
+                           if destino_legal(estado, equipo, i, otro_valor) >= 0)
+            unmake_move(estado, registro)
+    return jugadas
+
+def aplicar_jugada(estado, equipo, jugada):
+    for indice, pasos in jugada:
+        aplicar_movimiento(estado, equipo, indice, pasos)
+
+# =============================================================================
+# TURNOS
+# =============================================================================
+
+def aplicar_castigo(estado, equipo):
+    # Tres dobles: la primera ficha del tablero, o si no la primera de la pista
+    # interna, vuelve a la cárcel (como movibles[0] en Game.turno).
+    # Devuelve (índice, código anterior) o None si no hay fichas movibles.
+    base = equipo * HOME_SIZE
+    datos = estado.datos
+    for limite_inferior, limite_superior in ((CARCEL + 1, INTERNO), (INTERNO, CASA)):
+        for i in range(base, base + HOME_SIZE):
+            codigo = datos[i]
+            if limite_inferior <= codigo < limite_superior:
+                estado.poner(i, CARCEL)
+                return i, codigo
+    return None
+
+def registrar_dados(estado, equipo, dados):
+    # Actualiza el contador de dobles; devuelve True si toca el castigo
+    if dados[0] != dados[1]:
+        estado.datos[DOBLES + equipo] = 0
+        return False
+    estado.datos[DOBLES + equipo] += 1
+    if estado.datos[DOBLES + equipo] == 3:
+        estado.datos[DOBLES + equipo] = 0
+        return True
+    return False
+
+def siguiente_turno(estado, turno_extra=False):
+    if not turno_extra:
+        estado.datos[TURNO] = (estado.datos[TURNO] + 1) % len(COLORS)
+
+# =============================================================================
+# HACER / DESHACER
+# =============================================================================
+# make_move aplica un movimiento sobre el estado y devuelve un registro con lo
+# necesario para revertirlo: (índice, código anterior, ficha capturada o -1,
+# bonus ganado). La búsqueda explora un árbol aplicando y deshaciendo sobre un
+# único estado, sin copiarlo en cada nodo. Con estado.JuegoCompacto también
+# sirve para explorar desde una partida en curso: sus fichas leen este estado.
+
+def make_move(estado, movimiento):
+    # Devuelve None (sin cambiar nada) si el movimiento no es legal
+    indice, pasos = movimiento
+    equipo = indice // HOME_SIZE
+    anterior = estado.datos[indice]
+    if pasos == SALIR:
+        if anterior != CARCEL or not estado.casilla_disponible(SALIDA_EQUIPO[equipo]):
+            return None
+        estado.poner(indice, SALIDA_EQUIPO[equipo])
+        return indice, anterior, -1, 0
+    codigo = destino_legal(estado, equipo, indice, pasos)
+    if codigo < 0:
+        return None
+    capturada = -1
+    bonus = 0
+    if codigo < INTERNO:
+        for capturada in estado.fichas_en(codigo):
+            estado.poner(capturada, CARCEL)
+            bonus = BONUS_CAPTURA
+    elif codigo == CASA:
+        bonus = BONUS_CASA
+    estado.datos[BONUS + equipo] += bonus
+    estado.poner(indice, codigo)
+    return indice, anterior, capturada, bonus
+
+def unmake_move(estado, registro):
+    indice, anterior, capturada, bonus = registro
+    codigo = estado.datos[indice]
+    estado.datos[BONUS + indice // HOME_SIZE] -= bonus
+    estado.poner(indice, anterior)
+    if capturada >= 0:
+        estado.poner(capturada, codigo)
+
+def make_turn(estado, dados, jugada):
+    # Un turno completo del equipo actual: dobles, castigo, jugada y cambio
+    # de turno. El registro guarda turno, dobles y ficha castigada anteriores.
+    datos = estado.datos
+    equipo = estado.equipo_actual()
+    turno = datos[TURNO]
+    dobles = datos[DOBLES + equipo]
+    castigada = None
+    registros = []
+    if registrar_dados(estado, equipo, dados):
+        castigada = aplicar_castigo(estado, equipo)
+        siguiente_turno(estado)
+    else:
+        for movimiento in jugada:
+            registro = make_move(estado, movimiento)
+            if registro is None:
+                break
+            registros.append(registro)
+        siguiente_turno(estado, dados[0] == dados[1])
+    return turno, equipo, dobles, castigada, registros
+
+def unmake_turn(estado, registro):
+    turno, equipo, dobles, castigada, registros = registro
+    for registro_movimiento in reversed(registros):
+        unmake_move(estado, registro_movimiento)
+    if castigada is not None:
+        estado.poner(*castigada)
+    estado.datos[DOBLES + equipo] = dobles
+    estado.datos[TURNO] = turno
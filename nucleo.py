@@ -0,0 +1,489 @@
+import random
+
+from dados import DadosAleatorios
+from eventos import (BLOQUEO_PROPIO, CASILLA_LLENA, EXCEDE_PISTA, NO_MOVIBLE, SEGURO_OCUPADO, AvanceInterno,
+                     BonusOtorgado, BonusPendiente, BonusRestante, BusEventos, Captura, CastigoDobles, DadosLanzados,
+                     Dobles, EntradaInvalida, EntradaPistaInterna, EstadoCambiado, EstadoTablero, FichaEncarcelada,
+                     FichaMovida, FichasMovibles, FinTurno, LimiteTurnos, LlegadaCasa, MovimientoHecho,
+                     MovimientoRechazado, PartidaIniciada, PartidaTerminada, SalidaBloqueada, SalidaCarcel,
+                     SinMovimiento, TurnoIniciado, TurnoOmitido, Victoria, suscribir_consola)
+
+# =============================================================================
+# NÚCLEO DEL JUEGO
+# =============================================================================
+# Reglas y clases del juego sin interfaz: no importa tkinter ni arma las
+# tablas del tablero dibujado, así que es lo único que cargan los procesos
+# que solo simulan. La interfaz está en interfaz.py.
+
+# =============================================================================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================================================================
+
+BOARD_SIZE = 68
+FINISH_TRACK_LENGTH = 8   # Casillas internas: índices 0 a 7; la posición 7 es “la llegada”
+HOME_SIZE = 4             # Para ganar, todas las fichas deben llegar a la casa
+
+COLORS = ["amarillas", "verdes", "rojas", "azules"]
+
+SALIDAS = {
+    "amarillas": 4,
+    "verdes": 21,
+    "rojas": 38,
+    "azules": 55
+}
+
+SEGUROS = {
+    "amarillas": [4, 11],
+    "verdes": [21, 28],
+    "rojas": [38, 45],
+    "azules": [55, 62]
+}
+SAFE_CELLS = set([4, 11, 21, 28, 38, 45, 55, 62])
+
+SEGURO_LLEGADA = {
+    "amarillas": 67,
+    "verdes": 16,
+    "rojas": 33,
+    "azules": 50
+}
+
+# =============================================================================
+# CLASES DEL JUEGO
+# =============================================================================
+
+class Piece:
+    def __init__(self, team, id):
+        self.team = team      # Color del equipo
+        self.id = id          # Identificador (0 a 3)
+        self.state = "carcel" # "carcel", "externo", "interno", "casa"
+        self.position = None  # Número de casilla (para externo) o índice (para interno)
+
+    def __repr__(self):
+        return f"{self.team[0].upper()}{self.id}"
+
+class Team:
+    def __init__(self, color):
+        self.color = color
+        self.pieces = [Piece(color, i) for i in range(HOME_SIZE)]
+        self.internal = [None] * FINISH_TRACK_LENGTH
+        self.home = []
+
+    def fichas_en_carcel(self):
+        return [p for p in self.pieces if p.state == "carcel"]
+
+    def fichas_en_tablero(self):
+        return [p for p in self.pieces if p.state == "externo"]
+
+    def fichas_internas(self):
+        return [p for p in self.pieces if p.state == "interno"]
+
+    def fichas_movibles(self):
+        return self.fichas_en_tablero() + self.fichas_internas()
+
+    def todas_en_casa(self):
+        return len(self.home) == HOME_SIZE
+
+    def __repr__(self):
+        return f"Equipo {self.color}"
+
+class Board:
+    def __init__(self):
+        self.cells = {i: [] for i in range(1, BOARD_SIZE+1)}
+
+    def is_cell_available(self, cell):
+        return len(self.cells[cell]) < 2
+
+    def add_piece(self, cell, piece):
+        if self.is_cell_available(cell):
+            self.cells[cell].append(piece)
+        else:
+            raise Exception(f"La casilla {cell} ya tiene 2 fichas.")
+
+    def remove_piece(self, cell, piece):
+        if piece in self.cells[cell]:
+            self.cells[cell].remove(piece)
+
+    def get_pieces(self, cell):
+        return self.cells[cell]
+
+    def move_piece(self, from_cell, to_cell, piece):
+        self.remove_piece(from_cell, piece)
+        self.add_piece(to_cell, piece)
+
+    def __repr__(self):
+        board_str = ""
+        for i in range(1, BOARD_SIZE+1):
+            if self.cells[i]:
+                board_str += f"{i}:{self.cells[i]}  "
+        return board_str
+
+# =============================================================================
+# CLASE PRINCIPAL DEL JUEGO
+# =============================================================================
+
+class Game:
+    def __init__(self, turn_order, agentes=None, rng=None, silencioso=False, bus=None, dados=None, auto_bonus=False):
+        self.turn_order = []
+        mapping = {"R": "rojas", "B": "azules", "G": "verdes", "Y": "amarillas"}
+        for ch in turn_order.upper():
+            if ch in mapping:
+                self.turn_order.append(mapping[ch])
+        for color in COLORS:
+            if color not in self.turn_order:
+                self.turn_order.append(color)
+        self.teams = {color: Team(color) for color in COLORS}
+        self.board = Board()
+        self.turn_index = 0
+        self.bonus_moves = {}
+        self.doubles_count = {color: 0 for color in COLORS}
+        self.turnos = 0
+        # Agentes que reemplazan las preguntas por consola (color -> agente)
+        self.agentes = agentes or {}
+        # Con auto_bonus los jugadores sin agente no escriben el bonus: lo
+        # reparte bonus.AgenteBonus (ver bonus.py)
+        self.auto_bonus = auto_bonus
+        self._agente_bonus = None
+        # Generador de números aleatorios; por defecto el módulo global random
+        self.rng = rng or random
+        # Fuente de dados (ver dados.py); por defecto tira con self.rng
+        self.dados = dados or DadosAleatorios(self.rng)
+        # Todo lo que pasa en la partida se publica en el bus (ver eventos.py);
+        # en modo silencioso nadie imprime los eventos en la consola
+        self.bus = bus or BusEventos()
+        self.emitir = self.bus.emitir
+        self.silencioso = silencioso
+        if not silencioso:
+            suscribir_consola(self.bus)
+        self._suscripcion_ui = None
+
+    @property
+    def update_callback(self):
+        return lambda: self.emitir(EstadoCambiado)
+
+    @update_callback.setter
+    def update_callback(self, funcion):
+        # Compatibilidad: la función se suscribe a EstadoCambiado en el bus
+        if self._suscripcion_ui is not None:
+            self.bus.desuscribir(self._suscripcion_ui)
+        self._suscripcion_ui = self.bus.suscribir(lambda evento: funcion(), EstadoCambiado)
+
+    def roll_dice(self):
+        d1, d2 = self.dados.lanzar()
+        self.emitir(DadosLanzados, self.turn_order[self.turn_index], d1, d2)
+        return d1, d2
+
+    def start_turn(self, team_color):
+        self.emitir(TurnoIniciado, team_color)
+        if team_color in self.agentes:
+            return self.roll_dice()
+        input_cmd = input("Escribe 'GO' para tirar los dados: ").strip().upper()
+        if input_cmd != "GO":
+            self.emitir(TurnoOmitido, team_color, False)
+            return None
+        return self.roll_dice()
+
+    def can_salir_de_carcel(self, dice):
+        return 5 in dice
+
+    def sacar_ficha_de_carcel(self, team):
+        if not team.fichas_en_carcel():
+            return None
+        salida = SALIDAS[team.color]
+        if not self.board.is_cell_available(salida):
+            self.emitir(SalidaBloqueada, team.color, salida)
+            return None
+        ficha = team.fichas_en_carcel()[0]
+        ficha.state = "externo"
+        ficha.position = salida
+        self.board.add_piece(salida, ficha)
+        self.emitir(SalidaCarcel, ficha, salida)
+        self.emitir(EstadoCambiado)
+        return ficha
+
+    def mover_ficha_externa(self, team, ficha, pasos):
+        pos_inicial = ficha.position
+        nueva_pos = (pos_inicial + pasos - 1) % BOARD_SIZE + 1
+        seguro_llegada = SEGURO_LLEGADA[team.color]
+        if self._pasa_seguro(pos_inicial, nueva_pos, seguro_llegada, pasos):
+            # Pasos que sobran después de alcanzar el seguro de llegada
+            pasos_internos = pasos - (seguro_llegada - pos_inicial) % BOARD_SIZE
+            if pasos_internos < FINISH_TRACK_LENGTH - 1:
+                ficha.state = "interno"
+                ficha.position = pasos_internos
+                self.board.remove_piece(pos_inicial, ficha)
+                self.emitir(EntradaPistaInterna, ficha, pasos_internos)
+            elif pasos_internos == FINISH_TRACK_LENGTH - 1:
+                ficha.state = "casa"
+                ficha.position = None
+                self.board.remove_piece(pos_inicial, ficha)
+                team.home.append(ficha)
+                self.emitir(LlegadaCasa, ficha, False)
+                self.agregar_bonus(team.color, 10)
+            else:
+                self.emitir(MovimientoRechazado, ficha, None, EXCEDE_PISTA)
+                return False
+        else:
+            if not self.board.is_cell_available(nueva_pos):
+                self.emitir(MovimientoRechazado, ficha, nueva_pos, CASILLA_LLENA)
+                return False
+            piezas_destino = self.board.get_pieces(nueva_pos)
+            if piezas_destino:
+                if all(p.team == team.color for p in piezas_destino):
+                    self.emitir(MovimientoRechazado, ficha, nueva_pos, BLOQUEO_PROPIO)
+                    return False
+                else:
+                    if nueva_pos in SAFE_CELLS:
+                        self.emitir(MovimientoRechazado, ficha, nueva_pos, SEGURO_OCUPADO)
+                        return False
+                    else:
+                        for p in piezas_destino.copy():
+                            if p.team != team.color:
+                                self.capturar_ficha(p)
+                                self.emitir(Captura, ficha, p, nueva_pos)
+                                self.agregar_bonus(team.color, 20)
+            self.board.remove_piece(pos_inicial, ficha)
+            self.board.add_piece(nueva_pos, ficha)
+            ficha.position = nueva_pos
+            self.emitir(FichaMovida, ficha, pos_inicial, nueva_pos)
+        self.emitir(EstadoCambiado)  # Notifica la actualización a la UI
+        return True
+
+    def mover_ficha_interna(self, team, ficha, pasos):
+        pos_inicial = ficha.position
+        nueva_pos = pos_inicial + pasos
+        if nueva_pos < FINISH_TRACK_LENGTH - 1:
+            ficha.position = nueva_pos
+            self.emitir(AvanceInterno, ficha, pos_inicial, nueva_pos)
+        elif nueva_pos == FINISH_TRACK_LENGTH - 1:
+            ficha.state = "casa"
+            ficha.position = None
+            team.home.append(ficha)
+            self.emitir(LlegadaCasa, ficha, True)
+            self.agregar_bonus(team.color, 10)
+        else:
+            self.emitir(MovimientoRechazado, ficha, None, EXCEDE_PISTA)
+            return False
+        self.emitir(EstadoCambiado)  # Notifica la actualización
+        return True
+
+    def _pasa_seguro(self, pos_inicial, nueva_pos, seguro, pasos):
+        # Distancia hasta el seguro contando la vuelta de la casilla 68 a la 1
+        return 0 < (seguro - pos_inicial) % BOARD_SIZE <= pasos
+
+    def capturar_ficha(self, ficha):
+        team = self.teams[ficha.team]
+        if ficha.state == "externo":
+            self.board.remove_piece(ficha.position, ficha)
+        ficha.state = "carcel"
+        ficha.position = None
+        self.emitir(FichaEncarcelada, ficha)
+        self.emitir(EstadoCambiado)
+
+    def agregar_bonus(self, team_color, movimientos):
+        if team_color in self.bonus_moves:
+            self.bonus_moves[team_color] += movimientos
+        else:
+            self.bonus_moves[team_color] = movimientos
+        self.emitir(BonusOtorgado, team_color, movimientos)
+        self.emitir(EstadoCambiado)
+
+    def aplicar_bonus(self, team):
+        if self.bonus_moves.get(team.color, 0) > 0:
+            self.emitir(BonusPendiente, team.color, self.bonus_moves[team.color])
+            agente = self.agentes.get(team.color)
+            if agente is None and self.auto_bonus:
+                if self._agente_bonus is None:
+                    from bonus import AgenteBonus  # bonus.py importa este módulo
+                    self._agente_bonus = AgenteBonus()
+                agente = self._agente_bonus
+            while self.bonus_moves[team.color] > 0:
+                restantes = self.bonus_moves[team.color]
+                self.emitir(BonusRestante, team.color, restantes)
+                movibles = team.fichas_movibles()
+                if not movibles:
+                    self.emitir(SinMovimiento, team.color, True, True)
+                    break
+                self.emitir(FichasMovibles, team.color, movibles, True)
+                if agente is not None:
+                    opciones = [(f, p) for f, p in agente.elegir_bonus(self, team, movibles, restantes) if 0 < p <= restantes]
+                    pasos = self._intentar_movimientos(team, opciones)
+                    if not pasos:
+                        self.emitir(SinMovimiento, team.color, True, False)
+                        break
+                    self.bonus_moves[team.color] -= pasos
+                    continue
+                try:
+                    ficha_id = int(input("Selecciona el id de la ficha a mover (número entero): "))
+                except:
+                    self.emitir(EntradaInvalida, "Entrada inválida. Se omite bonus.")
+                    break
+                ficha = next((p for p in movibles if p.id == ficha_id), None)
+                if ficha is None:
+                    self.emitir(EntradaInvalida, "Ficha no encontrada.")
+                    continue
+                try:
+                    pasos = int(input("¿Cuántos pasos mover? (1 o más): "))
+                except:
+                    self.emitir(EntradaInvalida, "Entrada inválida.")
+                    continue
+                if pasos > self.bonus_moves[team.color]:
+                    self.emitir(EntradaInvalida, "No puede mover más pasos de los bonus disponibles.")
+                    continue
+                if self.mover_ficha(team, ficha, pasos):
+                    self.bonus_moves[team.color] -= pasos
+            if self.bonus_moves.get(team.color, 0) == 0:
+                del self.bonus_moves[team.color]
+        self.emitir(EstadoCambiado)
+
+    def mover_ficha(self, team, ficha, pasos):
+        if ficha.state == "externo":
+            movida = self.mover_ficha_externa(team, ficha, pasos)
+        elif ficha.state == "interno":
+            movida = self.mover_ficha_interna(team, ficha, pasos)
+        else:
+            self.emitir(MovimientoRechazado, ficha, ficha.position, NO_MOVIBLE)
+            return False
+        if movida:
+            self.emitir(MovimientoHecho, ficha, pasos)
+        return movida
+
+    def _intentar_movimientos(self, team, opciones):
+        # Prueba las opciones (ficha, pasos) en orden de preferencia del agente;
+        # un movimiento rechazado no modifica el estado. Devuelve los pasos usados.
+        for ficha, pasos in opciones:
+            if self.mover_ficha(team, ficha, pasos):
+                return pasos
+        return 0
+
+    def turno(self):
+        self.turnos += 1
+        equipo_actual = self.teams[self.turn_order[self.turn_index]]
+        agente = self.agentes.get(equipo_actual.color)
+        if self.bonus_moves.get(equipo_actual.color, 0) > 0:
+            self.aplicar_bonus(equipo_actual)
+        dados = self.start_turn(equipo_actual.color)
+        if dados is None:
+            self.siguiente_turno()
+            return
+
+        d1, d2 = dados
+        total = d1 + d2
+
+        if d1 == d2:
+            self.doubles_count[equipo_actual.color] += 1
+            extra_turn = True
+            self.emitir(Dobles, equipo_actual.color, self.doubles_count[equipo_actual.color])
+        else:
+            self.doubles_count[equipo_actual.color] = 0
+            extra_turn = False
+
+        if self.doubles_count[equipo_actual.color] == 3:
+            movibles = equipo_actual.fichas_movibles()
+            if movibles:
+                ficha_castigo = movibles[0]
+                self.emitir(CastigoDobles, equipo_actual.color, ficha_castigo)
+                self.capturar_ficha(ficha_castigo)
+            self.doubles_count[equipo_actual.color] = 0
+            self.siguiente_turno()
+            return
+
+        if (len(equipo_actual.fichas_en_carcel()) == HOME_SIZE and not self.can_salir_de_carcel((d1, d2))) or \
+           (not equipo_actual.fichas_movibles() and not self.can_salir_de_carcel((d1, d2))):
+            self.emitir(TurnoOmitido, equipo_actual.color, True)
+            self.siguiente_turno(extra_turn)
+            return
+
+        if self.can_salir_de_carcel((d1, d2)) and equipo_actual.fichas_en_carcel():
+            if agente is not None:
+                opcion = "s" if agente.sacar_de_carcel(self, equipo_actual, dados) else "n"
+            else:
+                opcion = input("¿Deseas sacar una ficha de la cárcel? (s/n): ").strip().lower()
+            if opcion == "s":
+                self.sacar_ficha_de_carcel(equipo_actual)
+                otro_valor = d2 if d1 == 5 else d1
+                if agente is not None:
+                    mover = "s"  # El agente puede no elegir ninguna ficha
+                else:
+                    mover = input(f"¿Deseas mover otra ficha {otro_valor} pasos? (s/n): ").strip().lower()
+                if mover == "s":
+                    self.seleccionar_y_mover(equipo_actual, otro_valor)
+                self.siguiente_turno(extra_turn)
+                return
+
+        self.seleccionar_y_mover(equipo_actual, total)
+        self.siguiente_turno(extra_turn)
+
+    def seleccionar_y_mover(self, team, pasos):
+        movibles = team.fichas_movibles()
+        if not movibles:
+            self.emitir(SinMovimiento, team.color, False, True)
+            return
+        self.emitir(FichasMovibles, team.color, movibles, False)
+        agente = self.agentes.get(team.color)
+        if agente is not None:
+            fichas = agente.elegir_fichas(self, team, movibles, pasos)
+            if not self._intentar_movimientos(team, [(f, pasos) for f in fichas]):
+                self.emitir(SinMovimiento, team.color, False, False)
+            return
+        try:
+            ficha_id = int(input("Selecciona el id de la ficha a mover: "))
+        except:
+            self.emitir(EntradaInvalida, "Entrada inválida. Se omite movimiento.")
+            return
+        ficha = next((p for p in movibles if p.id == ficha_id), None)
+        if ficha is None:
+            self.emitir(EntradaInvalida, "Ficha no encontrada.")
+            return
+        self.mover_ficha(team, ficha, pasos)
+
+    def siguiente_turno(self, turno_extra=False):
+        equipo = self.turn_order[self.turn_index]
+        if not turno_extra:
+            self.turn_index = (self.turn_index + 1) % len(self.turn_order)
+        self.emitir(FinTurno, equipo, turno_extra)
+        self.emitir(EstadoCambiado)
+
+    def ganador(self):
+        for color, team in self.teams.items():
+            if team.todas_en_casa():
+                return color
+        return None
+
+    def juego_terminado(self):
+        color = self.ganador()
+        if color is not None:
+            self.emitir(Victoria, color)
+            return True
+        return False
+
+    def estado_tablero(self):
+        self.emitir(EstadoTablero, self)
+
+    def run(self, max_turnos=None):
+        self.emitir(PartidaIniciada)
+        while not self.juego_terminado():
+            if max_turnos is not None and self.turnos >= max_turnos:
+                self.emitir(LimiteTurnos, self.turnos)
+                break
+            self.estado_tablero()
+            self.turno()
+        self.emitir(PartidaTerminada, self.ganador(), self.turnos)
+        self.emitir(EstadoCambiado)
+
+    # Guardar, cargar y bifurcar (ver guardado.py, que importa este módulo)
+    def guardar(self):
+        from guardado import empaquetar
+        return empaquetar(self)
+
+    @classmethod
+    def cargar(cls, datos, **kwargs):
+        from guardado import desempaquetar
+        return desempaquetar(datos, cls, **kwargs)
+
+    def fork(self, **kwargs):
+        # Juego independiente desde la posición actual; por defecto conserva
+        # los agentes y el auto_bonus, y no imprime en la consola
+        kwargs.setdefault("agentes", dict(self.agentes))
+        kwargs.setdefault("auto_bonus", self.auto_bonus)
+        kwargs.setdefault("silencioso", True)
+        return self.cargar(self.guardar(), **kwargs)
@@ -0,0 +1,366 @@
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+
+from dados import DadosGuionados
+from estado import BONUS, COLOR_INDICE, ORDEN, TAMANO, EstadoCompacto
+from eventos import DadosLanzados, FinTurno, MovimientoHecho, SalidaCarcel
+from movimientos import SALIR, make_move, make_turn, siguiente_turno
+from nucleo import COLORS, HOME_SIZE
+
+# =============================================================================
+# FORMATO DEL REGISTRO
+# =============================================================================
+# Un archivo de registro empieza con MAGICO y sigue con registros de 8 bytes.
+# El primer byte de cada registro es su tipo:
+#   INICIO  orden de turnos (4 índices de COLORS)
+#   BONUS   ficha y pasos de un movimiento bonus (antes de tirar los dados)
+#   TURNO   dados (d1 << 4 | d2, 0 si no se tiraron) y hasta dos movimientos
+#           (ficha, pasos); SIN_FICHA marca un movimiento vacío
+#   FOTO    número de turno; la siguen los registros DATOS con el estado
+#           compacto completo (7 bytes por registro)
+#   FIN     ganador (índice de COLORS o SIN_FICHA) y turnos jugados
+# Como todos los registros miden lo mismo, el índice de un archivo se arma
+# leyendo solo el primer byte de cada registro, sin decodificar el resto.
+# Las fichas se numeran como en estado.py y los pasos SALIR sacan de la cárcel.
+
+MAGICO = b"PARQUES\x01"
+TAMANO_REGISTRO = 8
+
+TIPO_INICIO = 1
+TIPO_BONUS = 2
+TIPO_TURNO = 3
+TIPO_FOTO = 4
+TIPO_DATOS = 5
+TIPO_FIN = 6
+
+SIN_FICHA = 0xFF
+
+_INICIO = struct.Struct("<B4B3x")
+_BONUS = struct.Struct("<BBB5x")
+_TURNO = struct.Struct("<BBBBBB2x")
+_FOTO = struct.Struct("<BI3x")
+_DATOS = struct.Struct("<B7s")
+_FIN = struct.Struct("<BBI2x")
+
+BYTES_ESTADO = 2 * TAMANO
+REGISTROS_FOTO = -(-BYTES_ESTADO // 7)
+
+# Una foto cada 64 turnos agrega ~1.3 bytes por turno y limita la
+# reproducción para buscar un turno a 63 turnos.
+INTERVALO_FOTO = 64
+
+_BUSCAR_INDICE = re.compile(b"[" + bytes([TIPO_INICIO, TIPO_FOTO, TIPO_FIN]) + b"]")
+
+def estado_inicial(orden):
+    estado = EstadoCompacto()
+    estado.datos[ORDEN:] = array("h", orden)
+    return estado
+
+def _bytes_estado(estado):
+    datos = estado.datos
+    if sys.byteorder != "little":
+        datos = array("h", datos)
+        datos.byteswap()
+    return datos.tobytes()
+
+def _estado_desde_bytes(crudo):
+    datos = array("h")
+    datos.frombytes(crudo[:BYTES_ESTADO])
+    if sys.byteorder != "little":
+        datos.byteswap()
+    estado = EstadoCompacto(datos)
+    estado.recalcular_mascaras()
+    return estado
+
+def aplicar_bonus(estado, indice, pasos):
+    make_move(estado, (indice, pasos))
+    estado.datos[BONUS + indice // HOME_SIZE] -= pasos
+
+def aplicar_turno(estado, dados, jugada):
+    if dados is None:
+        siguiente_turno(estado)  # Turno omitido sin tirar los dados
+    else:
+        make_turn(estado, dados, jugada)
+
+# =============================================================================
+# ESCRITURA
+# =============================================================================
+
+class EscritorRegistros:
+    # Agrega partidas al final del archivo a través de un buffer; nunca
+    # reescribe lo ya guardado, así que un archivo truncado sigue siendo legible
+    # hasta la última partida completa.
+    def __init__(self, ruta, intervalo_foto=INTERVALO_FOTO, tamano_buffer=1 << 20):
+        if os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+            with open(ruta, "rb") as archivo:
+                if archivo.read(len(MAGICO)) != MAGICO:
+                    raise Exception(f"{ruta} no es un registro de partidas.")
+            nuevo = False
+        else:
+            nuevo = True
+        self.archivo = open(ruta, "ab", buffering=tamano_buffer)
+        if nuevo:
+            self.archivo.write(MAGICO)
+        self.intervalo_foto = intervalo_foto
+        self.turnos = 0
+
+    def iniciar_partida(self, orden, estado=None):
+        self.archivo.write(_INICIO.pack(TIPO_INICIO, *orden))
+        self.turnos = 0
+        # Solo se guarda el estado si la partida no empieza desde cero
+        if estado is not None and estado != estado_inicial(orden):
+            self.escribir_foto(estado)
+
+    def escribir_bonus(self, indice, pasos):
+        self.archivo.write(_BONUS.pack(TIPO_BONUS, indice, pasos))
+
+    def escribir_turno(self, dados, jugada):
+        if len(jugada) > 2:
+            raise Exception("Un turno tiene como máximo dos movimientos.")
+        codigo = dados[0] << 4 | dados[1] if dados else 0
+        movimientos = list(jugada) + [(SIN_FICHA, 0)] * (2 - len(jugada))
+        (f1, p1), (f2, p2) = movimientos
+        self.archivo.write(_TURNO.pack(TIPO_TURNO, codigo, f1, p1, f2, p2))
+        self.turnos += 1
+
+    def toca_foto(self):
+        return self.turnos % self.intervalo_foto == 0
+
+    def escribir_foto(self, estado):
+        crudo = _bytes_estado(estado).ljust(7 * REGISTROS_FOTO, b"\0")
+        self.archivo.write(_FOTO.pack(TIPO_FOTO, self.turnos))
+        for i in range(REGISTROS_FOTO):
+            self.archivo.write(_DATOS.pack(TIPO_DATOS, crudo[7 * i:7 * (i + 1)]))
+
+    def terminar_partida(self, ganador, turnos):
+        self.archivo.write(_FIN.pack(TIPO_FIN, SIN_FICHA if ganador is None else ganador, turnos))
+
+    def close(self):
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.close()
+
+
+class GrabadorJuego:
+    # Se suscribe al bus de eventos de Game y traduce lo que pasa en la partida
+    # a registros: los movimientos antes de los dados son bonus, los que siguen
+    # forman la jugada del turno, que se escribe al pasar el turno.
+    def __init__(self, escritor, juego):
+        self.escritor = escritor
+        self.juego = juego
+        self._dados = None
+        self._jugada = []
+        orden = [COLOR_INDICE[c] for c in juego.turn_order]
+        escritor.iniciar_partida(orden, EstadoCompacto.desde_juego(juego))
+        self._suscripcion = juego.bus.suscribir(self.recibir, (DadosLanzados, SalidaCarcel, MovimientoHecho, FinTurno))
+
+    def recibir(self, evento):
+        if isinstance(evento, MovimientoHecho):
+            self.movimiento(evento.ficha, evento.pasos)
+        elif isinstance(evento, FinTurno):
+            self.fin_turno()
+        elif isinstance(evento, DadosLanzados):
+            self._dados = (evento.d1, evento.d2)
+        else:
+            self.movimiento(evento.ficha, SALIR)
+
+    def movimiento(self, ficha, pasos):
+        indice = COLOR_INDICE[ficha.team] * HOME_SIZE + ficha.id
+        if self._dados is None:
+            self.escritor.escribir_bonus(indice, pasos)
+        else:
+            self._jugada.append((indice, pasos))
+
+    def fin_turno(self):
+        self.escritor.escribir_turno(self._dados, self._jugada)
+        self._dados = None
+        self._jugada = []
+        if self.escritor.toca_foto():
+            self.escritor.escribir_foto(EstadoCompacto.desde_juego(self.juego))
+
+    def terminar(self):
+        ganador = self.juego.ganador()
+        self.escritor.terminar_partida(None if ganador is None else COLOR_INDICE[ganador], self.juego.turnos)
+        self.juego.bus.desuscribir(self._suscripcion)
+
+# =============================================================================
+# LECTURA
+# =============================================================================
+
+class LectorRegistros:
+    # Mapea el archivo en memoria y arma un índice con el inicio, el final y
+    # las fotos de cada partida. Para llegar a un turno se parte de la última
+    # foto anterior y se reproducen los turnos que faltan con make_turn.
+    def __init__(self, ruta, tamano_bloque=1 << 24):
+        self.archivo = open(ruta, "rb")
+        self.mapa = mmap.mmap(self.archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mapa[:len(MAGICO)] != MAGICO:
+            self.close()
+            raise Exception(f"{ruta} no es un registro de partidas.")
+        # Un registro incompleto al final (escritura interrumpida) se ignora
+        self.limite = len(self.mapa) - (len(self.mapa) - len(MAGICO)) % TAMANO_REGISTRO
+        self.inicios = array("q")
+        self.fines = array("q")
+        self.primeras_fotos = array("q")
+        self.fotos = array("q")
+        self.turnos_fotos = array("l")
+        self._indexar(tamano_bloque - tamano_bloque % TAMANO_REGISTRO)
+
+    def _indexar(self, tamano_bloque):
+        for bloque in range(len(MAGICO), self.limite, tamano_bloque):
+            tipos = self.mapa[bloque:min(bloque + tamano_bloque, self.limite):TAMANO_REGISTRO]
+            for encontrado in _BUSCAR_INDICE.finditer(tipos):
+                posicion = bloque + encontrado.start() * TAMANO_REGISTRO
+                tipo = tipos[encontrado.start()]
+                if tipo == TIPO_INICIO:
+                    self.inicios.append(posicion)
+                    self.fines.append(-1)
+                    self.primeras_fotos.append(len(self.fotos))
+                elif not self.inicios:
+                    raise Exception(f"Registro en la posición {posicion} fuera de una partida.")
+                elif tipo == TIPO_FOTO:
+                    self.fotos.append(posicion)
+                    self.turnos_fotos.append(_FOTO.unpack_from(self.mapa, posicion)[1])
+                else:
+                    self.fines[-1] = posicion
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def _final(self, partida):
+        if partida + 1 < len(self.inicios):
+            return self.inicios[partida + 1]
+        return self.limite
+
+    def orden(self, partida):
+        return list(_INICIO.unpack_from(self.mapa, self.inicios[partida])[1:])
+
+    def resultado(self, partida):
+        # (ganador, turnos) o None si la partida no se terminó de escribir
+        posicion = self.fines[partida]
+        if posicion < 0:
+            return None
+        _, ganador, turnos = _FIN.unpack_from(self.mapa, posicion)
+        return (None if ganador == SIN_FICHA else ganador), turnos
+
+    def _leer_foto(self, posicion):
+        crudo = b"".join(_DATOS.unpack_from(self.mapa, posicion + TAMANO_REGISTRO * (i + 1))[1]
+                         for i in range(REGISTROS_FOTO))
+        return _estado_desde_bytes(crudo)
+
+    def eventos(self, partida, desde=None):
+        # Genera ("bonus", índice, pasos), ("turno", dados, jugada) y
+        # ("foto", turno, posición) desde el inicio de la partida o desde `desde`
+        mapa = self.mapa
+        posicion = self.inicios[partida] + TAMANO_REGISTRO if desde is None else desde
+        final = self._final(partida)
+        while posicion < final:
+            tipo = mapa[posicion]
+            if tipo == TIPO_TURNO:
+                _, codigo, f1, p1, f2, p2 = _TURNO.unpack_from(mapa, posicion)
+                jugada = tuple((f, p) for f, p in ((f1, p1), (f2, p2)) if f != SIN_FICHA)
+                yield "turno", ((codigo >> 4, codigo & 15) if codigo else None), jugada
+            elif tipo == TIPO_BONUS:
+                _, indice, pasos = _BONUS.unpack_from(mapa, posicion)
+                yield "bonus", indice, pasos
+            elif tipo == TIPO_FOTO:
+                yield "foto", _FOTO.unpack_from(mapa, posicion)[1], posicion
+                posicion += TAMANO_REGISTRO * REGISTROS_FOTO
+            elif tipo == TIPO_FIN:
+                return
+            posicion += TAMANO_REGISTRO
+
+    def dados(self, partida):
+        # Fuente de dados con las tiradas grabadas, para volver a jugar la partida en Game
+        return DadosGuionados(evento[1] for evento in self.eventos(partida) if evento[0] == "turno" and evento[1])
+
+    def estado_en(self, partida, turno):
+        # Estado al terminar `turno` turnos (0 = antes del primer turno)
+        estado = estado_inicial(self.orden(partida))
+        actual = 0
+        desde = None
+        primera = self.primeras_fotos[partida]
+        ultima = self.primeras_fotos[partida + 1] if partida + 1 < len(self.inicios) else len(self.fotos)
+        for i in range(primera, ultima):
+            if self.turnos_fotos[i] > turno:
+                break
+            desde = self.fotos[i]
+            actual = self.turnos_fotos[i]
+        if desde is not None:
+            estado = self._leer_foto(desde)
+            desde += TAMANO_REGISTRO * (REGISTROS_FOTO + 1)
+        if actual == turno:
+            return estado
+        for evento in self.eventos(partida, desde):
+            if evento[0] == "turno":
+                aplicar_turno(estado, evento[1], evento[2])
+                actual += 1
+                if actual == turno:
+                    return estado
+            elif evento[0] == "bonus":
+                aplicar_bonus(estado, evento[1], evento[2])
+        raise Exception(f"La partida {partida} tiene solo {actual} turnos.")
+
+    def reproducir(self, partida):
+        # Recorre la partida turno a turno; genera (turno, dados, jugada, estado)
+        # y el estado es el mismo objeto actualizado en cada paso.
+        estado = estado_inicial(self.orden(partida))
+        turno = 0
+        for evento in self.eventos(partida):
+            if evento[0] == "turno":
+                aplicar_turno(estado, evento[1], evento[2])
+                turno += 1
+                yield turno, evento[1], evento[2], estado
+            elif evento[0] == "bonus":
+                aplicar_bonus(estado, evento[1], evento[2])
+            elif turno == 0:
+                estado = self._leer_foto(evento[2])  # Partida que no empezó desde cero
+
+    def close(self):
+        self.mapa.close()
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.close()
+
+
+if __name__ == "__main__":
+    from simulacion import simulate
+
+    # python registro.py grabar archivo [partidas] [semilla]
+    # python registro.py leer archivo [partida] [turno]
+    accion, ruta = sys.argv[1], sys.argv[2]
+    if accion == "grabar":
+        n = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+        semilla = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+        inicio = time.perf_counter()
+        with EscritorRegistros(ruta) as escritor:
+            resultados = simulate(n, semilla, escritor=escritor)
+        duracion = time.perf_counter() - inicio
+        print(f"{n} partidas ({resultados['turnos']} turnos) en {duracion:.2f} s, "
+              f"{os.path.getsize(ruta) / max(resultados['turnos'], 1):.1f} bytes por turno")
+    else:
+        with LectorRegistros(ruta) as lector:
+            if len(sys.argv) > 3:
+                partida = int(sys.argv[3])
+                resultado = lector.resultado(partida)
+                turno = int(sys.argv[4]) if len(sys.argv) > 4 else (resultado[1] if resultado else 0)
+                print(f"Orden: {[COLORS[t] for t in lector.orden(partida)]}, resultado: {resultado}")
+                print(lector.estado_en(partida, turno))
+            else:
+                inicio = time.perf_counter()
+                turnos = sum(1 for p in range(len(lector)) for _ in lector.reproducir(p))
+                duracion = time.perf_counter() - inicio
+                print(f"{len(lector)} partidas, {turnos} turnos reproducidos en {duracion:.2f} s")
@@ -0,0 +1,388 @@
+import asyncio
+import itertools
+import json
+import random
+import secrets
+import sys
+import time
+
+from agentes import AgenteCodicioso
+from dados import DadosAleatorios, DadosGuionados
+from estado import BONUS, COLOR_INDICE, DOBLES, EstadoCompacto
+from eventos import DadosLanzados
+from movimientos import SALIR, destino_legal, fichas_movibles, legal_moves
+from nucleo import COLORS, HOME_SIZE, Game
+from registro import aplicar_bonus
+from simulacion import MAX_TURNOS
+
+# =============================================================================
+# SERVIDOR DE MESAS
+# =============================================================================
+# Un solo event loop atiende muchas mesas a la vez, sin un hilo por partida.
+# Cada mesa es un Game cuyos colores remotos usan un AgenteRemoto: antes de
+# cada turno el servidor le pregunta al jugador por la red (bonus, tirar los
+# dados, sacar de la cárcel, ficha a mover) ofreciendo solo opciones legales
+# (movimientos.legal_moves) y después juega el turno completo en Game.
+#
+# Protocolo por TCP, una línea por mensaje:
+#   cliente -> servidor   JOIN                 entra a la primera mesa con lugar
+#                         RECONNECT <token>    retoma el asiento tras una desconexión
+#                         <id> <respuesta>     responde la pregunta <id>:
+#                                              GO | S | N | <ficha> | <ficha> <pasos> | PASO
+#   servidor -> cliente   JSON con "tipo": bienvenida, pregunta, turno, error, fin
+# Si el jugador no responde a tiempo el servidor elige la primera opción, de
+# modo que la mesa nunca queda detenida. A un jugador desconectado se lo espera
+# (con el mismo tiempo) una sola vez por turno; si no vuelve, el resto de las
+# preguntas de ese turno se responden enseguida con la primera opción.
+
+TIEMPO_JUGADA = 30.0
+PASO = "PASO"
+
+
+class AgenteRemoto:
+    # Ejecuta en Game lo que el jugador ya decidió: los movimientos bonus y la
+    # jugada del turno (como en estado.py: (índice, pasos), pasos SALIR).
+    def __init__(self):
+        self.bonus = []
+        self.plan = ()
+
+    def sacar_de_carcel(self, juego, equipo, dados):
+        return any(pasos == SALIR for _, pasos in self.plan)
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        return [f for f in movibles for indice, p in self.plan if p != SALIR and f.id == indice % HOME_SIZE]
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        if not self.bonus:
+            return []
+        indice, pasos = self.bonus.pop(0)
+        return [(f, pasos) for f in movibles if f.id == indice % HOME_SIZE]
+
+
+class Jugador:
+    def __init__(self, mesa, color):
+        self.mesa = mesa
+        self.color = color
+        self.token = secrets.token_hex(8)
+        self.escritor = None
+        self.respuestas = asyncio.Queue()
+        self.pregunta = None  # Última pregunta sin responder, se reenvía al reconectar
+
+    async def enviar(self, mensaje):
+        if self.escritor is None:
+            return
+        try:
+            self.escritor.write(json.dumps(mensaje).encode() + b"\n")
+            await self.escritor.drain()
+        except ConnectionError:
+            self.escritor = None
+
+
+class Mesa:
+    def __init__(self, numero, servidor, jugadores, seed=None):
+        self.numero = numero
+        self.servidor = servidor
+        self.colores_remotos = COLORS[:jugadores]
+        agentes = {color: AgenteRemoto() if color in self.colores_remotos else AgenteCodicioso() for color in COLORS}
+        # Los dados de un turno remoto se tiran antes de preguntar por la jugada
+        # y quedan en el guion; los turnos locales tiran directo del respaldo
+        rng = random.Random(seed)
+        self.aleatorios = DadosAleatorios(rng)
+        self.juego = Game("YGRB", agentes=agentes, rng=rng, silencioso=True,
+                          dados=DadosGuionados(respaldo=self.aleatorios))
+        self.jugadores = {}
+        self.preguntas = itertools.count(1)
+        self.dados = None
+        self.esperar_reconexion = True
+        self.juego.bus.suscribir(self._dados_lanzados, DadosLanzados)
+
+    def _dados_lanzados(self, evento):
+        self.dados = [evento.d1, evento.d2]
+
+    def llena(self):
+        return len(self.jugadores) == len(self.colores_remotos)
+
+    def sentar(self):
+        color = self.colores_remotos[len(self.jugadores)]
+        jugador = Jugador(self, color)
+        self.jugadores[color] = jugador
+        return jugador
+
+    async def difundir(self, mensaje):
+        for jugador in self.jugadores.values():
+            await jugador.enviar(mensaje)
+
+    async def preguntar(self, jugador, pregunta, opciones, **datos):
+        # Devuelve la opción elegida; si se agota el tiempo, la primera
+        if jugador.escritor is None:
+            if not self.esperar_reconexion:
+                self.servidor.expiradas += 1
+                return opciones[0]
+            self.esperar_reconexion = False  # Al reconectarse se le reenvía la pregunta
+        numero = next(self.preguntas)
+        jugador.pregunta = dict(tipo="pregunta", id=numero, pregunta=pregunta, opciones=opciones, **datos)
+        await jugador.enviar(jugador.pregunta)
+        limite = time.monotonic() + self.servidor.tiempo_jugada
+        try:
+            while True:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise asyncio.TimeoutError
+                respuesta_id, respuesta = await asyncio.wait_for(jugador.respuestas.get(), restante)
+                if respuesta_id != numero:
+                    continue  # Respuesta a una pregunta anterior que ya expiró
+                eleccion = _interpretar(respuesta, opciones)
+                if eleccion is not None:
+                    return eleccion
+                await jugador.enviar({"tipo": "error", "mensaje": f"Respuesta inválida: {respuesta}"})
+        except asyncio.TimeoutError:
+            self.servidor.expiradas += 1
+            return opciones[0]
+        finally:
+            jugador.pregunta = None
+
+    async def decidir_turno(self, jugador):
+        juego = self.juego
+        agente = juego.agentes[jugador.color]
+        t = COLOR_INDICE[jugador.color]
+        estado = EstadoCompacto.desde_juego(juego)
+        self.esperar_reconexion = True
+        # Movimientos bonus, uno por pregunta, antes de tirar los dados
+        while estado.datos[BONUS + t] > 0:
+            restantes = estado.datos[BONUS + t]
+            opciones = [[i % HOME_SIZE, p] for i in fichas_movibles(estado, t) for p in range(restantes, 0, -1)
+                        if destino_legal(estado, t, i, p) >= 0]
+            if not opciones:
+                break
+            eleccion = await self.preguntar(jugador, "bonus", opciones + [PASO], restantes=restantes)
+            if eleccion == PASO:
+                break
+            indice = t * HOME_SIZE + eleccion[0]
+            aplicar_bonus(estado, indice, eleccion[1])
+            agente.bonus.append((indice, eleccion[1]))
+        await self.preguntar(jugador, "dados", ["GO"])
+        dados = self.aleatorios.lanzar()
+        juego.dados.agregar(dados)
+        # Tercer doble: castigo sin decisión
+        if dados[0] == dados[1] and estado.datos[DOBLES + t] == 2:
+            agente.plan = ()
+            return
+        jugadas = legal_moves(estado, dados, t)
+        if any(j[0][1] == SALIR for j in jugadas):
+            if await self.preguntar(jugador, "carcel", ["S", "N"], dados=dados) == "S":
+                jugadas = [j for j in jugadas if j[0][1] == SALIR]
+            else:
+                jugadas = [j for j in jugadas if j[0][1] != SALIR]
+        agente.plan = ()
+        if jugadas:
+            # Solo queda por elegir la ficha del último movimiento de la jugada
+            fichas = [j[-1][0] % HOME_SIZE for j in jugadas if j[-1][1] != SALIR]
+            pasos = next((j[-1][1] for j in jugadas if j[-1][1] != SALIR), 0)
+            eleccion = PASO
+            if fichas:
+                eleccion = await self.preguntar(jugador, "ficha", fichas + [PASO], dados=dados, pasos=pasos)
+            for jugada in jugadas:
+                movida = jugada[-1]
+                if (eleccion == PASO and movida[1] == SALIR) or \
+                   (eleccion != PASO and movida[1] != SALIR and movida[0] % HOME_SIZE == eleccion):
+                    agente.plan = jugada
+                    break
+
+    async def jugar(self):
+        juego = self.juego
+        await self.difundir({"tipo": "inicio", "mesa": self.numero, "orden": juego.turn_order})
+        while not juego.juego_terminado() and juego.turnos < MAX_TURNOS:
+            color = juego.turn_order[juego.turn_index]
+            jugador = self.jugadores.get(color)
+            self.dados = None
+            if jugador is not None:
+                await self.decidir_turno(jugador)
+            juego.turno()
+            self.servidor.turnos += 1
+            await self.difundir({"tipo": "turno", "color": color, "dados": self.dados,
+                                 "estado": list(EstadoCompacto.desde_juego(juego).datos)})
+            await asyncio.sleep(0)  # Deja correr a las demás mesas
+        await self.difundir({"tipo": "fin", "ganador": juego.ganador(), "turnos": juego.turnos})
+        self.servidor.terminar(self)
+
+
+def _interpretar(respuesta, opciones):
+    partes = respuesta.upper().split()
+    if not partes:
+        return None
+    if partes[0] in ("GO", "S", "N", PASO):
+        return partes[0] if partes[0] in opciones else None
+    try:
+        numeros = [int(p) for p in partes]
+    except ValueError:
+        return None
+    eleccion = numeros[0] if len(numeros) == 1 else numeros[:2]
+    return eleccion if eleccion in opciones else None
+
+
+class Servidor:
+    def __init__(self, jugadores_por_mesa=len(COLORS), tiempo_jugada=TIEMPO_JUGADA, seed=None):
+        self.jugadores_por_mesa = jugadores_por_mesa  # El resto de los colores los juega AgenteCodicioso
+        self.tiempo_jugada = tiempo_jugada
+        self.rng = random.Random(seed)
+        self.numeros = itertools.count(1)
+        self.abierta = None
+        self.mesas = {}
+        self.sesiones = {}  # token -> Jugador
+        self.tareas = set()
+        self.turnos = 0
+        self.expiradas = 0
+        self.terminadas = 0
+
+    def sentar(self):
+        if self.abierta is None:
+            numero = next(self.numeros)
+            self.abierta = Mesa(numero, self, self.jugadores_por_mesa, self.rng.getrandbits(64))
+            self.mesas[numero] = self.abierta
+        mesa = self.abierta
+        jugador = mesa.sentar()
+        self.sesiones[jugador.token] = jugador
+        if mesa.llena():
+            self.abierta = None
+            tarea = asyncio.ensure_future(mesa.jugar())
+            self.tareas.add(tarea)
+            tarea.add_done_callback(self.tareas.discard)
+        return jugador
+
+    def terminar(self, mesa):
+        self.terminadas += 1
+        del self.mesas[mesa.numero]
+        for jugador in mesa.jugadores.values():
+            del self.sesiones[jugador.token]
+            if jugador.escritor is not None:
+                jugador.escritor.close()
+                jugador.escritor = None
+
+    async def atender(self, lector, escritor):
+        jugador = None
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                comando = linea.decode(errors="replace").strip()
+                if jugador is None:
+                    jugador = await self._entrar(comando, escritor)
+                    continue
+                numero, _, respuesta = comando.partition(" ")
+                if numero.isdigit():
+                    jugador.respuestas.put_nowait((int(numero), respuesta))
+                else:
+                    await jugador.enviar({"tipo": "error", "mensaje": f"Comando no reconocido: {comando}"})
+        except ConnectionError:
+            pass
+        finally:
+            # El asiento se conserva: la mesa sigue con respuestas por tiempo
+            if jugador is not None and jugador.escritor is escritor:
+                jugador.escritor = None
+            escritor.close()
+
+    async def _entrar(self, comando, escritor):
+        partes = comando.split()
+        jugador = None
+        if partes[:1] == ["JOIN"]:
+            jugador = self.sentar()
+        elif partes[:1] == ["RECONNECT"] and len(partes) == 2:
+            jugador = self.sesiones.get(partes[1])
+            if jugador is not None and jugador.escritor is not None:
+                jugador.escritor.close()
+        if jugador is None:
+            escritor.write(json.dumps({"tipo": "error", "mensaje": "Se esperaba JOIN o RECONNECT <token>"}).encode() + b"\n")
+            return None
+        jugador.escritor = escritor
+        await jugador.enviar({"tipo": "bienvenida", "mesa": jugador.mesa.numero, "color": jugador.color,
+                              "token": jugador.token})
+        if jugador.pregunta is not None:
+            await jugador.enviar(jugador.pregunta)
+        return jugador
+
+    async def iniciar(self, host="127.0.0.1", puerto=8765):
+        return await asyncio.start_server(self.atender, host, puerto, limit=1 << 16)
+
+# =============================================================================
+# CLIENTE DE PRUEBA
+# =============================================================================
+# Responde al azar con opciones válidas. Con `reconexion` > 0 a veces corta la
+# conexión en medio de una pregunta y vuelve a entrar con su token.
+
+async def cliente_prueba(host, puerto, seed=None, reconexion=0.0, demora=0.0):
+    rng = random.Random(seed)
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    escritor.write(b"JOIN\n")
+    token = None
+    preguntas = 0
+    reconexiones = 0
+    while True:
+        linea = await lector.readline()
+        if not linea:
+            break
+        mensaje = json.loads(linea)
+        if mensaje["tipo"] == "bienvenida":
+            token = mensaje["token"]
+        elif mensaje["tipo"] == "fin":
+            break
+        elif mensaje["tipo"] == "pregunta":
+            if rng.random() < reconexion:
+                escritor.close()
+                lector, escritor = await asyncio.open_connection(host, puerto)
+                escritor.write(f"RECONNECT {token}\n".encode())
+                reconexiones += 1
+                continue  # El servidor reenvía la pregunta pendiente
+            if demora:
+                await asyncio.sleep(rng.random() * demora)
+            eleccion = rng.choice(mensaje["opciones"])
+            respuesta = " ".join(map(str, eleccion)) if isinstance(eleccion, list) else str(eleccion)
+            escritor.write(f"{mensaje['id']} {respuesta}\n".encode())
+            preguntas += 1
+    escritor.close()
+    return preguntas, reconexiones
+
+async def prueba_carga(clientes, jugadores_por_mesa=len(COLORS), tiempo_jugada=5.0, reconexion=0.0, seed=0):
+    servidor = Servidor(jugadores_por_mesa, tiempo_jugada, seed)
+    tcp = await servidor.iniciar(puerto=0)
+    puerto = tcp.sockets[0].getsockname()[1]
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(cliente_prueba("127.0.0.1", puerto, seed + i, reconexion)
+                                        for i in range(clientes)))
+    duracion = time.perf_counter() - inicio
+    tcp.close()
+    await tcp.wait_closed()
+    preguntas = sum(r[0] for r in resultados)
+    return {
+        "clientes": clientes,
+        "mesas": servidor.terminadas,
+        "turnos": servidor.turnos,
+        "preguntas": preguntas,
+        "reconexiones": sum(r[1] for r in resultados),
+        "expiradas": servidor.expiradas,
+        "segundos": duracion,
+    }
+
+
+if __name__ == "__main__":
+    # python servidor.py servir [puerto] [jugadores_por_mesa]
+    # python servidor.py carga [clientes] [jugadores_por_mesa]
+    accion = sys.argv[1] if len(sys.argv) > 1 else "servir"
+    if accion == "servir":
+        puerto = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+        jugadores = int(sys.argv[3]) if len(sys.argv) > 3 else len(COLORS)
+
+        async def servir():
+            tcp = await Servidor(jugadores).iniciar(puerto=puerto)
+            print(f"Servidor de Parqués escuchando en el puerto {puerto}")
+            async with tcp:
+                await tcp.serve_forever()
+
+        asyncio.run(servir())
+    else:
+        clientes = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+        jugadores = int(sys.argv[3]) if len(sys.argv) > 3 else len(COLORS)
+        resultados = asyncio.run(prueba_carga(clientes, jugadores))
+        print(resultados)
+        print(f"{resultados['preguntas'] / resultados['segundos']:.0f} respuestas/s, "
+              f"{resultados['turnos'] / resultados['segundos']:.0f} turnos/s")
@@ -0,0 +1,74 @@
+import random
+import sys
+import time
+
+from agentes import AgenteAleatorio
+from finales import AgenteFinales, TablaFinales
+from nucleo import COLORS, Game
+from metricas import InstrumentosJuego
+from registro import GrabadorJuego
+
+# =============================================================================
+# SIMULACIÓN SIN INTERFAZ
+# =============================================================================
+# Juega partidas completas sin input() ni print(): cada color lo maneja un
+# agente (ver agentes.py) y las reglas son las mismas de Game.
+
+# Con las reglas actuales una ficha puede quedar atascada en la pista interna
+# (p. ej. en la posición 6 solo sale con bonus), así que se limita la partida.
+MAX_TURNOS = 2000
+
+def jugar_partida(agentes, turn_order="YGRB", seed=None, max_turnos=MAX_TURNOS, clase_juego=Game, escritor=None,
+                  metricas=None, fabrica_dados=None):
+    # clase_juego puede ser estado.JuegoCompacto para jugar sobre el estado compacto;
+    # con un registro.EscritorRegistros la partida queda grabada y con unas
+    # metricas.Metricas se miden sus fases. fabrica_dados(seed) crea la fuente
+    # de dados de la partida (p. ej. dados.DadosPregenerados).
+    dados = fabrica_dados(seed) if fabrica_dados is not None else None
+    juego = clase_juego(turn_order, agentes=agentes, rng=random.Random(seed), silencioso=True, dados=dados)
+    grabador = GrabadorJuego(escritor, juego) if escritor is not None else None
+    instrumentos = InstrumentosJuego(metricas, juego) if metricas is not None else None
+    juego.run(max_turnos)
+    if grabador is not None:
+        grabador.terminar()
+    if instrumentos is not None:
+        instrumentos.terminar()
+    return juego
+
+def simulate(n_games, seed=None, agentes=None, turn_order="YGRB", max_turnos=MAX_TURNOS, clase_juego=Game,
+             escritor=None, metricas=None, fabrica_dados=None, finales=None):
+    # Con una finales.TablaFinales cada agente juega los finales con la tabla
+    # (finales.AgenteFinales) y el resto de la partida como siempre
+    if agentes is None:
+        agentes = {color: AgenteAleatorio() for color in COLORS}
+    if finales is not None:
+        agentes = {color: AgenteFinales(finales, agente) for color, agente in agentes.items()}
+    rng = random.Random(seed)
+    resultados = {
+        "partidas": 0,
+        "victorias": {color: 0 for color in COLORS},
+        "sin_ganador": 0,
+        "turnos": 0,
+    }
+    for _ in range(n_games):
+        juego = jugar_partida(agentes, turn_order, rng.getrandbits(64), max_turnos, clase_juego, escritor,
+                              metricas, fabrica_dados)
+        ganador = juego.ganador()
+        if ganador is None:
+            resultados["sin_ganador"] += 1
+        else:
+            resultados["victorias"][ganador] += 1
+        resultados["partidas"] += 1
+        resultados["turnos"] += juego.turnos
+    return resultados
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    semilla = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    finales = TablaFinales(sys.argv[3]) if len(sys.argv) > 3 else None
+    inicio = time.perf_counter()
+    resultados = simulate(n, semilla, finales=finales)
+    duracion = time.perf_counter() - inicio
+    print(resultados)
+    print(f"{n} partidas en {duracion:.2f} s ({n / duracion:.0f} partidas/s)")
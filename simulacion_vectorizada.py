@@ -0,0 +1,286 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from estado import CARCEL, CASA, INTERNO
+from movimientos import BONUS_CAPTURA, BONUS_CASA, DESTINOS, MAX_PASOS, NUM_CODIGOS, SALIDA_EQUIPO
+from nucleo import BOARD_SIZE, COLORS, HOME_SIZE, SAFE_CELLS, SALIDAS, SEGURO_LLEGADA
+from simulacion import MAX_TURNOS
+
+# =============================================================================
+# SIMULACIÓN VECTORIZADA
+# =============================================================================
+# Juega N partidas a la vez en pasos sincronizados: las fichas son un array
+# (N, 16) con los códigos de estado.py y cada paso es un turno de todas las
+# partidas activas. Los dados de todas se tiran con una sola llamada a
+# rng.integers y las reglas (salida con 5, capturas, bonus de +10/+20 y castigo
+# por tres dobles) se aplican con máscaras. Las partidas terminadas salen del
+# lote.
+#
+# Todas las fichas siguen la misma política, parecida a AgenteCodicioso:
+# siempre sale de la cárcel, prefiere capturar y si no mueve la ficha más
+# adelantada. El bonus se gasta ficha por ficha, cada vez lo que le falte a la
+# ficha para llegar a casa o todo el bonus si no alcanza.
+
+NUM_EQUIPOS = len(COLORS)
+NUM_FICHAS = NUM_EQUIPOS * HOME_SIZE
+
+TABLA = np.frombuffer(DESTINOS, dtype=np.int8).reshape(NUM_EQUIPOS, NUM_CODIGOS, MAX_PASOS + 1)
+SALIDA = np.array(SALIDA_EQUIPO, dtype=np.int8)
+ES_SEGURO = np.zeros(NUM_CODIGOS, dtype=bool)
+ES_SEGURO[list(SAFE_CELLS)] = True
+FICHAS_EQUIPO = np.arange(NUM_FICHAS).reshape(NUM_EQUIPOS, HOME_SIZE)
+
+def _tablas_avance():
+    # AVANCE: casillas recorridas; HASTA_CASA: pasos que faltan para llegar
+    avance = np.zeros((NUM_EQUIPOS, NUM_CODIGOS), dtype=np.int16)
+    hasta_casa = np.zeros((NUM_EQUIPOS, NUM_CODIGOS), dtype=np.int16)
+    for t, color in enumerate(COLORS):
+        for codigo in range(1, INTERNO):
+            avance[t, codigo] = (codigo - SALIDAS[color]) % BOARD_SIZE + 1
+            hasta_casa[t, codigo] = (SEGURO_LLEGADA[color] - codigo) % BOARD_SIZE + CASA - INTERNO
+        for codigo in range(INTERNO, CASA + 1):
+            avance[t, codigo] = BOARD_SIZE + codigo - INTERNO
+            hasta_casa[t, codigo] = CASA - codigo
+    return avance, hasta_casa
+
+AVANCE, HASTA_CASA = _tablas_avance()
+
+
+CAMPOS = ("fichas", "ocupacion", "bonus", "dobles", "orden", "turno", "turnos")
+
+
+class LoteVectorizado:
+    def __init__(self, n, rng, orden):
+        self.rng = rng
+        self.fichas = np.zeros((n, NUM_FICHAS), dtype=np.int8)
+        # Fichas por código en cada partida; se actualiza con cada movimiento
+        self.ocupacion = np.zeros((n, NUM_CODIGOS), dtype=np.int8)
+        self.ocupacion[:, CARCEL] = NUM_FICHAS
+        self.bonus = np.zeros((n, NUM_EQUIPOS), dtype=np.int32)
+        self.dobles = np.zeros((n, NUM_EQUIPOS), dtype=np.int8)
+        self.orden = orden                      # (n, 4) índices de COLORS
+        self.turno = np.zeros(n, dtype=np.int8)  # índice dentro de orden
+        self.turnos = np.zeros(n, dtype=np.int32)
+
+    def agregar(self, otro):
+        for nombre in CAMPOS:
+            setattr(self, nombre, np.concatenate((getattr(self, nombre), getattr(otro, nombre))))
+
+    def quitar(self, mantener):
+        for nombre in CAMPOS:
+            setattr(self, nombre, getattr(self, nombre)[mantener])
+
+    def __len__(self):
+        return len(self.turno)
+
+    def _destinos_legales(self, filas, equipos, piezas, pasos):
+        # Destino de cada (partida, ficha) con sus pasos; -1 si no es legal.
+        # Devuelve también si el movimiento captura una ficha rival.
+        codigos = self.fichas[filas[:, None], piezas]
+        pasos = np.clip(pasos, 0, MAX_PASOS)
+        destino = TABLA[equipos[:, None], codigos, pasos]
+        externo = (destino > CARCEL) & (destino < INTERNO)
+        casilla = np.maximum(destino, 0)
+        propias = np.count_nonzero(codigos[:, None, :] == destino[:, :, None], axis=2)
+        rivales = self.ocupacion[filas[:, None], casilla] - propias
+        ilegal = externo & ((propias > 0) | (rivales >= 2) | ((rivales == 1) & ES_SEGURO[casilla]))
+        destino[ilegal] = -1
+        return destino, externo & (rivales == 1) & ~ilegal
+
+    def _elegir(self, equipos, destino, captura, codigos):
+        # La mejor ficha legal por partida (-1 si ninguna)
+        puntaje = AVANCE[equipos[:, None], codigos] + 1000 * captura
+        puntaje = np.where(destino >= 0, puntaje, -1)
+        mejor = puntaje.argmax(axis=1)
+        return np.where(puntaje.max(axis=1) >= 0, mejor, -1)
+
+    def _mover(self, filas, equipos, piezas, destinos):
+        # Aplica movimientos legales con capturas y bonus
+        externo = (destinos > CARCEL) & (destinos < INTERNO)
+        # Un movimiento legal a una casilla ocupada solo puede tener una rival
+        captura = externo & (self.ocupacion[filas, np.maximum(destinos, 0)] > 0)
+        if captura.any():
+            f, d = filas[captura], destinos[captura]
+            fichas = self.fichas[f]
+            fichas[fichas == d[:, None]] = CARCEL
+            self.fichas[f] = fichas
+            self.ocupacion[f, d] -= 1
+            self.ocupacion[f, CARCEL] += 1
+        self.ocupacion[filas, self.fichas[filas, piezas]] -= 1
+        self.ocupacion[filas, destinos] += 1
+        self.fichas[filas, piezas] = destinos
+        self.bonus[filas, equipos] += BONUS_CAPTURA * captura + BONUS_CASA * (destinos == CASA)
+
+    def _aplicar_bonus(self, equipos):
+        pendientes = np.nonzero(self.bonus[np.arange(len(self)), equipos] > 0)[0]
+        while len(pendientes):
+            t = equipos[pendientes]
+            piezas = FICHAS_EQUIPO[t]
+            codigos = self.fichas[pendientes[:, None], piezas]
+            restantes = self.bonus[pendientes, t]
+            pasos = np.minimum(restantes[:, None], HASTA_CASA[t[:, None], codigos])
+            destino, captura = self._destinos_legales(pendientes, t, piezas, pasos)
+            eleccion = self._elegir(t, destino, captura, codigos)
+            mueve = eleccion >= 0
+            pendientes, t, eleccion = pendientes[mueve], t[mueve], eleccion[mueve]
+            filas = np.arange(len(pendientes))
+            usados = pasos[mueve][filas, eleccion]
+            self.bonus[pendientes, t] -= usados
+            self._mover(pendientes, t, piezas[mueve][filas, eleccion], destino[mueve][filas, eleccion])
+            pendientes = pendientes[self.bonus[pendientes, t] > 0]
+
+    def paso(self):
+        n = len(self)
+        todas = np.arange(n)
+        equipos = self.orden[todas, self.turno]
+        self._aplicar_bonus(equipos)
+
+        dados = self.rng.integers(1, 7, size=(n, 2), dtype=np.int8)
+        son_dobles = dados[:, 0] == dados[:, 1]
+        dobles = np.where(son_dobles, self.dobles[todas, equipos] + 1, 0)
+        castigo = dobles == 3
+        self.dobles[todas, equipos] = np.where(castigo, 0, dobles)
+
+        piezas = FICHAS_EQUIPO[equipos]
+        codigos = self.fichas[todas[:, None], piezas]
+
+        # Tres dobles: la primera ficha del tablero (o de la pista interna) va a la cárcel
+        if castigo.any():
+            en_tablero = (codigos > CARCEL) & (codigos < INTERNO)
+            en_pista = (codigos >= INTERNO) & (codigos < CASA)
+            prioridad = np.where(en_tablero, 2, np.where(en_pista, 1, 0)) * 8 - np.arange(HOME_SIZE)
+            elegida = prioridad.argmax(axis=1)
+            castigada = castigo & (prioridad.max(axis=1) > 0)
+            filas = np.nonzero(castigada)[0]
+            castigadas = piezas[filas, elegida[filas]]
+            self.ocupacion[filas, self.fichas[filas, castigadas]] -= 1
+            self.ocupacion[filas, CARCEL] += 1
+            self.fichas[filas, castigadas] = CARCEL
+
+        # Salida de la cárcel con un 5 y movimiento del otro dado
+        juega = ~castigo
+        total = dados.sum(axis=1, dtype=np.int16)
+        hay_cinco = (dados == 5).any(axis=1)
+        codigos = self.fichas[todas[:, None], piezas]
+        en_carcel = codigos == CARCEL
+        salida = SALIDA[equipos]
+        libre = self.ocupacion[todas, salida] < 2
+        sale = juega & hay_cinco & en_carcel.any(axis=1) & libre
+        filas = np.nonzero(sale)[0]
+        self.fichas[filas, piezas[filas, en_carcel[filas].argmax(axis=1)]] = salida[filas]
+        self.ocupacion[filas, CARCEL] -= 1
+        self.ocupacion[filas, salida[filas]] += 1
+        pasos = np.where(sale, np.where(dados[:, 0] == 5, dados[:, 1], dados[:, 0]), total)
+
+        filas = np.nonzero(juega)[0]
+        t = equipos[filas]
+        codigos = self.fichas[filas[:, None], piezas[filas]]
+        destino, captura = self._destinos_legales(filas, t, piezas[filas], np.repeat(pasos[filas, None], HOME_SIZE, axis=1))
+        eleccion = self._elegir(t, destino, captura, codigos)
+        mueve = eleccion >= 0
+        filas, t, eleccion = filas[mueve], t[mueve], eleccion[mueve]
+        indices = np.arange(len(filas))
+        self._mover(filas, t, piezas[filas][indices, eleccion], destino[mueve][indices, eleccion])
+
+        self.turno = np.where(son_dobles & ~castigo, self.turno, (self.turno + 1) % NUM_EQUIPOS).astype(np.int8)
+        self.turnos += 1
+        en_casa = (self.fichas[todas[:, None], piezas] == CASA).all(axis=1)
+        return np.where(en_casa, equipos, -1)
+
+
+def _orden_lote(n, inicio, turn_order, rotar_orden):
+    mapping = {"R": "rojas", "B": "azules", "G": "verdes", "Y": "amarillas"}
+    orden = [COLORS.index(mapping[ch]) for ch in turn_order.upper() if ch in mapping]
+    orden += [i for i in range(NUM_EQUIPOS) if i not in orden]
+    orden = np.array(orden, dtype=np.int8)
+    if not rotar_orden:
+        return np.tile(orden, (n, 1))
+    # Cada partida empieza en un puesto distinto para que el sesgo se compense
+    desplazamiento = np.arange(inicio, inicio + n)[:, None] % NUM_EQUIPOS
+    return orden[(np.arange(NUM_EQUIPOS)[None, :] + desplazamiento) % NUM_EQUIPOS]
+
+def _resultados_vacios(max_turnos):
+    return {
+        "partidas": 0,
+        "victorias": {color: 0 for color in COLORS},
+        "victorias_por_puesto": [0] * NUM_EQUIPOS,
+        "sin_ganador": 0,
+        "duraciones": np.zeros(max_turnos + 1, dtype=np.int64),
+    }
+
+def _combinar(total, parte):
+    total["partidas"] += parte["partidas"]
+    for color, cuenta in parte["victorias"].items():
+        total["victorias"][color] += cuenta
+    for puesto, cuenta in enumerate(parte["victorias_por_puesto"]):
+        total["victorias_por_puesto"][puesto] += cuenta
+    total["sin_ganador"] += parte["sin_ganador"]
+    total["duraciones"] += parte["duraciones"]
+
+def _simular_parte(n_games, seed, primera, turn_order, rotar_orden, tamano_lote, max_turnos):
+    # `primera` es el número de la primera partida de esta parte, para que la
+    # rotación del orden de turnos siga entre partes
+    rng = np.random.default_rng(seed)
+    resultados = _resultados_vacios(max_turnos)
+    # Las partidas nuevas entran al lote a medida que otras terminan, así el
+    # lote no se queda con unas pocas partidas largas al final.
+    iniciadas = 0
+    lote = LoteVectorizado(0, rng, np.zeros((0, NUM_EQUIPOS), dtype=np.int8))
+    while iniciadas < n_games or len(lote):
+        if iniciadas < n_games and len(lote) <= tamano_lote // 2:
+            n = min(tamano_lote - len(lote), n_games - iniciadas)
+            lote.agregar(LoteVectorizado(n, rng, _orden_lote(n, primera + iniciadas, turn_order, rotar_orden)))
+            iniciadas += n
+        ganadores = lote.paso()
+        agotadas = lote.turnos >= max_turnos
+        terminadas = (ganadores >= 0) | agotadas
+        if not terminadas.any():
+            continue
+        gano = ganadores >= 0
+        for t, cuenta in enumerate(np.bincount(ganadores[gano], minlength=NUM_EQUIPOS)):
+            resultados["victorias"][COLORS[t]] += int(cuenta)
+        puestos = (lote.orden[gano] == ganadores[gano][:, None]).argmax(axis=1)
+        for puesto, cuenta in enumerate(np.bincount(puestos, minlength=NUM_EQUIPOS)):
+            resultados["victorias_por_puesto"][puesto] += int(cuenta)
+        resultados["sin_ganador"] += int((agotadas & ~gano).sum())
+        resultados["duraciones"] += np.bincount(lote.turnos[terminadas], minlength=max_turnos + 1)[:max_turnos + 1]
+        resultados["partidas"] += int(terminadas.sum())
+        lote.quitar(~terminadas)
+    return resultados
+
+def simular_lote(n_games, seed=None, turn_order="YGRB", rotar_orden=True,
+                 tamano_lote=100_000, max_turnos=MAX_TURNOS, procesos=1):
+    # Con procesos > 1 las partidas se reparten en partes iguales, cada una
+    # con su semilla derivada de `seed` (SeedSequence.spawn), y los agregados
+    # de las partes se suman. Con la misma semilla y el mismo número de
+    # procesos el resultado se repite.
+    procesos = procesos or os.cpu_count()
+    if procesos == 1:
+        return _simular_parte(n_games, seed, 0, turn_order, rotar_orden, tamano_lote, max_turnos)
+    semillas = np.random.SeedSequence(seed).spawn(procesos)
+    limites = [n_games * i // procesos for i in range(procesos + 1)]
+    total = _resultados_vacios(max_turnos)
+    with ProcessPoolExecutor(max_workers=procesos) as executor:
+        partes = [executor.submit(_simular_parte, limites[i + 1] - limites[i], semillas[i], limites[i], turn_order,
+                                  rotar_orden, tamano_lote, max_turnos) for i in range(procesos)]
+        for parte in partes:
+            _combinar(total, parte.result())
+    return total
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    semilla = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    procesos = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    inicio = time.perf_counter()
+    resultados = simular_lote(n, semilla, procesos=procesos)
+    duracion = time.perf_counter() - inicio
+    duraciones = resultados.pop("duraciones")
+    turnos = np.repeat(np.arange(len(duraciones)), duraciones)
+    print(resultados)
+    print(f"Turnos por partida: media {turnos.mean():.1f}, mediana {np.median(turnos):.0f}")
+    print(f"{n} partidas en {duracion:.2f} s ({n / duracion:.0f} partidas/s)")
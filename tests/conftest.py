@@ -0,0 +1,30 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agentes import AgenteAleatorio, AgenteCodicioso
+from nucleo import COLORS, Game
+
+# Partidas con semilla que se detienen cada `cada` turnos para revisar la
+# posición. Dos colores juegan al azar y dos con AgenteCodicioso, para que
+# aparezcan capturas, bloqueos, bonus a medio gastar y fichas en la pista
+# interna.
+
+ORDENES = ("YGRB", "GRBY", "RBYG", "BYGR")
+
+def jugar_por_turnos(seed, cada=1, max_turnos=400):
+    agentes = {color: (AgenteAleatorio() if i % 2 else AgenteCodicioso()) for i, color in enumerate(COLORS)}
+    juego = Game(ORDENES[seed % len(ORDENES)], agentes=agentes, rng=random.Random(seed), silencioso=True)
+    while juego.ganador() is None and juego.turnos < max_turnos:
+        juego.turno()
+        if juego.turnos % cada == 0:
+            yield juego
+
+
+@pytest.fixture
+def partida():
+    return jugar_por_turnos
@@ -0,0 +1,27 @@
+import pytest
+
+from benchmark import VERSION, comparar, medir
+
+# comparar mira operaciones por calibración: una máquina el doble de lenta en
+# todo no es una regresión, un benchmark que se frena solo sí.
+
+def resultado(**relativos):
+    return {"version": VERSION, "resultados": {nombre: {"relativo": r} for nombre, r in relativos.items()}}
+
+
+def test_comparar_por_calibracion():
+    base = resultado(movimientos=0.08, partidas=5e-5)
+    filas = comparar(resultado(movimientos=0.08, partidas=5e-5), base)
+    assert [fila[4] for fila in filas] == [False, False]
+    filas = comparar(resultado(movimientos=0.05, partidas=5e-5), base, 0.25)
+    assert [(fila[0], fila[4]) for fila in filas] == [("movimientos", True), ("partidas", False)]
+    with pytest.raises(Exception):
+        comparar(resultado(movimientos=0.08), dict(base, version=VERSION - 1))
+
+
+def test_medir_con_calibracion():
+    ciclo = lambda: 1000
+    medido = medir(lambda: 10, 3, ciclo)
+    assert medido["operaciones"] == 10
+    assert medido["relativo"] > 0
+    assert "relativo" not in medir(lambda: 10, 3)
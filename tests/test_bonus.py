@@ -0,0 +1,89 @@
+from bonus import RepartidorBonus
+from estado import BONUS, EstadoCompacto
+from ia import evaluar, utilidad
+from movimientos import destino_legal, fichas_movibles, make_move, unmake_move
+from nucleo import COLORS
+
+# RepartidorBonus poda mucho (orden de las fichas, pasos que importan); su
+# valor debe ser el mismo que el de probar todas las secuencias de
+# movimientos, y la secuencia que devuelve debe llegar a ese valor.
+
+LIMITE_EXHAUSTIVO = 1500  # Posiciones; las capturas encadenadas lo superan rápido
+
+
+class _Enorme(Exception):
+    pass
+
+
+def exhaustivo(estado, equipo, memo):
+    clave = estado.clave()
+    if clave in memo:
+        return memo[clave]
+    if len(memo) > LIMITE_EXHAUSTIVO:
+        raise _Enorme
+    datos = estado.datos
+    mejor = utilidad(evaluar(estado), equipo)
+    for indice in fichas_movibles(estado, equipo):
+        for pasos in range(1, datos[BONUS + equipo] + 1):
+            if destino_legal(estado, equipo, indice, pasos) < 0:
+                continue
+            datos[BONUS + equipo] -= pasos
+            registro = make_move(estado, (indice, pasos))
+            mejor = max(mejor, exhaustivo(estado, equipo, memo))
+            unmake_move(estado, registro)
+            datos[BONUS + equipo] += pasos
+    memo[clave] = mejor
+    return mejor
+
+def posiciones(partida, bonus):
+    for seed in range(3):
+        for juego in partida(seed, cada=20):
+            estado = EstadoCompacto.desde_juego(juego)
+            equipo = estado.equipo_actual()
+            if fichas_movibles(estado, equipo):
+                estado.datos[BONUS + equipo] = bonus
+                yield estado, equipo
+
+
+def test_igual_a_busqueda_exhaustiva(partida):
+    repartidor = RepartidorBonus()
+    revisadas = 0
+    for bonus in (7, 10, 20):
+        for estado, equipo in posiciones(partida, bonus):
+            try:
+                esperado = exhaustivo(estado.copia(), equipo, {})
+            except _Enorme:
+                continue
+            valor, secuencia = repartidor.resolver(estado, equipo)
+            assert valor == esperado
+            final = estado.copia()
+            for movimiento in secuencia:
+                final.datos[BONUS + equipo] -= movimiento[1]
+                assert make_move(final, movimiento) is not None
+                assert final.datos[BONUS + equipo] >= 0
+            assert utilidad(evaluar(final), equipo) == valor
+            revisadas += 1
+    assert revisadas > 40
+
+
+def test_repartos_empiezan_por_el_mejor(partida):
+    repartidor = RepartidorBonus()
+    for estado, equipo in posiciones(partida, 10):
+        opciones = repartidor.repartos(estado, equipo)
+        assert opciones[0][0] == repartidor.resolver(estado, equipo)[0]
+        assert [valor for valor, _ in opciones] == sorted((valor for valor, _ in opciones), reverse=True)
+
+
+def test_memoria_separada_por_equipo(partida):
+    # Con bonus para dos equipos en el mismo estado, el repartidor compartido
+    # debe dar a cada uno lo mismo que un repartidor nuevo
+    compartido = RepartidorBonus()
+    revisadas = 0
+    for estado, equipo in posiciones(partida, 10):
+        for otro in range(len(COLORS)):
+            if otro != equipo and fichas_movibles(estado, otro):
+                estado.datos[BONUS + otro] = 10
+                for t in (equipo, otro):
+                    assert compartido.resolver(estado, t) == RepartidorBonus().resolver(estado, t)
+                revisadas += 1
+    assert revisadas > 10
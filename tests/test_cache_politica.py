@@ -0,0 +1,99 @@
+import random
+from array import array
+
+from agentes import AgenteCodicioso
+from cache_politica import DESFASE, ROTAR, TIPO_FICHAS, AgenteConCache, CachePolitica, clave_canonica
+from estado import BONUS, CARCEL, CASA, DOBLES, INTERNO, ORDEN, EstadoCompacto, JuegoCompacto
+from guardado import LETRAS
+from movimientos import MAX_PASOS, destino
+from nucleo import BOARD_SIZE, COLORS, HOME_SIZE, Game
+from simulacion import jugar_partida
+
+# La clave canónica se apoya en que el tablero es simétrico: mover todo una
+# cuarta parte del tablero y pasarle las fichas de cada equipo al siguiente
+# da la misma situación, y debe dar la misma clave desde el equipo siguiente.
+
+def girar(codigo):
+    # El código visto una cuarta parte del tablero más adelante
+    if CARCEL < codigo < INTERNO:
+        return (codigo - 1 + DESFASE) % BOARD_SIZE + 1
+    return codigo
+
+def rotar_juego(juego):
+    # El mismo juego con las fichas de cada equipo en el equipo siguiente
+    origen = EstadoCompacto.desde_juego(juego).datos
+    n = len(COLORS)
+    datos = array("h", origen)
+    for t in range(n):
+        siguiente = (t + 1) % n
+        for ficha in range(HOME_SIZE):
+            datos[siguiente * HOME_SIZE + ficha] = girar(origen[t * HOME_SIZE + ficha])
+        datos[BONUS + siguiente] = origen[BONUS + t]
+        datos[DOBLES + siguiente] = origen[DOBLES + t]
+    orden = "".join(LETRAS[COLORS[(origen[ORDEN + i] + 1) % n]] for i in range(n))
+    estado = EstadoCompacto(datos)
+    estado.recalcular_mascaras()
+    return JuegoCompacto(orden, estado=estado, silencioso=True)
+
+
+def test_tablero_simetrico():
+    for t in range(len(COLORS)):
+        siguiente = (t + 1) % len(COLORS)
+        for codigo in range(1, CASA + 1):
+            for pasos in range(1, MAX_PASOS + 1):
+                llegada = destino(t, codigo, pasos)
+                esperado = girar(llegada) if llegada >= 0 else -1
+                assert destino(siguiente, girar(codigo), pasos) == esperado
+
+
+def test_rotar_lleva_al_equipo_cero():
+    for k in range(len(COLORS)):
+        for codigo in range(CASA + 1):
+            girado = codigo
+            for _ in range(k):
+                girado = girar(girado)
+            assert ROTAR[k][girado] == ROTAR[0][codigo] == codigo
+
+
+def test_clave_igual_desde_el_equipo_rotado(partida):
+    revisadas = 0
+    for seed in range(3):
+        for juego in partida(seed, cada=9):
+            rotado = rotar_juego(juego)
+            for k, color in enumerate(COLORS):
+                siguiente = COLORS[(k + 1) % len(COLORS)]
+                clave = clave_canonica(juego, color, TIPO_FICHAS, 7)
+                assert clave == clave_canonica(rotado, siguiente, TIPO_FICHAS, 7)
+                assert clave != clave_canonica(juego, color, TIPO_FICHAS, 8)
+            revisadas += 1
+    assert revisadas > 30
+
+
+def test_agente_con_cache_juega_igual():
+    cache = CachePolitica()
+    for seed in range(6):
+        sin = jugar_partida({color: AgenteCodicioso() for color in COLORS}, "YGRB", seed)
+        con = jugar_partida({color: AgenteConCache(AgenteCodicioso(), cache) for color in COLORS}, "YGRB", seed)
+        assert con.guardar() == sin.guardar()
+    assert cache.aciertos > 0
+
+
+def test_lru_y_archivo(tmp_path):
+    cache = CachePolitica(tamano=3)
+    for i in range(5):
+        cache.guardar(bytes([i]), bytes([i, i]))
+    assert cache.expulsiones == 2
+    assert cache.buscar(b"\x00") is None
+    assert cache.buscar(b"\x02") == b"\x02\x02"  # Pasa a ser la más reciente
+    cache.guardar(b"\x05", b"")
+    assert cache.buscar(b"\x03") is None
+    ruta = str(tmp_path / "cache.bin")
+    juego = Game("YGRB", agentes={}, rng=random.Random(0), silencioso=True)
+    clave = clave_canonica(juego, COLORS[0], TIPO_FICHAS, 7)
+    guardada = CachePolitica()
+    guardada.guardar(clave, b"\x01\x02")
+    guardada.guardar(clave_canonica(juego, COLORS[1], TIPO_FICHAS, 8), b"\x03")
+    guardada.guardar_archivo(ruta)
+    cargada = CachePolitica()
+    assert cargada.cargar_archivo(ruta) == 2
+    assert list(cargada.entradas.items()) == list(guardada.entradas.items())
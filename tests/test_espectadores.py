@@ -0,0 +1,75 @@
+import random
+
+from agentes import AgenteAleatorio
+from espectadores import (TIPO_CLAVE, TIPO_DELTA, TIPO_FIN, FlujoCambios, VistaEspectador, fotograma,
+                          leer_fotograma)
+from estado import CARCEL, EstadoCompacto
+from nucleo import COLORS, Game
+
+# Un espectador que aplica los fotogramas debe ver en todo momento las mismas
+# fichas que el juego, haya llegado desde el principio o a mitad de partida.
+
+def codigos(juego):
+    return list(EstadoCompacto.desde_juego(juego).datos[:len(COLORS) * 4])
+
+def juego_con_flujo(seed, intervalo_clave=32):
+    juego = Game("YGRB", agentes={color: AgenteAleatorio() for color in COLORS}, rng=random.Random(seed),
+                 silencioso=True)
+    return juego, FlujoCambios(juego, intervalo_clave)
+
+
+def test_fotograma_ida_y_vuelta():
+    crudo = fotograma(TIPO_DELTA, 70000, [(3, 12), (15, 76)])
+    assert leer_fotograma(crudo) == (TIPO_DELTA, 70000, [(3, 12), (15, 76)])
+    assert leer_fotograma(fotograma(TIPO_FIN, 9, ())) == (TIPO_FIN, 9, [])
+
+
+def test_vista_sigue_al_juego():
+    for seed in range(4):
+        juego, flujo = juego_con_flujo(seed)
+        vista = VistaEspectador()
+        tipos = []
+
+        def oyente(crudo):
+            tipos.append(crudo[0])
+            assert vista.aplicar(crudo)
+            if crudo[0] != TIPO_FIN:
+                assert vista.codigos == codigos(juego)
+
+        flujo.suscribir(oyente)
+        juego.run(2000)
+        assert vista.terminada
+        assert vista.codigos == codigos(juego)
+        assert tipos[0] == TIPO_CLAVE and tipos[-1] == TIPO_FIN
+        assert tipos.count(TIPO_CLAVE) == 1 + tipos.count(TIPO_DELTA) // 32
+
+
+def test_espectador_tardio_y_fotograma_perdido():
+    juego, flujo = juego_con_flujo(5, intervalo_clave=8)
+    fotogramas = []
+    flujo.suscribir(fotogramas.append)
+    juego.run(2000)
+    tarde = VistaEspectador()
+    # Llega a mitad de partida: ignora los DELTA hasta el primer CLAVE
+    mitad = len(fotogramas) // 2
+    for crudo in fotogramas[mitad:]:
+        tarde.aplicar(crudo)
+    assert tarde.codigos == codigos(juego)
+    # Un DELTA perdido invalida la vista hasta el siguiente CLAVE
+    vista = VistaEspectador()
+    perdido = next(i for i, crudo in enumerate(fotogramas) if i > 0 and crudo[0] == TIPO_DELTA)
+    for i, crudo in enumerate(fotogramas):
+        if i == perdido:
+            continue
+        aplicado = vista.aplicar(crudo)
+        if i == perdido + 1:
+            assert not aplicado and vista.codigos is None
+    assert vista.codigos == codigos(juego)
+
+
+def test_vista_vacia_antes_del_primer_clave():
+    vista = VistaEspectador()
+    assert not vista.aplicar(fotograma(TIPO_DELTA, 1, [(0, 4)]))
+    assert vista.codigos is None
+    assert vista.aplicar(fotograma(TIPO_CLAVE, 1, [(0, 4)]))
+    assert vista.codigos[0] == 4 and vista.codigos[1] == CARCEL
@@ -0,0 +1,84 @@
+import math
+from array import array
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from estado import BONUS, CASA, INTERNO, EstadoCompacto
+from finales import DISTANCIA_INTERNA, TIRADAS, TablaFinales, generar
+from ia import AVANCE, PASOS_POR_RONDA, Expectimax, evaluar, evaluar_con_finales
+from movimientos import legal_moves
+from nucleo import COLORS, HOME_SIZE, SEGURO_LLEGADA
+from simulacion import simulate
+
+# Con una sola ficha fuera de la casa la tabla se puede comprobar a mano:
+# iteración de valores sobre (distancia, dobles) con la opción de no mover.
+
+CASILLAS = 4
+
+
+def una_ficha(iteraciones=500):
+    maxima = DISTANCIA_INTERNA + CASILLAS
+    # Desde la distancia 1 no se llega con ninguna tirada
+    V = [[0.0] * 3, [math.inf] * 3] + [[0.0] * 3 for _ in range(maxima - 1)]
+    for _ in range(iteraciones):
+        nuevo = [V[0], V[1]] + [[0.0] * 3 for _ in range(maxima - 1)]
+        for d in range(2, maxima + 1):
+            for dobles in range(3):
+                esperado = 0
+                for (total, doble), probabilidad in TIRADAS:
+                    if doble and dobles == 2:
+                        esperado += probabilidad * (1 + V[d][0])  # Castigo
+                        continue
+                    opciones = [d] + ([d - total] if total <= d else [])
+                    esperado += probabilidad * min(1 if nueva == 0 else V[nueva][dobles + 1] if doble else
+                                                   1 + V[nueva][0] for nueva in opciones)
+                nuevo[d][dobles] = esperado
+        V = nuevo
+    return V
+
+
+@pytest.fixture(scope="module")
+def tabla(tmp_path_factory):
+    ruta = str(tmp_path_factory.mktemp("finales") / "finales.bin")
+    generar(ruta, CASILLAS, 2)
+    tabla = TablaFinales(ruta)
+    yield tabla
+    tabla.close()
+
+
+def test_una_ficha_igual_a_iteracion_de_valores(tabla):
+    V = una_ficha()
+    for d in range(2, DISTANCIA_INTERNA + CASILLAS + 1):
+        for dobles in range(3):
+            assert math.isfinite(tabla.valor([0, 0, 0, d], 0, dobles))
+            assert tabla.valor([0, 0, 0, d], 0, dobles) == pytest.approx(V[d][dobles], rel=1e-5)
+    assert tabla.valor([0, 0, 0, 7], 0) == pytest.approx(5.0233, abs=1e-4)
+    # Desde la última casilla interna solo se sale con bonus
+    assert math.isinf(tabla.valor([0, 0, 0, 1], 0))
+    assert tabla.valor([0, 0, 0, 1], 1) == 1
+
+
+def test_expectimax_evalua_las_hojas_con_la_tabla(tabla):
+    estado = EstadoCompacto()
+    estado.datos[0:HOME_SIZE] = array("h", [CASA, CASA, INTERNO + 3, SEGURO_LLEGADA[COLORS[0]] - 2])
+    estado.datos[HOME_SIZE] = 5  # Un rival fuera del dominio
+    estado.recalcular_mascaras()
+    rondas = tabla.esperado(estado, 0)
+    assert rondas is not None and math.isfinite(rondas)
+    assert tabla.esperado(estado, 1) is None
+    con, sin = evaluar_con_finales(estado, tabla), evaluar(estado)
+    assert con[0] == HOME_SIZE * AVANCE[0][CASA] - PASOS_POR_RONDA * rondas
+    assert con[1:] == sin[1:]
+    buscador = Expectimax(2, None, finales=tabla)
+    jugadas = legal_moves(estado, (1, 3))
+    assert buscador.mejor_jugada(estado, jugadas) in jugadas
+    estado.datos[BONUS] = 1
+    assert evaluar_con_finales(estado, tabla)[0] != con[0]
+
+
+def test_simulate_con_tabla(tabla):
+    resultados = simulate(20, 1, finales=tabla)
+    assert resultados["partidas"] == 20
+    assert sum(resultados["victorias"].values()) + resultados["sin_ganador"] == 20
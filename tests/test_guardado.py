@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from agentes import AgenteAleatorio
+from estado import EstadoCompacto, JuegoCompacto
+from guardado import TAMANO_PARTIDA, cargar_archivo, desempaquetar, empaquetar, guardar_archivo
+from nucleo import COLORS, Game
+from simulacion import jugar_partida
+
+# Guardar y cargar debe dar los mismos 58 bytes y la misma partida (fichas,
+# tablero, pista interna, orden de llegada a la casa), y fork() debe seguir la
+# partida sin tocar la original.
+
+def tablero(juego):
+    # El orden de dos fichas en la misma casilla no cambia ninguna regla
+    return {casilla: sorted((f.team, f.id) for f in fichas) for casilla, fichas in juego.board.cells.items() if fichas}
+
+def equipos(juego):
+    return {color: ([f.id if f else None for f in team.internal], [f.id for f in team.home])
+            for color, team in juego.teams.items()}
+
+
+def test_ida_y_vuelta_byte_a_byte(partida):
+    revisadas = 0
+    for seed in range(4):
+        for juego in partida(seed, cada=3):
+            datos = juego.guardar()
+            assert len(datos) == TAMANO_PARTIDA
+            cargado = Game.cargar(datos, silencioso=True)
+            assert cargado.guardar() == datos
+            assert EstadoCompacto.desde_juego(cargado) == EstadoCompacto.desde_juego(juego)
+            assert tablero(cargado) == tablero(juego)
+            assert equipos(cargado) == equipos(juego)
+            revisadas += 1
+    assert revisadas > 100
+
+
+def test_cargar_en_juego_compacto(partida):
+    for juego in partida(2, cada=10):
+        datos = empaquetar(juego)
+        compacto = desempaquetar(datos, JuegoCompacto, silencioso=True)
+        assert EstadoCompacto.desde_juego(compacto) == EstadoCompacto.desde_juego(juego)
+        assert empaquetar(compacto) == datos
+        assert equipos(compacto) == equipos(juego)
+
+
+def test_juego_compacto_guarda_el_orden_de_llegada():
+    # Las fichas no llegan a casa en orden de id; JuegoCompacto debe
+    # recordar el orden igual que Game
+    for seed in range(6):
+        agentes = {color: AgenteAleatorio() for color in COLORS}
+        juego = jugar_partida(agentes, "YGRB", seed)
+        compacto = jugar_partida(agentes, "YGRB", seed, clase_juego=JuegoCompacto)
+        assert equipos(compacto) == equipos(juego)
+        assert empaquetar(compacto) == empaquetar(juego)
+
+
+def test_fork_sigue_sin_tocar_la_original(partida):
+    for juego in partida(3, cada=25):
+        original = juego.guardar()
+        a = juego.fork(rng=random.Random(9))
+        b = juego.fork(rng=random.Random(9))
+        a.run(a.turnos + 40)
+        b.run(b.turnos + 40)
+        assert a.guardar() == b.guardar()
+        assert juego.guardar() == original
+        assert a.teams[COLORS[0]].pieces[0] is not juego.teams[COLORS[0]].pieces[0]
+
+
+def test_archivo_y_datos_danados(tmp_path, partida):
+    juego = next(partida(0, cada=30))
+    ruta = str(tmp_path / "partida.bin")
+    guardar_archivo(juego, ruta)
+    assert cargar_archivo(ruta, silencioso=True).guardar() == juego.guardar()
+    with pytest.raises(Exception):
+        desempaquetar(juego.guardar()[:-1])
+    with pytest.raises(Exception):
+        desempaquetar(b"\xff" + juego.guardar()[1:])
@@ -0,0 +1,117 @@
+import copy
+
+from estado import CARCEL, COLOR_INDICE, DOBLES, EstadoCompacto, codificar
+from movimientos import (MAX_PASOS, SALIDA_EQUIPO, SALIR, aplicar_movimiento, destino_legal, legal_moves,
+                         make_move, make_turn, unmake_move, unmake_turn)
+from nucleo import COLORS, HOME_SIZE
+
+# El motor de tablas (movimientos.py) debe dar lo mismo que Game en las
+# posiciones de partidas con semilla: destino, capturas, bonus y máscaras.
+# Hacer y deshacer debe dejar el estado compacto exactamente como estaba.
+
+# Sumas de los dados y los bonus por llegar a la casa y por capturar
+PASOS = list(range(1, 13)) + [20]
+
+TIRADAS = [(d1, d2) for d1 in range(1, 7) for d2 in range(d1, 7)]
+
+def foto(estado):
+    return estado.datos.tobytes(), tuple(estado.ocupadas), tuple(estado.pares)
+
+def mascaras_correctas(estado):
+    copia = estado.copia()
+    copia.recalcular_mascaras()
+    return copia.ocupadas == estado.ocupadas and copia.pares == estado.pares
+
+
+def test_destinos_iguales_a_game(partida):
+    revisados = 0
+    for seed in range(3):
+        for juego in partida(seed, cada=12):
+            estado = EstadoCompacto.desde_juego(juego)
+            for color in COLORS:
+                t = COLOR_INDICE[color]
+                for ficha in juego.teams[color].fichas_movibles():
+                    indice = t * HOME_SIZE + ficha.id
+                    for pasos in PASOS:
+                        copia = copy.deepcopy(juego)
+                        equipo = copia.teams[color]
+                        movida = equipo.pieces[ficha.id]
+                        if copia.mover_ficha(equipo, movida, pasos):
+                            esperado = codificar(movida.state, movida.position)
+                        else:
+                            esperado = -1
+                        assert destino_legal(estado, t, indice, pasos) == esperado, (seed, juego.turnos, indice, pasos)
+                        if esperado >= 0:
+                            # Capturas, bonus y máscaras también coinciden
+                            despues = estado.copia()
+                            assert aplicar_movimiento(despues, t, indice, pasos)
+                            assert despues == EstadoCompacto.desde_juego(copia)
+                        revisados += 1
+    assert revisados > 500
+
+
+def test_pasos_fuera_de_rango():
+    estado = EstadoCompacto()
+    estado.poner(0, SALIDA_EQUIPO[0])
+    assert destino_legal(estado, 0, 0, MAX_PASOS + 1) == -1
+
+
+def test_make_unmake_deja_el_estado_igual(partida):
+    jugadas_revisadas = 0
+    for seed in range(3):
+        for juego in partida(seed, cada=5):
+            estado = EstadoCompacto.desde_juego(juego)
+            antes = foto(estado)
+            for dados in TIRADAS:
+                for jugada in legal_moves(estado, dados):
+                    registros = []
+                    for movimiento in jugada:
+                        registro = make_move(estado, movimiento)
+                        assert registro is not None
+                        assert mascaras_correctas(estado)
+                        registros.append(registro)
+                    for registro in reversed(registros):
+                        unmake_move(estado, registro)
+                    assert foto(estado) == antes
+                    jugadas_revisadas += 1
+    assert jugadas_revisadas > 1000
+
+
+def test_make_unmake_turn_deja_el_estado_igual(partida):
+    for seed in range(3):
+        for juego in partida(seed, cada=5):
+            estado = EstadoCompacto.desde_juego(juego)
+            antes = foto(estado)
+            for dados in TIRADAS:
+                jugadas = legal_moves(estado, dados) or [()]
+                for jugada in (jugadas[0], jugadas[-1]):
+                    registro = make_turn(estado, dados, jugada)
+                    assert mascaras_correctas(estado)
+                    unmake_turn(estado, registro)
+                    assert foto(estado) == antes
+
+
+def test_castigo_por_tres_dobles_se_deshace(partida):
+    for juego in partida(1, cada=10):
+        estado = EstadoCompacto.desde_juego(juego)
+        estado.datos[DOBLES + estado.equipo_actual()] = 2
+        antes = foto(estado)
+        registro = make_turn(estado, (4, 4), ())
+        assert mascaras_correctas(estado)
+        unmake_turn(estado, registro)
+        assert foto(estado) == antes
+
+
+def test_salida_ilegal_no_cambia_nada():
+    estado = EstadoCompacto()
+    assert make_move(estado, (0, SALIR)) is not None
+    antes = foto(estado)
+    # La ficha ya no está en la cárcel
+    assert make_move(estado, (0, SALIR)) is None
+    assert foto(estado) == antes
+    # La salida ya tiene dos fichas
+    assert make_move(estado, (1, SALIR)) is not None
+    antes = foto(estado)
+    assert make_move(estado, (2, SALIR)) is None
+    assert foto(estado) == antes
+    assert estado.datos[2] == CARCEL
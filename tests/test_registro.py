@@ -0,0 +1,57 @@
+import random
+
+from agentes import AgenteAleatorio, AgenteCodicioso
+from estado import EstadoCompacto
+from nucleo import COLORS, Game
+from registro import EscritorRegistros, LectorRegistros
+from simulacion import jugar_partida
+
+# Una partida grabada, reproducida desde el archivo, debe terminar en el mismo
+# estado que la partida en vivo, y saltar a un turno (desde la foto más
+# cercana) debe dar lo mismo que reproducirla desde el principio.
+
+def grabar(ruta, semillas):
+    finales = []
+    with EscritorRegistros(ruta, intervalo_foto=16) as escritor:
+        for seed in semillas:
+            agentes = {color: AgenteAleatorio() if seed % 2 else AgenteCodicioso() for color in COLORS}
+            juego = jugar_partida(agentes, "YGRB", seed, escritor=escritor)
+            finales.append(juego)
+    return finales
+
+
+def test_reproducir_llega_al_estado_final(tmp_path):
+    ruta = str(tmp_path / "partidas.bin")
+    juegos = grabar(ruta, range(8))
+    with LectorRegistros(ruta) as lector:
+        assert len(lector) == len(juegos)
+        for partida, juego in enumerate(juegos):
+            ganador, turnos = lector.resultado(partida)
+            assert turnos == juego.turnos
+            assert (None if ganador is None else COLORS[ganador]) == juego.ganador()
+            ultimo = None
+            for turno, _, _, estado in lector.reproducir(partida):
+                ultimo = turno
+            assert ultimo == juego.turnos
+            assert estado.datos.tobytes() == EstadoCompacto.desde_juego(juego).datos.tobytes()
+
+
+def test_estado_en_igual_a_reproducir(tmp_path):
+    ruta = str(tmp_path / "partidas.bin")
+    grabar(ruta, range(3))
+    with LectorRegistros(ruta) as lector:
+        for partida in range(len(lector)):
+            for turno, _, _, estado in lector.reproducir(partida):
+                if turno % 5 == 0:
+                    assert lector.estado_en(partida, turno) == estado
+
+
+def test_dados_grabados_repiten_la_partida(tmp_path):
+    ruta = str(tmp_path / "partidas.bin")
+    juego, = grabar(ruta, [4])
+    with LectorRegistros(ruta) as lector:
+        agentes = {color: AgenteCodicioso() for color in COLORS}
+        repetido = Game("YGRB", agentes=agentes, rng=random.Random(), silencioso=True, dados=lector.dados(0))
+        repetido.run(juego.turnos)
+    assert repetido.turnos == juego.turnos
+    assert EstadoCompacto.desde_juego(repetido) == EstadoCompacto.desde_juego(juego)
@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+from servidor import Mesa, Servidor
+
+# Un jugador desconectado no puede detener la mesa: se lo espera una vez por
+# turno y las demás preguntas del turno se responden enseguida.
+
+TIEMPO = 0.1
+TURNOS = 10
+
+
+def test_desconectado_espera_una_vez_por_turno():
+    async def jugar():
+        servidor = Servidor(1, tiempo_jugada=TIEMPO)
+        mesa = Mesa(1, servidor, 1, seed=3)
+        jugador = mesa.sentar()
+        inicio = time.monotonic()
+        turnos_remotos = 0
+        while turnos_remotos < TURNOS:
+            color = mesa.juego.turn_order[mesa.juego.turn_index]
+            if color == jugador.color:
+                await mesa.decidir_turno(jugador)
+                turnos_remotos += 1
+            mesa.juego.turno()
+        return servidor, time.monotonic() - inicio
+
+    servidor, duracion = asyncio.run(jugar())
+    # Cada turno tiene al menos dos preguntas (dados y ficha o cárcel)
+    assert servidor.expiradas >= 2 * TURNOS
+    # Se espera una vez por turno, no una vez por pregunta
+    assert duracion < servidor.expiradas * TIEMPO * 0.75
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agentes import avance, captura
+from estado import codificar
+from nucleo import BOARD_SIZE, COLORS, FINISH_TRACK_LENGTH, SALIDAS, SEGURO_LLEGADA, Game
+from simulacion_vectorizada import LoteVectorizado, _orden_lote, simular_lote
+
+# El lote vectorizado debe jugar exactamente como Game cuando Game usa la
+# misma política (AgenteLote) y los mismos dados: se comparan fichas, bonus,
+# dobles y turno después de cada paso.
+
+class AgenteLote:
+    # La política fija de simulacion_vectorizada: siempre sale de la cárcel,
+    # prefiere capturar y si no mueve la ficha más adelantada (la de menor id
+    # en un empate); el bonus se gasta ficha por ficha, lo que le falte para
+    # llegar a casa o todo lo que quede
+    def sacar_de_carcel(self, juego, equipo, dados):
+        return juego.board.is_cell_available(SALIDAS[equipo.color])
+
+    def _ordenar(self, juego, equipo, opciones):
+        puntaje = lambda o: avance(equipo, o[0]) + 1000 * captura(juego, equipo, o[0], o[1])
+        return sorted(opciones, key=lambda o: (-puntaje(o), o[0].id))
+
+    def elegir_fichas(self, juego, equipo, movibles, pasos):
+        return [f for f, _ in self._ordenar(juego, equipo, [(f, pasos) for f in movibles])]
+
+    def elegir_bonus(self, juego, equipo, movibles, restantes):
+        return self._ordenar(juego, equipo, [(f, min(restantes, hasta_casa(equipo, f))) for f in movibles])
+
+
+def hasta_casa(equipo, ficha):
+    if ficha.state == "interno":
+        return FINISH_TRACK_LENGTH - 1 - ficha.position
+    return (SEGURO_LLEGADA[equipo.color] - ficha.position) % BOARD_SIZE + FINISH_TRACK_LENGTH - 1
+
+
+class DadosPorPartida:
+    # Hace de np.random.Generator para el lote: la fila g sale del mismo
+    # random.Random que usa el Game de la partida g
+    def __init__(self, semillas):
+        self.rngs = [random.Random(seed) for seed in semillas]
+
+    def integers(self, bajo, alto, size, dtype):
+        return np.array([(r.randint(bajo, alto - 1), r.randint(bajo, alto - 1)) for r in self.rngs], dtype=dtype)
+
+
+def test_lote_igual_a_game():
+    semillas = list(range(12))
+    lote = LoteVectorizado(len(semillas), DadosPorPartida(semillas), _orden_lote(len(semillas), 0, "YGRB", False))
+    agente = AgenteLote()
+    juegos = [Game("YGRB", agentes={color: agente for color in COLORS}, rng=random.Random(seed), silencioso=True)
+              for seed in semillas]
+    activos = set(range(len(juegos)))
+    for _ in range(600):
+        ganadores = lote.paso()
+        for g in sorted(activos):
+            juego = juegos[g]
+            juego.turno()
+            fichas = [codificar(f.state, f.position) for color in COLORS for f in juego.teams[color].pieces]
+            assert lote.fichas[g].tolist() == fichas, (g, juego.turnos)
+            assert lote.bonus[g].tolist() == [juego.bonus_moves.get(color, 0) for color in COLORS]
+            assert lote.dobles[g].tolist() == [juego.doubles_count[color] for color in COLORS]
+            assert lote.turno[g] == juego.turn_index
+            if ganadores[g] >= 0:
+                assert COLORS[ganadores[g]] == juego.ganador()
+                activos.discard(g)
+            else:
+                assert juego.ganador() is None
+        if not activos:
+            break
+    assert not activos
+
+
+def test_simular_lote_cuenta_todas_las_partidas():
+    resultados = simular_lote(500, seed=3, tamano_lote=128)
+    assert resultados["partidas"] == 500
+    assert sum(resultados["victorias"].values()) + resultados["sin_ganador"] == 500
+    assert sum(resultados["victorias_por_puesto"]) == sum(resultados["victorias"].values())
+    assert resultados["duraciones"].sum() == 500
+    # Con la misma semilla el resultado se repite
+    otra = simular_lote(500, seed=3, tamano_lote=128)
+    assert otra["victorias"] == resultados["victorias"]
+
+
+def test_simular_lote_en_procesos():
+    resultados = simular_lote(501, seed=3, tamano_lote=128, procesos=3)
+    assert resultados["partidas"] == 501
+    assert sum(resultados["victorias"].values()) + resultados["sin_ganador"] == 501
+    assert resultados["duraciones"].sum() == 501
+    # Con la misma semilla y los mismos procesos el resultado se repite
+    otra = simular_lote(501, seed=3, tamano_lote=128, procesos=3)
+    assert otra["victorias"] == resultados["victorias"]
+    assert (otra["duraciones"] == resultados["duraciones"]).all()
@@ -0,0 +1,25 @@
+import pytest
+
+from nucleo import COLORS
+from torneo import ELO_INICIAL, ORDENES, Torneo, mesas
+
+# Cada mesa asigna una política a cada color y todas las políticas juegan.
+
+def test_mesas():
+    assert mesas(["a"]) == [("a",) * len(COLORS)]
+    assert mesas(["a", "b"]) == [("a", "b", "a", "b")]
+    assert len(mesas(["a", "b", "c"])) == 3
+    assert len(mesas(["a", "b", "c", "d", "e"])) == 5
+    for nombres in (["a"], ["a", "b", "c"], ["a", "b", "c", "d", "e"]):
+        assert set().union(*mesas(nombres)) == set(nombres)
+        assert all(len(mesa) == len(COLORS) for mesa in mesas(nombres))
+    with pytest.raises(Exception):
+        mesas([])
+
+
+def test_una_politica_juega_contra_si_misma():
+    torneo = Torneo(["aleatorio"], seed=1, procesos=1)
+    resultados = list(torneo.jugar())
+    assert len(resultados) == torneo.partidas == len(ORDENES)
+    assert torneo.victorias["aleatorio"] == sum(1 for r in resultados if r[3] is not None)
+    assert torneo.elo["aleatorio"] == ELO_INICIAL
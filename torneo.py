@@ -0,0 +1,145 @@
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from agentes import AgenteAleatorio, AgenteCodicioso
+from ia import AgenteExpectimax
+from nucleo import COLORS
+from simulacion import MAX_TURNOS, jugar_partida
+
+# =============================================================================
+# TORNEO
+# =============================================================================
+# Enfrenta políticas registradas en todas las mesas posibles y rota el orden
+# de turnos por las 24 permutaciones de "YGRB" para cancelar la ventaja de
+# puesto. Cada partida tiene su propia semilla derivada de la semilla del
+# torneo, así que el resultado no depende del número de procesos ni del orden
+# en que terminan los bloques. Por eso las políticas registradas no pueden
+# depender del reloj: AgenteExpectimax entra con profundidad fija y sin
+# límite de tiempo.
+
+PROFUNDIDAD_EXPECTIMAX = 2
+
+def expectimax_fijo():
+    return AgenteExpectimax(PROFUNDIDAD_EXPECTIMAX, tiempo=None)
+
+POLITICAS = {
+    "aleatorio": AgenteAleatorio,
+    "codicioso": AgenteCodicioso,
+    "expectimax": expectimax_fijo,
+}
+
+ORDENES = ["".join(p) for p in itertools.permutations("YGRB")]
+
+ELO_INICIAL = 1500
+ELO_K = 16
+
+def registrar_politica(nombre, fabrica):
+    # La fábrica debe poder enviarse a otro proceso (una clase o función de módulo)
+    POLITICAS[nombre] = fabrica
+
+def mesas(nombres):
+    # Política asignada a cada color. Con cuatro o más políticas se juegan
+    # todas las combinaciones de cuatro; si no, cada pareja ocupa dos colores.
+    # Una sola política juega contra sí misma en los cuatro colores.
+    if not nombres:
+        raise Exception("El torneo necesita al menos una política.")
+    if len(nombres) == 1:
+        return [tuple(nombres) * len(COLORS)]
+    if len(nombres) >= len(COLORS):
+        return list(itertools.combinations(nombres, len(COLORS)))
+    return [(a, b) * (len(COLORS) // 2) for a, b in itertools.combinations(nombres, 2)]
+
+def _jugar_bloque(bloque, fabricas, max_turnos):
+    resultados = []
+    for mesa, orden, semilla in bloque:
+        agentes = {color: fabricas[nombre]() for color, nombre in zip(COLORS, mesa)}
+        juego = jugar_partida(agentes, orden, semilla, max_turnos)
+        ganador = juego.ganador()
+        politica = mesa[COLORS.index(ganador)] if ganador else None
+        resultados.append((mesa, orden, semilla, politica, juego.turnos))
+    return resultados
+
+
+class Torneo:
+    def __init__(self, politicas=None, seed=0, rondas=1, procesos=None, tamano_bloque=48, max_turnos=MAX_TURNOS):
+        self.politicas = list(politicas or POLITICAS)
+        self.seed = seed
+        self.rondas = rondas  # Cada ronda juega las 24 permutaciones de orden por mesa
+        self.procesos = procesos or os.cpu_count()
+        self.tamano_bloque = tamano_bloque
+        self.max_turnos = max_turnos
+        self.elo = {nombre: ELO_INICIAL for nombre in self.politicas}
+        self.victorias = {nombre: 0 for nombre in self.politicas}
+        self.partidas = 0
+
+    def programa(self):
+        rng = random.Random(self.seed)
+        for _ in range(self.rondas):
+            for mesa in mesas(self.politicas):
+                for orden in ORDENES:
+                    yield mesa, orden, rng.getrandbits(64)
+
+    def _bloques(self):
+        bloque = []
+        for partida in self.programa():
+            bloque.append(partida)
+            if len(bloque) == self.tamano_bloque:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+
+    def actualizar(self, mesa, politica):
+        self.partidas += 1
+        if politica is None:
+            return
+        self.victorias[politica] += 1
+        # Elo por parejas: el ganador le gana a cada política rival de la mesa
+        for rival in sorted(set(mesa) - {politica}):
+            esperado = 1 / (1 + 10 ** ((self.elo[rival] - self.elo[politica]) / 400))
+            self.elo[politica] += ELO_K * (1 - esperado)
+            self.elo[rival] -= ELO_K * (1 - esperado)
+
+    def jugar(self):
+        # Devuelve los resultados a medida que llegan. El Elo se actualiza en el
+        # orden del programa para que sea reproducible.
+        fabricas = {nombre: POLITICAS[nombre] for nombre in self.politicas}
+        bloques = enumerate(self._bloques())
+        en_curso = {}
+        terminados = {}
+        siguiente = 0
+        with ProcessPoolExecutor(max_workers=self.procesos) as executor:
+            while True:
+                # Se mantienen pocos bloques en vuelo para no cargar todo el programa
+                for i, bloque in itertools.islice(bloques, 2 * self.procesos - len(en_curso)):
+                    en_curso[executor.submit(_jugar_bloque, bloque, fabricas, self.max_turnos)] = i
+                if not en_curso:
+                    break
+                listos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    terminados[en_curso.pop(futuro)] = futuro.result()
+                while siguiente in terminados:
+                    for resultado in terminados.pop(siguiente):
+                        self.actualizar(resultado[0], resultado[3])
+                        yield resultado
+                    siguiente += 1
+
+    def clasificacion(self):
+        return sorted(((self.elo[n], self.victorias[n], n) for n in self.politicas), reverse=True)
+
+
+if __name__ == "__main__":
+    rondas = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    semilla = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    torneo = Torneo(seed=semilla, rondas=rondas)
+    inicio = time.perf_counter()
+    for _ in torneo.jugar():
+        pass
+    duracion = time.perf_counter() - inicio
+    for elo, victorias, nombre in torneo.clasificacion():
+        print(f"{nombre:12} Elo {elo:7.1f}  victorias {victorias}")
+    print(f"{torneo.partidas} partidas en {duracion:.2f} s con {torneo.procesos} procesos")